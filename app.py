@@ -190,8 +190,8 @@ elif selected == "Task 4 - DES":
 
     st.markdown("<div class='section-title'>Task 4 - DES</div>", unsafe_allow_html=True)
 
-    mode = st.selectbox("Mode DES:", ["ECB", "CBC"], key="des_mode")
-    key_hex = st.text_input("Key (16 hex)", "133457799BBCDFF1", key="des_key")
+    mode = st.selectbox("Mode DES:", ["ECB", "CBC", "CTR", "OFB", "CFB", "CFB8"], key="des_mode")
+    key_hex = st.text_input("Key (16 hex, 32 / 48 hex cho 3DES)", "133457799BBCDFF1", key="des_key")
 
     col1, col2 = st.columns(2)
 
@@ -222,15 +222,15 @@ elif selected == "Task 4 - DES":
         st.subheader("Giải mã")
 
         ct_hex = st.text_input("Ciphertext hex", value=st.session_state.get("des_ct", ""), key="des_ct_hex")
-        iv_hex = st.text_input("IV hex (CBC only)", value=st.session_state.get("des_iv", ""), key="des_iv_hex")
+        iv_hex = st.text_input("IV hex (CBC, CTR, OFB, CFB)", value=st.session_state.get("des_iv", ""), key="des_iv_hex")
 
         # Always keep IV in session
         st.session_state["des_iv"] = iv_hex
 
         if st.button("Giải mã DES", key="des_decrypt_btn"):
 
-            if mode == "CBC" and iv_hex.strip() == "":
-                st.error("CBC mode yêu cầu nhập IV!")
+            if mode != "ECB" and iv_hex.strip() == "":
+                st.error(f"{mode} mode yêu cầu nhập IV!")
             else:
                 loading("Đang giải mã...")
 
@@ -247,7 +247,7 @@ elif selected == "Task 5 - AES":
 
     st.markdown("<div class='section-title'>Task 5 - AES</div>", unsafe_allow_html=True)
 
-    mode = st.selectbox("Mode AES:", ["ECB", "CBC"], key="aes_mode")
+    mode = st.selectbox("Mode AES:", ["ECB", "CBC", "CTR", "GCM", "OFB", "CFB", "CFB8"], key="aes_mode")
     key_hex = st.text_input("Key (32 hex)", "00112233445566778899AABBCCDDEEFF", key="aes_key")
 
     col1, col2 = st.columns(2)
@@ -278,14 +278,14 @@ elif selected == "Task 5 - AES":
         st.subheader("Giải mã")
 
         ct_hex = st.text_input("Ciphertext hex", value=st.session_state.get("aes_ct", ""), key="aes_ct_input")
-        iv_hex = st.text_input("IV hex (CBC only)", value=st.session_state.get("aes_iv", ""), key="aes_iv_input")
+        iv_hex = st.text_input("IV / nonce hex (CBC, CTR, GCM, OFB, CFB)", value=st.session_state.get("aes_iv", ""), key="aes_iv_input")
 
         st.session_state["aes_iv"] = iv_hex
 
         if st.button("Giải mã AES", key="aes_decrypt_btn"):
 
-            if mode == "CBC" and iv_hex.strip() == "":
-                st.error("CBC mode yêu cầu nhập IV!")
+            if mode != "ECB" and iv_hex.strip() == "":
+                st.error(f"{mode} mode yêu cầu nhập IV / nonce!")
             else:
                 loading("Đang giải mã...")
 
@@ -0,0 +1,311 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tracemalloc
+from tasks.aes import aes_encrypt, aes_decrypt
+from tasks.aes_modes import (
+    aes_ecb_encrypt_into, aes_ecb_decrypt_into,
+    aes_cbc_encrypt_into, aes_cbc_decrypt_into
+)
+from tasks.des import (
+    des_encrypt, des_decrypt,
+    ECB_encrypt_into, ECB_decrypt_into,
+    CBC_encrypt_into, CBC_decrypt_into
+)
+
+# Benchmark thông lượng AES / DES + kiểm tra known-answer test (KAT).
+#   python benchmark.py                      # chạy, so sánh với baseline nếu có
+#   python benchmark.py --save               # ghi baseline mới
+#   python benchmark.py --sizes 16 1K 1M     # chỉ đo vài kích thước
+# Trả về exit code 1 nếu KAT sai hoặc có regression so với baseline.
+
+DEFAULT_BASELINE = "bench_baseline.json"
+DEFAULT_SIZES = ["16", "1K", "64K", "1M", "16M", "64M"]
+DES_MAX_SIZE = "64M"         # giảm bằng --des-max-size để chạy nhanh hơn
+DEFAULT_TOLERANCE = 0.15     # chậm hơn baseline quá 15% -> regression
+MIN_REPEAT = 3
+MIN_TIME = 0.5               # giây đo tối thiểu cho mỗi trường hợp
+MAX_REPEAT = 1000
+
+_UNITS = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+
+
+#  Known-answer tests
+def _h(s):
+    return bytes.fromhex(s.replace(" ", ""))
+
+
+_SP800_38A_PT = _h(
+    "6bc1bee22e409f96e93d7e117393172a ae2d8a571e03ac9c9eb76fac45af8e51"
+    "30c81c46a35ce411e5fbc1191a0a52ef f69f2445df4f9b17ad2b417be66c3710"
+)
+_SP800_38A_IV = _h("000102030405060708090a0b0c0d0e0f")
+
+# (tên, cipher, mode, key, iv, plaintext, ciphertext)
+KAT_VECTORS = [
+    # FIPS-197 Appendix C
+    ("FIPS-197 C.1 AES-128", "aes", "ECB", _h("000102030405060708090a0b0c0d0e0f"), None,
+     _h("00112233445566778899aabbccddeeff"), _h("69c4e0d86a7b0430d8cdb78070b4c55a")),
+    ("FIPS-197 C.2 AES-192", "aes", "ECB",
+     _h("000102030405060708090a0b0c0d0e0f1011121314151617"), None,
+     _h("00112233445566778899aabbccddeeff"), _h("dda97ca4864cdfe06eaf70a0ec0d7191")),
+    ("FIPS-197 C.3 AES-256", "aes", "ECB",
+     _h("000102030405060708090a0b0c0d0e0f101112131415161718191a1b1c1d1e1f"), None,
+     _h("00112233445566778899aabbccddeeff"), _h("8ea2b7ca516745bfeafc49904b496089")),
+    # SP 800-38A F.1 (ECB) và F.2 (CBC)
+    ("SP800-38A F.1.1 ECB-AES128", "aes", "ECB",
+     _h("2b7e151628aed2a6abf7158809cf4f3c"), None, _SP800_38A_PT,
+     _h("3ad77bb40d7a3660a89ecaf32466ef97 f5d3d58503b9699de785895a96fdbaaf"
+        "43b1cd7f598ece23881b00e3ed030688 7b0c785e27e8ad3f8223207104725dd4")),
+    ("SP800-38A F.1.3 ECB-AES192", "aes", "ECB",
+     _h("8e73b0f7da0e6452c810f32b809079e562f8ead2522c6b7b"), None, _SP800_38A_PT,
+     _h("bd334f1d6e45f25ff712a214571fa5cc 974104846d0ad3ad7734ecb3ecee4eef"
+        "ef7afd2270e2e60adce0ba2face6444e 9a4b41ba738d6c72fb16691603c18e0e")),
+    ("SP800-38A F.1.5 ECB-AES256", "aes", "ECB",
+     _h("603deb1015ca71be2b73aef0857d77811f352c073b6108d72d9810a30914dff4"), None,
+     _SP800_38A_PT,
+     _h("f3eed1bdb5d2a03c064b5a7e3db181f8 591ccb10d410ed26dc5ba74a31362870"
+        "b6ed21b99ca6f4f9f153e7b1beafed1d 23304b7a39f9f3ff067d8d8f9e24ecc7")),
+    ("SP800-38A F.2.1 CBC-AES128", "aes", "CBC",
+     _h("2b7e151628aed2a6abf7158809cf4f3c"), _SP800_38A_IV, _SP800_38A_PT,
+     _h("7649abac8119b246cee98e9b12e9197d 5086cb9b507219ee95db113a917678b2"
+        "73bed6b8e3c1743b7116e69e22229516 3ff1caa1681fac09120eca307586e1a7")),
+    ("SP800-38A F.2.3 CBC-AES192", "aes", "CBC",
+     _h("8e73b0f7da0e6452c810f32b809079e562f8ead2522c6b7b"), _SP800_38A_IV, _SP800_38A_PT,
+     _h("4f021db243bc633d7178183a9fa071e8 b4d9ada9ad7dedf4e5e738763f69145a"
+        "571b242012fb7ae07fa9baac3df102e0 08b0e27988598881d920a9e64f5615cd")),
+    ("SP800-38A F.2.5 CBC-AES256", "aes", "CBC",
+     _h("603deb1015ca71be2b73aef0857d77811f352c073b6108d72d9810a30914dff4"),
+     _SP800_38A_IV, _SP800_38A_PT,
+     _h("f58c4c04d6e5f1ba779eabfb5f7bfbd6 9cfc4e967edb808d679f777bc6702c7d"
+        "39f23369a9d9bacfa530e26304231461 b2eb05e2c39be9fcda6c19078c6a9d1b")),
+    # FIPS 46-3 (ví dụ kinh điển của DES)
+    ("FIPS 46-3 DES", "des", "ECB", _h("133457799BBCDFF1"), None,
+     _h("0123456789ABCDEF"), _h("85E813540F0AB405")),
+]
+
+_KAT_FUNCS = {
+    ("aes", "ECB"): (aes_ecb_encrypt_into, aes_ecb_decrypt_into),
+    ("aes", "CBC"): (aes_cbc_encrypt_into, aes_cbc_decrypt_into),
+    ("des", "ECB"): (ECB_encrypt_into, ECB_decrypt_into),
+    ("des", "CBC"): (CBC_encrypt_into, CBC_decrypt_into),
+}
+
+
+def run_kats():
+    """
+    Chạy toàn bộ KAT (không padding), trả về list tên vector bị sai.
+    """
+    failed = []
+    for name, cipher, mode, key, iv, pt, ct in KAT_VECTORS:
+        enc, dec = _KAT_FUNCS[(cipher, mode)]
+        extra = () if iv is None else (iv,)
+        out = bytearray(len(pt))
+        back = bytearray(len(ct))
+        enc(pt, out, key, *extra, pad=False)
+        dec(ct, back, key, *extra, unpad=False)
+        ok = bytes(out) == ct and bytes(back) == pt
+        print(f"  [{'OK' if ok else 'FAIL'}] {name}")
+        if not ok:
+            failed.append(name)
+    return failed
+
+
+#  Các trường hợp benchmark
+def parse_size(text: str) -> int:
+    text = text.strip().upper().rstrip("B")
+    if text and text[-1] in _UNITS:
+        return int(float(text[:-1]) * _UNITS[text[-1]])
+    return int(text)
+
+
+def format_size(n: int) -> str:
+    for unit in ("G", "M", "K"):
+        if n >= _UNITS[unit] and n % _UNITS[unit] == 0:
+            return f"{n // _UNITS[unit]}{unit}"
+    return str(n)
+
+
+def bench_cases(sizes, des_max_size):
+    """
+    Sinh các trường hợp (id, cipher, mode, key, iv, size).
+    """
+    cases = []
+    for size in sizes:
+        for key_len in (16, 24, 32):
+            for mode in ("ECB", "CBC"):
+                iv = os.urandom(16) if mode == "CBC" else None
+                cases.append((f"aes{key_len * 8}-{mode}-{format_size(size)}",
+                              "aes", mode, os.urandom(key_len), iv, size))
+        if size <= des_max_size:
+            for mode in ("ECB", "CBC"):
+                iv = os.urandom(8) if mode == "CBC" else None
+                cases.append((f"des-{mode}-{format_size(size)}",
+                              "des", mode, os.urandom(8), iv, size))
+    return cases
+
+
+def _calls(cipher, mode, key, iv, data):
+    """
+    Trả về (encrypt(), decrypt()) dùng đúng API công khai, và kiểm tra round-trip.
+    """
+    if cipher == "aes":
+        ct, _ = aes_encrypt(data, key, mode, iv)
+        encrypt = lambda: aes_encrypt(data, key, mode, iv)
+        decrypt = lambda: aes_decrypt(ct, key, mode, iv)
+    else:
+        ct, _ = des_encrypt(data, key, mode, iv)
+        encrypt = lambda: des_encrypt(data, key, mode, iv)
+        decrypt = lambda: des_decrypt(ct, key, mode, iv)
+
+    if decrypt() != data:
+        raise ValueError(f"Round-trip failed for {cipher} {mode}")
+    return encrypt, decrypt
+
+
+def _percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * p / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def measure(fn, size: int, min_time: float):
+    """
+    Gọi fn lặp lại (>= MIN_REPEAT lần, >= min_time giây), rồi đo peak
+    memory bằng tracemalloc trong 1 lần gọi riêng (tracemalloc làm chậm code).
+    """
+    times = []
+    start = time.perf_counter()
+    while len(times) < MAX_REPEAT:
+        t = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t)
+        if len(times) >= MIN_REPEAT and time.perf_counter() - start >= min_time:
+            break
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    times.sort()
+    p50 = _percentile(times, 50)
+    return {
+        "calls": len(times),
+        "mb_s": size / p50 / (1 << 20) if p50 > 0 else 0.0,
+        "p50_ms": p50 * 1e3,
+        "p90_ms": _percentile(times, 90) * 1e3,
+        "p99_ms": _percentile(times, 99) * 1e3,
+        "peak_mem_mb": peak / (1 << 20),
+    }
+
+
+def run_benchmarks(cases, min_time: float):
+    results = {}
+    print(f"{'case':<24} {'op':<4} {'MB/s':>10} {'p50 ms':>10} {'p90 ms':>10} "
+          f"{'p99 ms':>10} {'peak MB':>9}")
+    for case_id, cipher, mode, key, iv, size in cases:
+        data = os.urandom(size)
+        encrypt, decrypt = _calls(cipher, mode, key, iv, data)
+        for op, fn in (("enc", encrypt), ("dec", decrypt)):
+            r = measure(fn, size, min_time)
+            results[f"{case_id}-{op}"] = r
+            print(f"{case_id:<24} {op:<4} {r['mb_s']:>10.2f} {r['p50_ms']:>10.3f} "
+                  f"{r['p90_ms']:>10.3f} {r['p99_ms']:>10.3f} {r['peak_mem_mb']:>9.2f}")
+        sys.stdout.flush()
+    return results
+
+
+#  Baseline
+def environment():
+    import numpy
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "numpy": numpy.__version__,
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(results, baseline, tolerance: float):
+    """
+    So sánh MB/s với baseline, trả về list (case, cũ, mới) bị chậm hơn ngưỡng.
+    """
+    regressions = []
+    for case, old in baseline.get("results", {}).items():
+        new = results.get(case)
+        if new is None or old["mb_s"] <= 0:
+            continue
+        if new["mb_s"] < old["mb_s"] * (1 - tolerance):
+            regressions.append((case, old["mb_s"], new["mb_s"]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark + known-answer test cho AES / DES")
+    parser.add_argument("--sizes", nargs="+", default=DEFAULT_SIZES,
+                        help="kích thước message, vd: 16 1K 64K 1M 64M")
+    parser.add_argument("--des-max-size", default=DES_MAX_SIZE,
+                        help="kích thước lớn nhất đo cho DES")
+    parser.add_argument("--min-time", type=float, default=MIN_TIME,
+                        help="thời gian đo tối thiểu (giây) cho mỗi trường hợp")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save", action="store_true", help="ghi kết quả làm baseline mới")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--kat-only", action="store_true")
+    args = parser.parse_args(argv)
+
+    print("Known-answer tests:")
+    failed = run_kats()
+    if failed:
+        print(f"{len(failed)} KAT thất bại, bỏ qua benchmark.")
+        return 1
+    if args.kat_only:
+        return 0
+
+    sizes = [parse_size(s) for s in args.sizes]
+    cases = bench_cases(sizes, parse_size(args.des_max_size))
+    print()
+    results = run_benchmarks(cases, args.min_time)
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": environment(),
+        "results": results,
+    }
+
+    status = 0
+    if os.path.exists(args.baseline) and not args.save:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("environment") != report["environment"]:
+            print("\nCảnh báo: baseline được ghi trên môi trường khác.")
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\nRegression (chậm hơn baseline > {args.tolerance:.0%}):")
+            for case, old, new in regressions:
+                print(f"  {case:<28} {old:>10.2f} -> {new:>10.2f} MB/s "
+                      f"({(new - old) / old:+.1%})")
+            status = 1
+        else:
+            print(f"\nKhông có regression so với {args.baseline}.")
+    else:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"\nĐã ghi baseline vào {args.baseline}")
+
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
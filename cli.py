@@ -0,0 +1,240 @@
+import os
+import sys
+import mmap
+import queue
+import argparse
+import threading
+from tasks.aes_modes import (
+    padded_size,
+    aes_ecb_encrypt_into, aes_ecb_decrypt_into,
+    aes_cbc_encrypt_into, aes_cbc_decrypt_into,
+    aes_ctr_encrypt_into, CTR_NONCE_SIZE
+)
+from tasks.des import (
+    ECB_encrypt_into, ECB_decrypt_into,
+    CBC_encrypt_into, CBC_decrypt_into
+)
+from tasks.drbg import random_bytes
+
+# Mã hóa / giải mã file lớn hơn RAM:
+#   - file input được mmap, xử lý theo từng chunk căn block
+#   - file output được cấp phát trước, các chunk được ghi bằng pwrite
+#   - đọc (readahead qua madvise), tính toán và ghi đĩa chạy chồng lên nhau:
+#     trong lúc chunk i được mã hóa, chunk i+1 được kernel đọc trước và
+#     chunk i-1 được thread ghi đẩy xuống đĩa.
+#
+#   python cli.py encrypt --cipher aes --mode CBC --key 0011...EEFF in.bin out.bin
+#   python cli.py decrypt --cipher aes --mode CBC --key 0011...EEFF --iv <hex> out.bin back.bin
+
+DEFAULT_CHUNK_MB = 4
+PIPELINE_DEPTH = 2
+
+
+#  Bộ xử lý theo chunk cho từng cipher / mode
+def make_processor(cipher: str, mode: str, action: str, key: bytes, iv: bytes, counter: int):
+    """
+    Trả về (block_size, process, out_size, iv):
+        process(src, dst, final) -> số byte ghi vào dst
+        out_size(n) -> kích thước tối đa của output cho input n byte
+    Trạng thái giữa các chunk (IV / counter) được giữ trong closure.
+    """
+    encrypt = action == "encrypt"
+
+    if cipher == "aes":
+        block = 16
+        funcs = {
+            "ECB": (aes_ecb_encrypt_into, aes_ecb_decrypt_into),
+            "CBC": (aes_cbc_encrypt_into, aes_cbc_decrypt_into),
+        }
+    else:
+        block = 8
+        funcs = {
+            "ECB": (ECB_encrypt_into, ECB_decrypt_into),
+            "CBC": (CBC_encrypt_into, CBC_decrypt_into),
+        }
+
+    if mode == "CTR":
+        if cipher != "aes":
+            raise ValueError("CTR mode is only available for AES")
+        if iv is None:
+            if not encrypt:
+                raise ValueError("Nonce (--iv) is required for CTR decryption")
+            iv = random_bytes(CTR_NONCE_SIZE)
+        state = {"counter": counter}
+
+        def process(src, dst, final):
+            n = aes_ctr_encrypt_into(src, dst, key, iv, state["counter"])
+            state["counter"] += n // 16
+            return n
+
+        return block, process, lambda n: n, iv
+
+    if mode not in funcs:
+        raise ValueError("Mode must be ECB, CBC or CTR")
+
+    enc_into, dec_into = funcs[mode]
+
+    if mode == "ECB":
+        if encrypt:
+            def process(src, dst, final):
+                return enc_into(src, dst, key, pad=final)
+
+            return block, process, lambda n: padded_size(n, block), None
+
+        def process(src, dst, final):
+            return dec_into(src, dst, key, unpad=final)
+
+        return block, process, lambda n: n, None
+
+    # CBC: IV của chunk sau = block ciphertext cuối của chunk trước
+    if iv is None:
+        if not encrypt:
+            raise ValueError("IV (--iv) is required for CBC decryption")
+        iv = random_bytes(block)
+    state = {"iv": iv}
+
+    if encrypt:
+        def process(src, dst, final):
+            n = enc_into(src, dst, key, state["iv"], pad=final)
+            state["iv"] = bytes(dst[n - block:n])
+            return n
+
+        return block, process, lambda n: padded_size(n, block), iv
+
+    def process(src, dst, final):
+        next_iv = bytes(src[len(src) - block:]) if len(src) else state["iv"]
+        n = dec_into(src, dst, key, state["iv"], unpad=final)
+        state["iv"] = next_iv
+        return n
+
+    return block, process, lambda n: n, iv
+
+
+#  Pipeline đọc / tính / ghi
+def _writer(fd, jobs: queue.Queue, free: queue.Queue, errors: list):
+    while True:
+        job = jobs.get()
+        if job is None:
+            return
+        buf, n, offset = job
+        try:
+            if not errors:
+                view = memoryview(buf)[:n]
+                while view:
+                    written = _pwrite(fd, view, offset)
+                    view = view[written:]
+                    offset += written
+        except OSError as e:
+            errors.append(e)
+        finally:
+            free.put(buf)
+
+
+def _pwrite(fd, data, offset):
+    if hasattr(os, "pwrite"):
+        return os.pwrite(fd, data, offset)
+    os.lseek(fd, offset, os.SEEK_SET)
+    return os.write(fd, data)
+
+
+def _prefetch(mm, start, stop):
+    if mm is not None and hasattr(mm, "madvise") and hasattr(mmap, "MADV_WILLNEED"):
+        page = mmap.PAGESIZE
+        start -= start % page
+        if stop > start:
+            mm.madvise(mmap.MADV_WILLNEED, start, stop - start)
+
+
+def process_file(in_path, out_path, process, out_size, block: int, chunk_size: int) -> int:
+    """
+    Chạy process() trên toàn bộ file input theo chunk, ghi kết quả vào out_path.
+    Trả về kích thước file output.
+    """
+    chunk_size -= chunk_size % block
+    if chunk_size <= 0:
+        raise ValueError("Chunk size must be at least one block")
+
+    with open(in_path, "rb") as fin, open(out_path, "wb+") as fout:
+        size = os.fstat(fin.fileno()).st_size
+        mm = mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        src_all = memoryview(mm) if mm is not None else memoryview(b"")
+
+        # Cấp phát trước file output với kích thước tối đa
+        fd = fout.fileno()
+        total = out_size(size)
+        if total:
+            if hasattr(os, "posix_fallocate"):
+                os.posix_fallocate(fd, 0, total)
+            else:
+                os.ftruncate(fd, total)
+
+        # Các buffer output được tái sử dụng -> bộ nhớ cố định
+        free = queue.Queue()
+        for _ in range(PIPELINE_DEPTH + 1):
+            free.put(bytearray(chunk_size + block))
+        jobs = queue.Queue(maxsize=PIPELINE_DEPTH)
+        errors = []
+        writer = threading.Thread(target=_writer, args=(fd, jobs, free, errors), daemon=True)
+        writer.start()
+
+        written = 0
+        try:
+            offset = 0
+            while True:
+                stop = min(offset + chunk_size, size)
+                final = stop == size
+                _prefetch(mm, stop, min(stop + chunk_size, size))
+
+                buf = free.get()
+                n = process(src_all[offset:stop], buf, final)
+                if errors:
+                    raise errors[0]
+                jobs.put((buf, n, written))
+                written += n
+                offset = stop
+                if final:
+                    break
+        finally:
+            jobs.put(None)
+            writer.join()
+            src_all.release()
+            if mm is not None:
+                mm.close()
+
+        if errors:
+            raise errors[0]
+        os.ftruncate(fd, written)
+        return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mã hóa / giải mã file lớn bằng AES hoặc DES")
+    parser.add_argument("action", choices=["encrypt", "decrypt"])
+    parser.add_argument("input")
+    parser.add_argument("output")
+    parser.add_argument("--cipher", choices=["aes", "des"], default="aes")
+    parser.add_argument("--mode", default="CBC", help="ECB, CBC hoặc CTR (chỉ AES)")
+    parser.add_argument("--key", required=True, help="khóa dạng hex")
+    parser.add_argument("--iv", help="IV (CBC) hoặc nonce (CTR) dạng hex")
+    parser.add_argument("--counter", type=int, default=0, help="counter bắt đầu (CTR)")
+    parser.add_argument("--chunk-mb", type=float, default=DEFAULT_CHUNK_MB)
+    args = parser.parse_args(argv)
+
+    key = bytes.fromhex(args.key)
+    iv = bytes.fromhex(args.iv) if args.iv else None
+    block, process, out_size, used_iv = make_processor(
+        args.cipher, args.mode.upper(), args.action, key, iv, args.counter
+    )
+
+    n = process_file(
+        args.input, args.output, process, out_size, block,
+        int(args.chunk_mb * (1 << 20))
+    )
+
+    if used_iv is not None and iv is None:
+        print(f"IV (hex): {used_iv.hex()}", file=sys.stderr)
+    print(f"Đã ghi {n} byte vào {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
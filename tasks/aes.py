@@ -2,19 +2,32 @@ from tasks.aes_modes import (
     aes_ecb_encrypt,
     aes_ecb_decrypt,
     aes_cbc_encrypt,
-    aes_cbc_decrypt
+    aes_cbc_decrypt,
+    aes_ctr_encrypt,
+    aes_ctr_decrypt,
+    aes_ofb_encrypt,
+    aes_ofb_decrypt,
+    aes_cfb_encrypt,
+    aes_cfb_decrypt,
+    aes_cfb8_encrypt,
+    aes_cfb8_decrypt
 )
+from tasks.aes_gcm import aes_gcm_encrypt, aes_gcm_decrypt, GCM_TAG_SIZE
+from tasks.aes_batch import aes_encrypt_many, aes_decrypt_many
 
 #  AES ENCRYPT
-def aes_encrypt(plaintext: bytes, key: bytes, mode: str, iv=None):
+def aes_encrypt(plaintext: bytes, key: bytes, mode: str, iv=None, counter: int = 0,
+                aad: bytes = b""):
     """
     plaintext: bytes
     key: 16 / 24 / 32 bytes
-    mode: 'ECB' hoặc 'CBC'
-    iv: 16 bytes hoặc None
+    mode: 'ECB', 'CBC', 'CTR', 'GCM', 'OFB', 'CFB' (CFB-128) hoặc 'CFB8'
+    iv: 16 bytes hoặc None (CTR: nonce 8 bytes, GCM: nonce 12 bytes, hoặc None)
+    counter: giá trị counter bắt đầu (chỉ dùng cho CTR)
+    aad: dữ liệu chỉ xác thực (chỉ dùng cho GCM)
 
     Output:
-        - ciphertext dạng HEX (string)
+        - ciphertext dạng HEX (string); GCM: ciphertext || tag 16 byte
         - iv (bytes hoặc None)
     """
     mode = mode.upper()
@@ -27,16 +40,39 @@ def aes_encrypt(plaintext: bytes, key: bytes, mode: str, iv=None):
         ct, used_iv = aes_cbc_encrypt(plaintext, key, iv)
         return ct.hex(), used_iv
 
+    elif mode == "CTR":
+        ct, nonce = aes_ctr_encrypt(plaintext, key, iv, counter)
+        return ct.hex(), nonce
+
+    elif mode == "GCM":
+        ct, tag, nonce = aes_gcm_encrypt(plaintext, key, iv, aad)
+        return (ct + tag).hex(), nonce
+
+    elif mode == "OFB":
+        ct, used_iv = aes_ofb_encrypt(plaintext, key, iv)
+        return ct.hex(), used_iv
+
+    elif mode == "CFB":
+        ct, used_iv = aes_cfb_encrypt(plaintext, key, iv)
+        return ct.hex(), used_iv
+
+    elif mode == "CFB8":
+        ct, used_iv = aes_cfb8_encrypt(plaintext, key, iv)
+        return ct.hex(), used_iv
+
     else:
-        raise ValueError("AES mode must be ECB or CBC")
+        raise ValueError("AES mode must be ECB, CBC, CTR, GCM, OFB, CFB or CFB8")
 
 #  AES DECRYPT
-def aes_decrypt(ciphertext_hex: str, key: bytes, mode: str, iv=None):
+def aes_decrypt(ciphertext_hex: str, key: bytes, mode: str, iv=None, counter: int = 0,
+                aad: bytes = b""):
     """
-    ciphertext_hex: chuỗi hex
+    ciphertext_hex: chuỗi hex (GCM: ciphertext || tag)
     key: bytes
-    mode: 'ECB' hoặc 'CBC'
-    iv: bytes (CBC bắt buộc)
+    mode: 'ECB', 'CBC', 'CTR', 'GCM', 'OFB', 'CFB' hoặc 'CFB8'
+    iv: bytes (CBC / OFB / CFB bắt buộc; CTR / GCM: nonce bắt buộc)
+    counter: giá trị counter bắt đầu (chỉ dùng cho CTR)
+    aad: dữ liệu chỉ xác thực (chỉ dùng cho GCM)
 
     Trả về:
         plaintext (bytes)
@@ -52,5 +88,27 @@ def aes_decrypt(ciphertext_hex: str, key: bytes, mode: str, iv=None):
             raise ValueError("IV is required for CBC decryption")
         return aes_cbc_decrypt(ciphertext, key, iv)
 
+    elif mode == "CTR":
+        if iv is None:
+            raise ValueError("Nonce is required for CTR decryption")
+        return aes_ctr_decrypt(ciphertext, key, iv, counter)
+
+    elif mode == "GCM":
+        if iv is None:
+            raise ValueError("Nonce is required for GCM decryption")
+        if len(ciphertext) < GCM_TAG_SIZE:
+            raise ValueError("GCM ciphertext is shorter than the tag")
+        ct, tag = ciphertext[:-GCM_TAG_SIZE], ciphertext[-GCM_TAG_SIZE:]
+        return aes_gcm_decrypt(ct, key, iv, tag, aad)
+
+    elif mode in ("OFB", "CFB", "CFB8"):
+        if iv is None:
+            raise ValueError(f"IV is required for {mode} decryption")
+        if mode == "OFB":
+            return aes_ofb_decrypt(ciphertext, key, iv)
+        if mode == "CFB":
+            return aes_cfb_decrypt(ciphertext, key, iv)
+        return aes_cfb8_decrypt(ciphertext, key, iv)
+
     else:
-        raise ValueError("AES mode must be ECB or CBC")
+        raise ValueError("AES mode must be ECB, CBC, CTR, GCM, OFB, CFB or CFB8")
@@ -0,0 +1,240 @@
+import numpy as np
+from tasks.aes_modes import expand_key, pkcs7_pad, CTR_NONCE_SIZE
+from tasks.aes_numpy import (
+    words_to_round_keys, encrypt_blocks, decrypt_blocks, CHUNK_BLOCKS,
+    expand_keys, inverse_round_keys
+)
+from tasks.drbg import random_bytes
+
+# Mã hóa / giải mã nhiều message độc lập dưới cùng 1 khóa trong 1 lần gọi.
+# Block của mọi message được gom vào 1 mảng (tổng số block, 16) và chạy qua
+# engine NumPy cùng lúc:
+#   - ECB / CTR / CBC giải mã: toàn bộ block trong 1 batch
+#   - CBC mã hóa: các chuỗi CBC của các message tiến cùng nhịp, bước t mã hóa
+#     block thứ t của mọi message còn block (1 batch cho mỗi bước)
+BATCH_MODES = ("ECB", "CBC", "CTR")
+
+
+def _layout(lengths):
+    """
+    lengths: số block của từng message -> (start, total), start[m] là chỉ số
+    block đầu tiên của message m trong mảng gộp.
+    """
+    lengths = np.asarray(lengths, dtype=np.int64)
+    start = np.zeros(len(lengths), dtype=np.int64)
+    np.cumsum(lengths[:-1], out=start[1:])
+    return start, int(lengths.sum())
+
+
+def _to_blocks(messages):
+    data = b"".join(messages)
+    return np.frombuffer(data, dtype=np.uint8).reshape(-1, 16)
+
+
+def _run(block_fn, blocks, round_keys):
+    out = np.empty_like(blocks)
+    for i in range(0, len(blocks), CHUNK_BLOCKS):
+        out[i:i + CHUNK_BLOCKS] = block_fn(blocks[i:i + CHUNK_BLOCKS], round_keys)
+    return out
+
+
+def _random_ivs(count: int, size: int):
+    pool = random_bytes(count * size)
+    return [pool[i:i + size] for i in range(0, count * size, size)]
+
+
+def _check_ivs(ivs, count: int, size: int, name: str):
+    if len(ivs) != count:
+        raise ValueError(f"Expected {count} {name}s, got {len(ivs)}")
+    if any(len(iv) != size for iv in ivs):
+        raise ValueError(f"Every {name} must be {size} bytes")
+
+
+def _ctr_keystream(ivs, nblocks, start, total, round_keys):
+    """
+    Keystream CTR của mọi message: nonce_m || counter 0, 1, ... (64-bit big-endian).
+    """
+    owner = np.repeat(np.arange(len(nblocks)), nblocks)
+    ctr = np.arange(total, dtype=np.uint64) - start[owner].astype(np.uint64)
+    blocks = np.empty((total, 16), dtype=np.uint8)
+    if total:
+        nonces = np.frombuffer(b"".join(ivs), dtype=np.uint8).reshape(-1, CTR_NONCE_SIZE)
+        blocks[:, :8] = nonces[owner]
+        blocks[:, 8:] = ctr.astype(">u8").view(np.uint8).reshape(-1, 8)
+    return _run(encrypt_blocks, blocks, round_keys)
+
+
+def _cbc_encrypt_lockstep(blocks, ivs, nblocks, start, round_keys):
+    out = np.empty_like(blocks)
+    # Message dài nhất đứng đầu -> ở bước t, các chuỗi còn chạy là 1 tiền tố
+    order = np.argsort(-nblocks, kind="stable")
+    sorted_len = nblocks[order]
+    sorted_start = start[order]
+    chain = np.frombuffer(b"".join(ivs), dtype=np.uint8).reshape(-1, 16)[order].copy()
+
+    steps = int(sorted_len[0]) if len(sorted_len) else 0
+    for t in range(steps):
+        active = int(np.count_nonzero(sorted_len > t))
+        idx = sorted_start[:active] + t
+        c = encrypt_blocks(blocks[idx] ^ chain[:active], round_keys)
+        chain[:active] = c
+        out[idx] = c
+    return out
+
+
+def _split(data: bytes, nblocks, start):
+    return [
+        data[16 * s: 16 * (s + n)]
+        for s, n in zip(start.tolist(), nblocks.tolist())
+    ]
+
+
+def aes_encrypt_many(messages, key: bytes, mode: str, ivs=None, as_hex: bool = False):
+    """
+    Mã hóa nhiều message dưới cùng 1 khóa.
+    messages: list bytes
+    mode: 'ECB', 'CBC' hoặc 'CTR'
+    ivs: list IV 16 byte (CBC) / nonce 8 byte (CTR), hoặc None -> tự sinh
+
+    Trả về list (ciphertext, iv) theo đúng thứ tự message, giống aes_encrypt;
+    ciphertext là bytes, hoặc chuỗi hex nếu as_hex=True.
+    """
+    mode = mode.upper()
+    if mode not in BATCH_MODES:
+        raise ValueError("AES mode must be ECB, CBC or CTR")
+
+    messages = list(messages)
+    count = len(messages)
+    ks = expand_key(key)
+    round_keys = words_to_round_keys(ks.ek)
+
+    if mode == "CTR":
+        if ivs is None:
+            ivs = _random_ivs(count, CTR_NONCE_SIZE)
+        _check_ivs(ivs, count, CTR_NONCE_SIZE, "nonce")
+        nblocks = np.array([-(-len(m) // 16) for m in messages], dtype=np.int64)
+        start, total = _layout(nblocks)
+        padded = [m + bytes(16 * n - len(m)) for m, n in zip(messages, nblocks.tolist())]
+        out = _to_blocks(padded) ^ _ctr_keystream(ivs, nblocks, start, total, round_keys)
+        cts = [
+            ct[:len(m)]
+            for ct, m in zip(_split(out.tobytes(), nblocks, start), messages)
+        ]
+    else:
+        padded = [pkcs7_pad(m, 16) for m in messages]
+        nblocks = np.array([len(p) // 16 for p in padded], dtype=np.int64)
+        start, total = _layout(nblocks)
+        blocks = _to_blocks(padded)
+
+        if mode == "ECB":
+            ivs = [None] * count
+            out = _run(encrypt_blocks, blocks, round_keys)
+        else:
+            if ivs is None:
+                ivs = _random_ivs(count, 16)
+            _check_ivs(ivs, count, 16, "IV")
+            out = _cbc_encrypt_lockstep(blocks, ivs, nblocks, start, round_keys)
+        cts = _split(out.tobytes(), nblocks, start)
+
+    if as_hex:
+        cts = [ct.hex() for ct in cts]
+    return list(zip(cts, ivs))
+
+
+def aes_decrypt_many(ciphertexts, key: bytes, mode: str, ivs=None):
+    """
+    Giải mã nhiều message dưới cùng 1 khóa.
+    ciphertexts: list bytes hoặc chuỗi hex
+    ivs: list IV (CBC) / nonce (CTR), bắt buộc với 2 mode này
+
+    Trả về list plaintext (bytes) theo đúng thứ tự.
+    """
+    mode = mode.upper()
+    if mode not in BATCH_MODES:
+        raise ValueError("AES mode must be ECB, CBC or CTR")
+
+    cts = [bytes.fromhex(c) if isinstance(c, str) else bytes(c) for c in ciphertexts]
+    count = len(cts)
+    ks = expand_key(key)
+
+    if mode in ("CBC", "CTR"):
+        if ivs is None:
+            raise ValueError(f"IVs are required for {mode} decryption")
+        _check_ivs(ivs, count, 16 if mode == "CBC" else CTR_NONCE_SIZE,
+                   "IV" if mode == "CBC" else "nonce")
+
+    if mode == "CTR":
+        round_keys = words_to_round_keys(ks.ek)
+        nblocks = np.array([-(-len(c) // 16) for c in cts], dtype=np.int64)
+        start, total = _layout(nblocks)
+        padded = [c + bytes(16 * n - len(c)) for c, n in zip(cts, nblocks.tolist())]
+        out = _to_blocks(padded) ^ _ctr_keystream(ivs, nblocks, start, total, round_keys)
+        return [
+            pt[:len(c)]
+            for pt, c in zip(_split(out.tobytes(), nblocks, start), cts)
+        ]
+
+    if any(len(c) == 0 or len(c) % 16 for c in cts):
+        raise ValueError("Ciphertext length must be a non-zero multiple of 16")
+
+    round_keys = words_to_round_keys(ks.dk)
+    nblocks = np.array([len(c) // 16 for c in cts], dtype=np.int64)
+    start, total = _layout(nblocks)
+    blocks = _to_blocks(cts)
+    out = _run(decrypt_blocks, blocks, round_keys)
+
+    if mode == "CBC":
+        # P_i = D(C_i) ^ C_{i-1}, block đầu mỗi message XOR với IV của nó
+        prev = np.empty_like(blocks)
+        prev[1:] = blocks[:-1]
+        prev[start] = np.frombuffer(b"".join(ivs), dtype=np.uint8).reshape(-1, 16)
+        out ^= prev
+
+    return [pt[:len(pt) - pt[-1]] for pt in _split(out.tobytes(), nblocks, start)]
+
+
+#  Mỗi block 1 khóa riêng (khóa theo tenant / theo dòng)
+def _multikey(blocks, keys, decrypt: bool):
+    blocks = list(blocks)
+    keys = [bytes(k) for k in keys]
+    if len(blocks) != len(keys):
+        raise ValueError(f"Expected {len(blocks)} keys, got {len(keys)}")
+    if any(len(b) != 16 for b in blocks):
+        raise ValueError("Every block must be 16 bytes")
+
+    out = [None] * len(blocks)
+    # Gom theo độ dài khóa (số round khác nhau), mỗi nhóm chạy 1 lượt vector hóa
+    groups = {}
+    for i, k in enumerate(keys):
+        groups.setdefault(len(k), []).append(i)
+
+    for idx in groups.values():
+        for c in range(0, len(idx), CHUNK_BLOCKS):
+            part = idx[c:c + CHUNK_BLOCKS]
+            round_keys = expand_keys([keys[i] for i in part])
+            data = _to_blocks([blocks[i] for i in part])
+            if decrypt:
+                res = decrypt_blocks(data, inverse_round_keys(round_keys))
+            else:
+                res = encrypt_blocks(data, round_keys)
+            res = res.tobytes()
+            for j, i in enumerate(part):
+                out[i] = res[16 * j:16 * j + 16]
+    return out
+
+
+def aes_encrypt_blocks_multikey(blocks, keys):
+    """
+    Mã hóa N block 16 byte, block i dùng khóa keys[i] (16/24/32 byte).
+    N khóa được mở rộng cùng lúc (expand_keys) và N block được mã hóa
+    trong 1 lượt, thay vì key_expansion + 1 lần gọi engine cho mỗi block.
+    Trả về list block đã mã hóa theo đúng thứ tự.
+    """
+    return _multikey(blocks, keys, decrypt=False)
+
+
+def aes_decrypt_blocks_multikey(blocks, keys):
+    """
+    Giải mã N block 16 byte, block i dùng khóa keys[i].
+    """
+    return _multikey(blocks, keys, decrypt=True)
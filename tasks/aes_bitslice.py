@@ -0,0 +1,319 @@
+import os
+import time
+import numpy as np
+from tasks.aes_block import aes_encrypt_block
+from tasks.aes_key_expansion import key_expansion
+from tasks.aes_ttable import round_keys_to_words, encrypt_block_words
+
+# AES bitsliced trên số nguyên Python (độ rộng tùy ý).
+# Batch N block được lưu thành 128 "slice": slice[8*i + j] là 1 số nguyên
+# N bit, bit k = bit j (j = 0 là bit cao nhất) của byte i trong block k.
+# Mỗi phép AND / XOR trên slice xử lý cùng lúc cả N block, và không có
+# phép tra bảng nào phụ thuộc dữ liệu (SubBytes là mạch Boolean).
+
+
+#  Chuyển đổi block <-> slice
+def blocks_to_slices(blocks):
+    """
+    blocks: mảng (N, 16) uint8 -> list 128 số nguyên N bit.
+    """
+    n = len(blocks)
+    bits = np.unpackbits(blocks, axis=1).T               # (128, N)
+    packed = np.packbits(bits, axis=1, bitorder="little")
+    return [int.from_bytes(row.tobytes(), "little") for row in packed], n
+
+
+def slices_to_blocks(slices, n):
+    """
+    list 128 số nguyên N bit -> mảng (N, 16) uint8.
+    """
+    nbytes = (n + 7) // 8
+    packed = np.frombuffer(
+        b"".join(s.to_bytes(nbytes, "little") for s in slices), dtype=np.uint8
+    ).reshape(128, nbytes)
+    bits = np.unpackbits(packed, axis=1, bitorder="little")[:, :n]
+    return np.packbits(bits.T, axis=1)
+
+
+#  SubBytes: mạch Boolean Boyar–Peralta (113 cổng XOR/AND/XNOR)
+def sbox_circuit(U0, U1, U2, U3, U4, U5, U6, U7, mask):
+    """
+    S-box AES cho 8 slice của 1 byte (U0 = bit cao nhất).
+    mask: số nguyên toàn bit 1 (độ rộng N), dùng cho phép NOT.
+    """
+    T1 = U0 ^ U3
+    T2 = U0 ^ U5
+    T3 = U0 ^ U6
+    T4 = U3 ^ U5
+    T5 = U4 ^ U6
+    T6 = T1 ^ T5
+    T7 = U1 ^ U2
+    T8 = U7 ^ T6
+    T9 = U7 ^ T7
+    T10 = T6 ^ T7
+    T11 = U1 ^ U5
+    T12 = U2 ^ U5
+    T13 = T3 ^ T4
+    T14 = T6 ^ T11
+    T15 = T5 ^ T11
+    T16 = T5 ^ T12
+    T17 = T9 ^ T16
+    T18 = U3 ^ U7
+    T19 = T7 ^ T18
+    T20 = T1 ^ T19
+    T21 = U6 ^ U7
+    T22 = T7 ^ T21
+    T23 = T2 ^ T22
+    T24 = T2 ^ T10
+    T25 = T20 ^ T17
+    T26 = T3 ^ T16
+    T27 = T1 ^ T12
+
+    M1 = T13 & T6
+    M2 = T23 & T8
+    M3 = T14 ^ M1
+    M4 = T19 & U7
+    M5 = M4 ^ M1
+    M6 = T3 & T16
+    M7 = T22 & T9
+    M8 = T26 ^ M6
+    M9 = T20 & T17
+    M10 = M9 ^ M6
+    M11 = T1 & T15
+    M12 = T4 & T27
+    M13 = M12 ^ M11
+    M14 = T2 & T10
+    M15 = M14 ^ M11
+    M16 = M3 ^ M2
+    M17 = M5 ^ T24
+    M18 = M8 ^ M7
+    M19 = M10 ^ M15
+    M20 = M16 ^ M13
+    M21 = M17 ^ M15
+    M22 = M18 ^ M13
+    M23 = M19 ^ T25
+    M24 = M22 ^ M23
+    M25 = M22 & M20
+    M26 = M21 ^ M25
+    M27 = M20 ^ M21
+    M28 = M23 ^ M25
+    M29 = M28 & M27
+    M30 = M26 & M24
+    M31 = M20 & M23
+    M32 = M27 & M31
+    M33 = M27 ^ M25
+    M34 = M21 & M22
+    M35 = M24 & M34
+    M36 = M24 ^ M25
+    M37 = M21 ^ M29
+    M38 = M32 ^ M33
+    M39 = M23 ^ M30
+    M40 = M35 ^ M36
+    M41 = M38 ^ M40
+    M42 = M37 ^ M39
+    M43 = M37 ^ M38
+    M44 = M39 ^ M40
+    M45 = M42 ^ M41
+    M46 = M44 & T6
+    M47 = M40 & T8
+    M48 = M39 & U7
+    M49 = M43 & T16
+    M50 = M38 & T9
+    M51 = M37 & T17
+    M52 = M42 & T15
+    M53 = M45 & T27
+    M54 = M41 & T10
+    M55 = M44 & T13
+    M56 = M40 & T23
+    M57 = M39 & T19
+    M58 = M43 & T3
+    M59 = M38 & T22
+    M60 = M37 & T20
+    M61 = M42 & T1
+    M62 = M45 & T4
+    M63 = M41 & T2
+
+    L0 = M61 ^ M62
+    L1 = M50 ^ M56
+    L2 = M46 ^ M48
+    L3 = M47 ^ M55
+    L4 = M54 ^ M58
+    L5 = M49 ^ M61
+    L6 = M62 ^ L5
+    L7 = M46 ^ L3
+    L8 = M51 ^ M59
+    L9 = M52 ^ M53
+    L10 = M53 ^ L4
+    L11 = M60 ^ L2
+    L12 = M48 ^ M51
+    L13 = M50 ^ L0
+    L14 = M52 ^ M61
+    L15 = M55 ^ L1
+    L16 = M56 ^ L0
+    L17 = M57 ^ L1
+    L18 = M58 ^ L8
+    L19 = M63 ^ L4
+    L20 = L0 ^ L1
+    L21 = L1 ^ L7
+    L22 = L3 ^ L12
+    L23 = L18 ^ L2
+    L24 = L15 ^ L9
+    L25 = L6 ^ L10
+    L26 = L7 ^ L9
+    L27 = L8 ^ L10
+    L28 = L11 ^ L14
+    L29 = L11 ^ L17
+
+    return (
+        L6 ^ L24,
+        L16 ^ L26 ^ mask,
+        L19 ^ L28 ^ mask,
+        L6 ^ L21,
+        L20 ^ L22,
+        L25 ^ L29,
+        L13 ^ L27 ^ mask,
+        L6 ^ L23 ^ mask,
+    )
+
+
+def sub_bytes(s, mask):
+    out = []
+    for i in range(0, 128, 8):
+        out.extend(sbox_circuit(*s[i:i+8], mask))
+    return out
+
+
+# ShiftRows: byte (r + 4c) mới = byte (r + 4*((c + r) % 4)) cũ -> chỉ đổi chỗ slice
+_SHIFT_ROWS = [
+    8 * (r + 4 * ((c + r) % 4)) + j
+    for c in range(4) for r in range(4) for j in range(8)
+]
+
+
+def shift_rows(s):
+    return [s[i] for i in _SHIFT_ROWS]
+
+
+def xtime(b):
+    """
+    xtime trên 8 slice của 1 byte: dịch trái 1 bit, nếu bit cao = 1 thì XOR 0x1B
+    (0x1B = bit 3, 4, 6, 7 tính từ bit cao nhất).
+    """
+    hi = b[0]
+    return [b[1], b[2], b[3], b[4] ^ hi, b[5] ^ hi, b[6], b[7] ^ hi, hi]
+
+
+def mix_columns(s):
+    out = []
+    for c in range(4):
+        a = [s[8 * (4 * c + r): 8 * (4 * c + r) + 8] for r in range(4)]
+        t = [a[0][j] ^ a[1][j] ^ a[2][j] ^ a[3][j] for j in range(8)]
+        for r in range(4):
+            x = xtime([a[r][j] ^ a[(r + 1) % 4][j] for j in range(8)])
+            out.extend(a[r][j] ^ t[j] ^ x[j] for j in range(8))
+    return out
+
+
+def add_round_key(s, key_bits, mask):
+    """
+    key_bits: danh sách vị trí slice có bit khóa = 1 (khóa giống nhau cho cả batch).
+    """
+    s = list(s)
+    for i in key_bits:
+        s[i] ^= mask
+    return s
+
+
+def _round_key_bits(round_keys):
+    """
+    round_keys (4×4, từ key_expansion) -> với mỗi round, list vị trí bit = 1.
+    """
+    out = []
+    for rk in round_keys:
+        bits = []
+        for c in range(4):
+            for r in range(4):
+                byte = rk[r][c]
+                for j in range(8):
+                    if (byte >> (7 - j)) & 1:
+                        bits.append(8 * (r + 4 * c) + j)
+        out.append(bits)
+    return out
+
+
+#  AES Encrypt nhiều block (bitsliced)
+def encrypt_slices(s, round_keys, mask):
+    key_bits = _round_key_bits(round_keys)
+    Nr = len(round_keys) - 1
+
+    s = add_round_key(s, key_bits[0], mask)
+    for rnd in range(1, Nr):
+        s = sub_bytes(s, mask)
+        s = shift_rows(s)
+        s = mix_columns(s)
+        s = add_round_key(s, key_bits[rnd], mask)
+
+    s = sub_bytes(s, mask)
+    s = shift_rows(s)
+    return add_round_key(s, key_bits[Nr], mask)
+
+
+def aes_encrypt_blocks(blocks, round_keys):
+    """
+    Phiên bản batch của aes_encrypt_block(block16, round_keys):
+    blocks là list các block 16 byte, trả về list block đã mã hóa (cùng thứ tự).
+    """
+    if not blocks:
+        return []
+    data = bitsliced_encrypt(b"".join(blocks), round_keys)
+    return [data[i:i+16] for i in range(0, len(data), 16)]
+
+
+def bitsliced_encrypt(data, round_keys) -> bytes:
+    """
+    Mã hóa (kiểu ECB, không padding) buffer có độ dài chia hết cho 16.
+    """
+    arr = np.frombuffer(data, dtype=np.uint8).reshape(-1, 16)
+    s, n = blocks_to_slices(arr)
+    mask = (1 << n) - 1
+    s = encrypt_slices(s, round_keys, mask)
+    return slices_to_blocks(s, n).tobytes()
+
+
+# BENCHMARK: điểm giao giữa per-block và bitsliced
+def main():
+    key = os.urandom(16)
+    round_keys = key_expansion(key)
+    ek = round_keys_to_words(round_keys)
+
+    print(f"{'batch':>6} {'reference':>12} {'ttable':>12} {'bitsliced':>12}   (µs / block)")
+    crossover = {"reference": None, "ttable": None}
+    for n in (1, 4, 16, 64, 128, 256, 512, 1024, 2048, 4096):
+        blocks = [os.urandom(16) for _ in range(n)]
+
+        t = time.perf_counter()
+        for b in blocks:
+            aes_encrypt_block(b, round_keys)
+        ref = (time.perf_counter() - t) / n * 1e6
+
+        t = time.perf_counter()
+        for b in blocks:
+            encrypt_block_words(b, ek)
+        ttab = (time.perf_counter() - t) / n * 1e6
+
+        t = time.perf_counter()
+        aes_encrypt_blocks(blocks, round_keys)
+        bs = (time.perf_counter() - t) / n * 1e6
+
+        for name, v in (("reference", ref), ("ttable", ttab)):
+            if crossover[name] is None and bs < v:
+                crossover[name] = n
+        print(f"{n:>6} {ref:>12.2f} {ttab:>12.2f} {bs:>12.2f}")
+
+    for name, n in crossover.items():
+        print(f"Bitsliced nhanh hơn {name} từ batch = {n}" if n else
+              f"Bitsliced không nhanh hơn {name} trong các batch đã đo")
+
+
+if __name__ == "__main__":
+    main()
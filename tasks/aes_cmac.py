@@ -0,0 +1,195 @@
+import hmac
+from functools import lru_cache
+from tasks.aes_key_expansion import KEY_CACHE_SIZE
+from tasks.aes_modes import expand_key
+from tasks.aes_stream import AESEncryptor, AESDecryptor
+from tasks.aes_ttable import BLOCK_WORDS, encrypt_words
+
+# AES-CMAC (NIST SP 800-38B) + CBC mã hóa kèm CMAC trong 1 lượt.
+# Block được mã hóa bằng engine T-table (kết quả giống hệt aes_encrypt_block);
+# subkey K1 / K2 được tính 1 lần cho mỗi khóa và cache cùng key schedule.
+
+CMAC_TAG_SIZE = 16
+CMAC_MIN_TAG_SIZE = 8
+
+_MASK128 = (1 << 128) - 1
+_RB = 0x87
+
+
+def _dbl(v: int) -> int:
+    """
+    Nhân đôi trong GF(2^128) (big-endian): dịch trái 1 bit, XOR Rb nếu tràn.
+    """
+    v <<= 1
+    return (v & _MASK128) ^ _RB if v >> 128 else v
+
+
+def _to_words(v: int):
+    return (v >> 96, (v >> 64) & 0xFFFFFFFF, (v >> 32) & 0xFFFFFFFF, v & 0xFFFFFFFF)
+
+
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def _cmac_key(key: bytes):
+    """
+    (ek, K1, K2) của khóa: L = E_K(0^128), K1 = dbl(L), K2 = dbl(K1).
+    """
+    ek = expand_key(key).ek
+    l = BLOCK_WORDS.pack(*encrypt_words(0, 0, 0, 0, ek))
+    k1 = _dbl(int.from_bytes(l, "big"))
+    return ek, k1, _dbl(k1)
+
+
+class AESCMAC:
+    """
+    CMAC tích lũy theo từng đoạn dữ liệu:
+      mac = AESCMAC(key)
+      mac.update(chunk1); mac.update(chunk2)
+      tag = mac.digest()
+    Block cuối luôn được giữ lại đến digest() (cần XOR với K1 / K2).
+    """
+
+    def __init__(self, key: bytes):
+        self._ek, self._k1, self._k2 = _cmac_key(bytes(key))
+        self._state = (0, 0, 0, 0)
+        self._buf = b""
+
+    def update(self, data):
+        buf = self._buf + bytes(data) if self._buf else bytes(data)
+        n = len(buf)
+        # giữ lại block cuối (kể cả khi đủ 16 byte)
+        keep = n - (n - 1) // 16 * 16 if n else 0
+        if n > keep:
+            self._absorb(memoryview(buf)[:n - keep])
+        self._buf = buf[n - keep:]
+
+    def _absorb(self, data):
+        ek = self._ek
+        s0, s1, s2, s3 = self._state
+        for w0, w1, w2, w3 in BLOCK_WORDS.iter_unpack(data):
+            s0, s1, s2, s3 = encrypt_words(s0 ^ w0, s1 ^ w1, s2 ^ w2, s3 ^ w3, ek)
+        self._state = (s0, s1, s2, s3)
+
+    def digest(self, tag_len: int = CMAC_TAG_SIZE) -> bytes:
+        if not CMAC_MIN_TAG_SIZE <= tag_len <= CMAC_TAG_SIZE:
+            raise ValueError("CMAC tag length must be between 8 and 16 bytes")
+
+        last = self._buf
+        if len(last) == 16:
+            m = int.from_bytes(last, "big") ^ self._k1
+        else:
+            padded = last + b"\x80" + bytes(15 - len(last))
+            m = int.from_bytes(padded, "big") ^ self._k2
+
+        s = self._state
+        w = _to_words(m)
+        tag = encrypt_words(s[0] ^ w[0], s[1] ^ w[1], s[2] ^ w[2], s[3] ^ w[3], self._ek)
+        return BLOCK_WORDS.pack(*tag)[:tag_len]
+
+    def verify(self, tag: bytes):
+        """
+        Raise ValueError nếu tag (8–16 byte) không khớp.
+        """
+        if not CMAC_MIN_TAG_SIZE <= len(tag) <= CMAC_TAG_SIZE:
+            raise ValueError("CMAC authentication failed: invalid tag length")
+        if not hmac.compare_digest(self.digest(len(tag)), tag):
+            raise ValueError("CMAC authentication failed: tag mismatch")
+
+
+def aes_cmac(data: bytes, key: bytes, tag_len: int = CMAC_TAG_SIZE) -> bytes:
+    mac = AESCMAC(key)
+    mac.update(data)
+    return mac.digest(tag_len)
+
+
+def aes_cmac_verify(data: bytes, key: bytes, tag: bytes):
+    mac = AESCMAC(key)
+    mac.update(data)
+    mac.verify(tag)
+
+
+#  CBC mã hóa + CMAC (encrypt-then-MAC) trong 1 lượt
+# Tag = CMAC_{mac_key}(IV || ciphertext). Mỗi chunk plaintext được mã hóa rồi
+# ciphertext vừa sinh ra được đưa ngay vào CMAC, nên dữ liệu chỉ đọc 1 lần.
+def _check_keys(enc_key: bytes, mac_key: bytes):
+    if bytes(enc_key) == bytes(mac_key):
+        raise ValueError("Encryption and MAC keys must be different")
+
+
+class AESCBCEncryptMAC:
+    """
+      enc = AESCBCEncryptMAC(enc_key, mac_key)
+      ct = enc.update(chunk1) + enc.update(chunk2) + enc.finalize()
+      iv, tag = enc.iv, enc.tag
+    """
+
+    def __init__(self, enc_key: bytes, mac_key: bytes, iv: bytes = None):
+        _check_keys(enc_key, mac_key)
+        self._cipher = AESEncryptor(enc_key, "CBC", iv)
+        self.iv = self._cipher.iv
+        self._mac = AESCMAC(mac_key)
+        self._mac.update(self.iv)
+        self.tag = None
+
+    def update(self, data) -> bytes:
+        out = self._cipher.update(data)
+        self._mac.update(out)
+        return out
+
+    def finalize(self) -> bytes:
+        out = self._cipher.finalize()
+        self._mac.update(out)
+        self.tag = self._mac.digest()
+        return out
+
+
+class AESCBCDecryptMAC:
+    """
+    Giải mã + kiểm tra tag trong 1 lượt. Plaintext trả về từ update() CHƯA
+    được xác thực cho đến khi finalize() chạy xong không lỗi.
+    """
+
+    def __init__(self, enc_key: bytes, mac_key: bytes, iv: bytes, tag: bytes = None):
+        _check_keys(enc_key, mac_key)
+        self._cipher = AESDecryptor(enc_key, "CBC", iv)
+        self.iv = iv
+        self._mac = AESCMAC(mac_key)
+        self._mac.update(iv)
+        self.tag = tag
+
+    def update(self, data) -> bytes:
+        self._mac.update(data)
+        return self._cipher.update(data)
+
+    def finalize(self, tag: bytes = None) -> bytes:
+        if tag is None:
+            tag = self.tag
+        if tag is None:
+            raise ValueError("CMAC tag is required for decryption")
+        self._mac.verify(tag)
+        return self._cipher.finalize()
+
+
+def aes_cbc_encrypt_cmac(plaintext: bytes, enc_key: bytes, mac_key: bytes, iv: bytes = None):
+    """
+    AES CBC + CMAC – mã hóa rồi xác thực IV || ciphertext
+    Trả về (ciphertext, iv, tag)
+    """
+    enc = AESCBCEncryptMAC(enc_key, mac_key, iv)
+    ct = enc.update(plaintext) + enc.finalize()
+    return ct, enc.iv, enc.tag
+
+
+def aes_cbc_decrypt_cmac(ciphertext: bytes, enc_key: bytes, mac_key: bytes,
+                         iv: bytes, tag: bytes) -> bytes:
+    """
+    AES CBC + CMAC – kiểm tra tag TRƯỚC rồi mới giải mã,
+    raise ValueError nếu tag không khớp
+    """
+    _check_keys(enc_key, mac_key)
+    mac = AESCMAC(mac_key)
+    mac.update(iv)
+    mac.update(ciphertext)
+    mac.verify(tag)
+
+    dec = AESDecryptor(enc_key, "CBC", iv)
+    return dec.update(ciphertext) + dec.finalize()
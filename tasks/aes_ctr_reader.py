@@ -0,0 +1,152 @@
+import os
+import mmap
+import threading
+from collections import OrderedDict
+from tasks.aes_modes import expand_key, ecb_encrypt_raw, CTR_NONCE_SIZE
+from tasks.aes_numpy import ctr_blocks
+
+# Đọc ngẫu nhiên (offset, length) từ file / buffer mã hóa AES-CTR.
+# Block i của ciphertext dùng counter `counter + i`, nên đọc 1 đoạn chỉ cần
+# sinh keystream cho đúng các block bị chạm tới, không đọc / giải mã gì khác.
+# Keystream của các block đọc gần đây được giữ trong LRU cache (theo block)
+# cho các đoạn được đọc lặp lại nhiều lần.
+
+CACHE_BLOCKS = 4096          # 64 KiB keystream
+
+
+class CTRReader:
+    """
+      with CTRReader("blob.enc", key, nonce) as r:
+          chunk = r.read_range(10_000_000, 4096)
+
+    source: đường dẫn file (được mmap) hoặc buffer bytes-like / mmap có sẵn.
+    data_offset: vị trí byte ciphertext đầu tiên trong source (vd. sau header).
+    counter: counter của block ciphertext đầu tiên (giống aes_ctr_encrypt).
+    """
+
+    def __init__(self, source, key: bytes, nonce: bytes, counter: int = 0,
+                 data_offset: int = 0, cache_blocks: int = CACHE_BLOCKS):
+        if len(nonce) != CTR_NONCE_SIZE:
+            raise ValueError("CTR nonce must be 8 bytes")
+
+        self._file = None
+        self._mmap = None
+        if isinstance(source, (str, os.PathLike)):
+            self._file = open(source, "rb")
+            size = os.fstat(self._file.fileno()).st_size
+            if size:
+                self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._data = memoryview(self._mmap) if self._mmap is not None else memoryview(b"")
+        else:
+            self._data = memoryview(source).cast("B")
+
+        if data_offset > len(self._data):
+            raise ValueError("data_offset is past the end of the source")
+
+        self._ks = expand_key(key)
+        self.nonce = bytes(nonce)
+        self.counter = counter
+        self.data_offset = data_offset
+        self.size = len(self._data) - data_offset
+        self._pos = 0
+
+        self._cache = OrderedDict()       # block index -> keystream 16 byte
+        self._cache_blocks = cache_blocks
+        self._lock = threading.Lock()
+
+    #  Keystream
+    def _counter_block(self, index: int) -> bytes:
+        return self.nonce + ((self.counter + index) % (1 << 64)).to_bytes(8, "big")
+
+    def _keystream_range(self, first: int, nblocks: int) -> bytes:
+        blocks = ctr_blocks(self.nonce, self.counter + first, nblocks).tobytes()
+        return ecb_encrypt_raw(blocks, self._ks)
+
+    def _keystream(self, first: int, nblocks: int) -> bytes:
+        """
+        Keystream của các block [first, first + nblocks).
+        """
+        if nblocks > self._cache_blocks:
+            # Đoạn lớn hơn cả cache: sinh thẳng 1 lượt, không cache
+            return self._keystream_range(first, nblocks)
+
+        cache = self._cache
+        with self._lock:
+            missing = [i for i in range(first, first + nblocks) if i not in cache]
+            if len(missing) == nblocks:
+                fresh = self._keystream_range(first, nblocks)
+            elif missing:
+                fresh = ecb_encrypt_raw(
+                    b"".join(self._counter_block(i) for i in missing), self._ks
+                )
+            for j, i in enumerate(missing):
+                cache[i] = fresh[16 * j:16 * j + 16]
+
+            parts = []
+            for i in range(first, first + nblocks):
+                cache.move_to_end(i)
+                parts.append(cache[i])
+            while len(cache) > self._cache_blocks:
+                cache.popitem(last=False)
+        return b"".join(parts)
+
+    #  Đọc
+    def read_range(self, offset: int, length: int) -> bytes:
+        """
+        Plaintext của đoạn [offset, offset + length) (bị cắt ở cuối dữ liệu).
+        """
+        if offset < 0 or length < 0:
+            raise ValueError("offset and length must be non-negative")
+        end = min(offset + length, self.size)
+        if offset >= end:
+            return b""
+
+        first = offset // 16
+        nblocks = -(-end // 16) - first
+        ks = self._keystream(first, nblocks)
+        skip = offset - 16 * first
+        n = end - offset
+
+        start = self.data_offset + offset
+        ct = self._data[start:start + n]
+        return (int.from_bytes(ct, "big") ^ int.from_bytes(ks[skip:skip + n], "big")).to_bytes(n, "big")
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            size = self.size - self._pos
+        out = self.read_range(self._pos, size)
+        self._pos += len(out)
+        return out
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        if whence == os.SEEK_CUR:
+            offset += self._pos
+        elif whence == os.SEEK_END:
+            offset += self.size
+        if offset < 0:
+            raise ValueError("negative seek position")
+        self._pos = offset
+        return offset
+
+    def tell(self) -> int:
+        return self._pos
+
+    def __len__(self):
+        return self.size
+
+    #  Đóng
+    def close(self):
+        self._data.release()
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
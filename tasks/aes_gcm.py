@@ -0,0 +1,278 @@
+import hmac
+from functools import lru_cache
+import numpy as np
+from tasks.aes_key_expansion import KEY_CACHE_SIZE
+from tasks.aes_modes import expand_key, ecb_encrypt_raw
+from tasks.drbg import random_bytes
+
+# AES-GCM (NIST SP 800-38D): CTR (counter 32-bit) + GHASH trong GF(2^128).
+# Block 16 byte được xem là số nguyên 128-bit big-endian; theo quy ước của
+# GCM, bit cao nhất là hệ số x^0, nên nhân với x = dịch phải 1 bit.
+
+GCM_NONCE_SIZE = 12
+GCM_TAG_SIZE = 16      # tag ngắn hơn (>= 12 byte) vẫn được chấp nhận khi giải mã
+
+_R = 0xE1 << 120      # x^128 = x^7 + x^2 + x + 1 (dạng bit phản xạ)
+_MASK32 = 0xFFFFFFFF
+
+
+def _mulx(v):
+    return (v >> 1) ^ _R if v & 1 else v >> 1
+
+
+def _build_reduction_table():
+    """
+    R[b] = phần tử b (8 bit thấp nhất) nhân x^8, dùng khi dịch Z sang phải 8 bit.
+    """
+    table = []
+    for b in range(256):
+        v = b
+        for _ in range(8):
+            v = _mulx(v)
+        table.append(v)
+    return table
+
+
+_GHASH_R = _build_reduction_table()
+
+
+def ghash_table(h: int):
+    """
+    Bảng Shoup 8-bit cho H: M[b] = (b đặt ở byte cao nhất) · H.
+    """
+    M = [0] * 256
+    v = h
+    for j in range(8):
+        M[0x80 >> j] = v
+        v = _mulx(v)
+    for i in range(1, 256):
+        low = i & -i
+        if i != low:
+            M[i] = M[i ^ low] ^ M[low]
+    return M
+
+
+class GHash:
+    """
+    GHASH_H tích lũy theo từng đoạn dữ liệu.
+    update() nhận dữ liệu độ dài bất kỳ và giữ lại phần lẻ;
+    pad() chèn 0 cho đủ block (ranh giới AAD / ciphertext).
+    """
+
+    def __init__(self, table):
+        self._M = table
+        self._y = 0
+        self._buf = b""
+
+    def _absorb(self, data):
+        # Y = (Y ^ X_i) · H, nhân theo Horner từ byte thấp đến byte cao
+        M, R = self._M, _GHASH_R
+        y = self._y
+        for i in range(0, len(data), 16):
+            x = y ^ int.from_bytes(data[i:i+16], "big")
+            z = M[x & 0xFF]
+            for _ in range(15):
+                x >>= 8
+                z = (z >> 8) ^ R[z & 0xFF] ^ M[x & 0xFF]
+            y = z
+        self._y = y
+
+    def update(self, data):
+        if self._buf:
+            data = self._buf + data
+        n = len(data) - len(data) % 16
+        self._absorb(memoryview(data)[:n])
+        self._buf = bytes(data[n:])
+
+    def pad(self):
+        if self._buf:
+            self._absorb(self._buf + bytes(16 - len(self._buf)))
+            self._buf = b""
+
+    def value(self) -> int:
+        return self._y
+
+
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def _gcm_key(key: bytes):
+    """
+    Tính 1 lần cho mỗi khóa: KeySchedule và bảng GHASH của H = E_K(0^128).
+    """
+    ks = expand_key(key)
+    h = int.from_bytes(ecb_encrypt_raw(bytes(16), ks), "big")
+    return ks, ghash_table(h)
+
+
+def _counter_blocks(prefix: bytes, ctr: int, nblocks: int) -> bytes:
+    """
+    Counter block GCM = prefix (12 byte) || ctr 32-bit (tăng mod 2^32).
+    """
+    blocks = np.empty((nblocks, 16), dtype=np.uint8)
+    blocks[:, :12] = np.frombuffer(prefix, dtype=np.uint8)
+    ctrs = (np.arange(nblocks, dtype=np.uint64) + ctr) & _MASK32
+    blocks[:, 12:] = ctrs.astype(">u4").view(np.uint8).reshape(-1, 4)
+    return blocks.tobytes()
+
+
+class _AESGCM:
+    def __init__(self, key: bytes, nonce: bytes):
+        if len(nonce) == 0:
+            raise ValueError("GCM nonce must not be empty")
+
+        self.nonce = nonce
+        self._ks, table = _gcm_key(bytes(key))
+
+        # J0: nonce 96-bit -> nonce || 0^31 || 1, ngược lại dùng GHASH(nonce)
+        if len(nonce) == GCM_NONCE_SIZE:
+            j0 = nonce + b"\x00\x00\x00\x01"
+        else:
+            g = GHash(table)
+            g.update(nonce)
+            g.pad()
+            g.update(bytes(8) + (len(nonce) * 8).to_bytes(8, "big"))
+            j0 = g.value().to_bytes(16, "big")
+
+        self._j0 = j0
+        self._prefix = j0[:12]
+        self._ctr = (int.from_bytes(j0[12:], "big") + 1) & _MASK32
+        self._keystream = b""
+        self._ghash = GHash(table)
+        self._aad_len = 0
+        self._data_len = 0
+        self._in_data = False
+        self._finalized = False
+
+    def _check(self):
+        if self._finalized:
+            raise ValueError("Context already finalized")
+
+    def update_aad(self, data):
+        """
+        Thêm AAD (dữ liệu chỉ xác thực, không mã hóa); gọi trước update().
+        """
+        self._check()
+        if self._in_data:
+            raise ValueError("AAD must be supplied before data")
+        self._ghash.update(data)
+        self._aad_len += len(data)
+
+    def _xor_keystream(self, data) -> bytes:
+        n = len(data)
+        if n == 0:
+            return b""
+
+        ks = self._keystream
+        need = n - len(ks)
+        if need > 0:
+            nblocks = -(-need // 16)
+            ctr_bytes = _counter_blocks(self._prefix, self._ctr, nblocks)
+            ks += ecb_encrypt_raw(ctr_bytes, self._ks)
+            self._ctr = (self._ctr + nblocks) & _MASK32
+
+        self._keystream = ks[n:]
+        return (int.from_bytes(data, "big") ^ int.from_bytes(ks[:n], "big")).to_bytes(n, "big")
+
+    def _start_data(self):
+        if not self._in_data:
+            self._ghash.pad()
+            self._in_data = True
+
+    def _tag(self) -> bytes:
+        self._start_data()
+        self._ghash.pad()
+        self._ghash.update(
+            (self._aad_len * 8).to_bytes(8, "big") + (self._data_len * 8).to_bytes(8, "big")
+        )
+        s = int.from_bytes(ecb_encrypt_raw(self._j0, self._ks), "big")
+        return (s ^ self._ghash.value()).to_bytes(16, "big")
+
+
+class AESGCMEncryptor(_AESGCM):
+    """
+    Mã hóa + xác thực AES-GCM trong 1 lượt:
+      enc = AESGCMEncryptor(key)
+      enc.update_aad(header)
+      ct = enc.update(chunk1) + enc.update(chunk2) + enc.finalize()
+      tag = enc.tag
+    Mỗi chunk được mã hóa rồi đưa ngay vào GHASH, không cần đọc lại dữ liệu.
+    Nếu nonce không cung cấp -> tự sinh nonce ngẫu nhiên 12 byte.
+    """
+
+    def __init__(self, key: bytes, nonce: bytes = None):
+        if nonce is None:
+            nonce = random_bytes(GCM_NONCE_SIZE)
+        super().__init__(key, nonce)
+        self.tag = None
+
+    def update(self, data) -> bytes:
+        self._check()
+        self._start_data()
+        out = self._xor_keystream(data)
+        self._ghash.update(out)
+        self._data_len += len(out)
+        return out
+
+    def finalize(self) -> bytes:
+        self._check()
+        self.tag = self._tag()
+        self._finalized = True
+        return b""
+
+
+class AESGCMDecryptor(_AESGCM):
+    """
+    Giải mã + kiểm tra tag AES-GCM.
+    Plaintext trả về từ update() CHƯA được xác thực cho đến khi finalize()
+    chạy xong không lỗi.
+    """
+
+    def __init__(self, key: bytes, nonce: bytes, tag: bytes = None):
+        super().__init__(key, nonce)
+        self.tag = tag
+
+    def update(self, data) -> bytes:
+        self._check()
+        self._start_data()
+        self._ghash.update(data)
+        self._data_len += len(data)
+        return self._xor_keystream(data)
+
+    def finalize(self, tag: bytes = None) -> bytes:
+        self._check()
+        if tag is None:
+            tag = self.tag
+        if tag is None:
+            raise ValueError("GCM tag is required for decryption")
+
+        expected = self._tag()
+        self._finalized = True
+        if len(tag) < 12 or not hmac.compare_digest(expected[:len(tag)], tag):
+            raise ValueError("GCM authentication failed: tag mismatch")
+        return b""
+
+
+#  API 1 lần gọi
+def aes_gcm_encrypt(plaintext: bytes, key: bytes, nonce: bytes = None, aad: bytes = b""):
+    """
+    AES GCM mode – mã hóa + xác thực
+    Trả về (ciphertext, tag, nonce)
+    """
+    enc = AESGCMEncryptor(key, nonce)
+    if aad:
+        enc.update_aad(aad)
+    ct = enc.update(plaintext)
+    enc.finalize()
+    return ct, enc.tag, enc.nonce
+
+
+def aes_gcm_decrypt(ciphertext: bytes, key: bytes, nonce: bytes, tag: bytes,
+                    aad: bytes = b"") -> bytes:
+    """
+    AES GCM mode – giải mã, raise ValueError nếu tag không khớp
+    """
+    dec = AESGCMDecryptor(key, nonce, tag)
+    if aad:
+        dec.update_aad(aad)
+    pt = dec.update(ciphertext)
+    dec.finalize()
+    return pt
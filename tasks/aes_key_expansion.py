@@ -1,4 +1,7 @@
-from tasks.aes_tables import SBOX, RCON
+from array import array
+from collections import namedtuple
+from functools import lru_cache
+from tasks.aes_tables import SBOX, RCON, TD0, TD1, TD2, TD3
 
 # Các hàm xử lý Word cho Key Expansion
 def sub_word(word):
@@ -83,3 +86,99 @@ def key_expansion(key_bytes):
         round_keys.append(state)
 
     return round_keys
+
+
+#  KEY SCHEDULE DẠNG WORD + CACHE
+# Word 32-bit big-endian: byte đầu của word ở 8 bit cao nhất.
+def sub_word32(w):
+    return (
+        (SBOX[w >> 24] << 24) | (SBOX[(w >> 16) & 0xFF] << 16) |
+        (SBOX[(w >> 8) & 0xFF] << 8) | SBOX[w & 0xFF]
+    )
+
+
+def rot_word32(w):
+    return ((w << 8) | (w >> 24)) & 0xFFFFFFFF
+
+
+def key_expansion_words(key_bytes):
+    """
+    Giống key_expansion() nhưng trả về mảng phẳng 4*(Nr+1) word 32-bit:
+    round r chiếm word [4r, 4r+4), word c = cột c của round key.
+    """
+    key_len = len(key_bytes)
+    if key_len not in (16, 24, 32):
+        raise ValueError("AES key must be 128/192/256 bits (16/24/32 bytes).")
+
+    Nk = key_len // 4
+    Nr = {16:10, 24:12, 32:14}[key_len]
+
+    w = [int.from_bytes(key_bytes[4*i : 4*(i+1)], "big") for i in range(Nk)]
+
+    for i in range(Nk, 4 * (Nr + 1)):
+        temp = w[i - 1]
+
+        if i % Nk == 0:
+            temp = sub_word32(rot_word32(temp)) ^ (RCON[i // Nk] << 24)
+
+        elif Nk == 8 and (i % Nk == 4):
+            temp = sub_word32(temp)
+
+        w.append(w[i - Nk] ^ temp)
+
+    return array("I", w)
+
+
+def inv_mix_word(w):
+    """
+    InvMixColumns cho 1 word, tính qua Td[SBOX[x]] (Td đã chứa INV_SBOX).
+    """
+    return (
+        TD0[SBOX[w >> 24]] ^ TD1[SBOX[(w >> 16) & 0xFF]] ^
+        TD2[SBOX[(w >> 8) & 0xFF]] ^ TD3[SBOX[w & 0xFF]]
+    )
+
+
+def inverse_key_words(ek):
+    """
+    Round key cho "equivalent inverse cipher" (FIPS-197 §5.3.5):
+      - đảo thứ tự các round
+      - áp dụng InvMixColumns cho round 1..Nr-1
+    Nhờ đó giải mã có cùng cấu trúc round với mã hóa
+    (InvSubBytes, InvShiftRows, InvMixColumns, AddRoundKey).
+    """
+    Nr = len(ek) // 4 - 1
+    dk = array("I", ek[4*Nr : 4*Nr + 4])
+    for rnd in range(Nr - 1, 0, -1):
+        dk.extend(inv_mix_word(w) for w in ek[4*rnd : 4*rnd + 4])
+    dk.extend(ek[0:4])
+    return dk
+
+
+# Schedule đã mở rộng của 1 khóa:
+#   key: bytes khóa gốc, nr: số vòng
+#   ek / dk: round key dạng word cho mã hóa / giải mã (equivalent inverse)
+KeySchedule = namedtuple("KeySchedule", "key nr ek dk")
+
+# Số khóa giữ trong cache LRU
+KEY_CACHE_SIZE = 256
+
+
+def get_key_schedule(key_bytes) -> KeySchedule:
+    """
+    Trả về KeySchedule của khóa, lấy từ cache LRU nếu đã mở rộng trước đó.
+    """
+    return _cached_key_schedule(bytes(key_bytes))
+
+
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def _cached_key_schedule(key_bytes: bytes) -> KeySchedule:
+    ek = key_expansion_words(key_bytes)
+    return KeySchedule(key_bytes, len(ek) // 4 - 1, ek, inverse_key_words(ek))
+
+
+def clear_key_cache():
+    """
+    Xóa toàn bộ schedule đã cache (vd. khi hủy khóa).
+    """
+    _cached_key_schedule.cache_clear()
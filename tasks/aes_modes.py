@@ -1,6 +1,77 @@
-import os
+from functools import partial
 from tasks.aes_block import aes_encrypt_block, aes_decrypt_block
-from tasks.aes_key_expansion import key_expansion
+from tasks.aes_key_expansion import key_expansion, get_key_schedule
+from tasks.aes_ttable import (
+    BLOCK_WORDS, encrypt_words, decrypt_words,
+    encrypt_block_words, decrypt_block_words
+)
+from tasks.aes_numpy import (
+    ecb_encrypt_bytes, ecb_decrypt_bytes,
+    ctr_xor_bytes, ctr_xor_inplace,
+    cbc_decrypt_bytes, cbc_decrypt_inplace,
+    as_array, ecb_encrypt_inplace, ecb_decrypt_inplace,
+    xts_inplace, cfb_decrypt_inplace, cfb8_decrypt_inplace
+)
+from tasks.parallel import default_workers, split_ranges, run_in_shared_memory
+from tasks.drbg import random_bytes
+
+# Block engine dùng cho các mode:
+#   "ttable"    – state 4 word 32-bit + bảng Te/Td (mặc định, nhanh)
+#   "reference" – state 4×4 trong aes_block / aes_core (bản gốc, dễ đọc)
+BLOCK_BACKENDS = ("ttable", "reference")
+BLOCK_BACKEND = "ttable"
+
+# Với backend "ttable", buffer từ ngưỡng này trở lên được xử lý
+# bằng engine NumPy (tất cả block cùng lúc) thay vì từng block.
+NUMPY_MIN_BYTES = 512
+
+# Từ ngưỡng này trở lên, các mode không phụ thuộc chuỗi (CTR, CBC giải mã)
+# được chia thành các đoạn căn 16 byte và chạy song song trên process pool.
+PARALLEL_MIN_BYTES = 4 << 20
+
+# CTR: counter block = nonce (8 byte) || counter 64-bit big-endian
+CTR_NONCE_SIZE = 8
+
+# XTS: kích thước data unit (sector) mặc định
+XTS_SECTOR_SIZE = 512
+
+
+def set_block_backend(name: str):
+    """
+    Chọn block engine cho aes_modes. Hai engine cho kết quả giống hệt nhau.
+    """
+    global BLOCK_BACKEND
+    if name not in BLOCK_BACKENDS:
+        raise ValueError("AES block backend must be one of: " + ", ".join(BLOCK_BACKENDS))
+    BLOCK_BACKEND = name
+
+
+def expand_key(key: bytes):
+    """
+    KeySchedule của khóa (ek / dk dạng word, xem get_key_schedule).
+    Schedule được cache LRU theo bytes khóa, nên gọi lại với cùng khóa
+    không phải mở rộng khóa lần nữa.
+    """
+    return get_key_schedule(key)
+
+
+def _use_numpy(nbytes: int) -> bool:
+    return BLOCK_BACKEND == "ttable" and nbytes >= NUMPY_MIN_BYTES
+
+
+def _block_ciphers(ks):
+    """
+    Trả về (encrypt_block, decrypt_block): bytes16 -> bytes16 theo backend đang chọn.
+    ks: kết quả expand_key().
+    """
+    if BLOCK_BACKEND == "reference":
+        round_keys = key_expansion(ks.key)
+        return (
+            partial(aes_encrypt_block, round_keys=round_keys),
+            partial(aes_decrypt_block, round_keys=round_keys),
+        )
+    return partial(encrypt_block_words, ek=ks.ek), partial(decrypt_block_words, dk=ks.dk)
+
 
 # Padding PKCS#7
 def pkcs7_pad(data: bytes, block_size=16) -> bytes:
@@ -12,6 +83,120 @@ def pkcs7_unpad(data: bytes) -> bytes:
     pad = data[-1]
     return data[:-pad]
 
+# Các hàm "raw": dữ liệu đã căn 16 byte, không padding, khóa đã mở rộng.
+# Dùng chung cho các hàm mode bên dưới và các context mã hóa luồng.
+def ecb_encrypt_raw(data, ks) -> bytes:
+    if _use_numpy(len(data)):
+        return ecb_encrypt_bytes(data, ks.ek)
+
+    encrypt_block, _ = _block_ciphers(ks)
+    return b"".join([encrypt_block(data[i:i+16]) for i in range(0, len(data), 16)])
+
+
+def ecb_decrypt_raw(data, ks) -> bytes:
+    if _use_numpy(len(data)):
+        return ecb_decrypt_bytes(data, ks.dk)
+
+    _, decrypt_block = _block_ciphers(ks)
+    return b"".join([decrypt_block(data[i:i+16]) for i in range(0, len(data), 16)])
+
+
+def cbc_encrypt_raw(data, ks, iv: bytes) -> bytes:
+    """
+    CBC mã hóa luôn tuần tự: C_i phụ thuộc C_{i-1}.
+    """
+    encrypt_block, _ = _block_ciphers(ks)
+
+    out = []
+    prev = iv
+
+    for i in range(0, len(data), 16):
+        block = data[i:i+16]
+        x = bytes([a ^ b for a, b in zip(block, prev)])
+        prev = encrypt_block(x)
+        out.append(prev)
+
+    return b"".join(out)
+
+
+def cbc_decrypt_raw(data, ks, iv: bytes, workers: int = 1) -> bytes:
+    """
+    P_i = D(C_i) XOR C_{i-1}: các block độc lập với nhau, nên với buffer lớn
+    toàn bộ block được giải mã theo batch (NumPy, và song song trên nhiều
+    process nếu đủ lớn) rồi XOR với ciphertext dịch 1 block.
+    """
+    n = len(data)
+    if _use_numpy(n):
+        dk = ks.dk
+        if workers > 1 and n >= PARALLEL_MIN_BYTES:
+            ranges = split_ranges(n, workers, 16)
+            prevs = [
+                (iv if start == 0 else bytes(data[start-16:start]),)
+                for start, _ in ranges
+            ]
+            return run_in_shared_memory(
+                data, _cbc_decrypt_range, ranges, (dk,), workers, prevs
+            )
+        return cbc_decrypt_bytes(data, dk, iv)
+
+    _, decrypt_block = _block_ciphers(ks)
+
+    out = []
+    prev = iv
+
+    for i in range(0, n, 16):
+        block = data[i:i+16]
+        dec = decrypt_block(block)
+        out.append(bytes([a ^ b for a, b in zip(dec, prev)]))
+        prev = block
+
+    return b"".join(out)
+
+
+def _cbc_decrypt_range(buf, start, dk, prev):
+    """
+    Worker: giải mã CBC đoạn [start, start+len(buf)) trong shared memory.
+    prev là block ciphertext ngay trước đoạn (lấy trước khi chia việc).
+    """
+    cbc_decrypt_inplace(buf, dk, prev)
+
+
+def ctr_xor(data, ks, nonce: bytes, counter: int, workers: int = 1) -> bytes:
+    """
+    data XOR keystream CTR (độ dài bất kỳ); block đầu dùng counter `counter`.
+    """
+    if len(nonce) != CTR_NONCE_SIZE:
+        raise ValueError("CTR nonce must be 8 bytes")
+
+    n = len(data)
+    if _use_numpy(n):
+        ek = ks.ek
+        if workers > 1 and n >= PARALLEL_MIN_BYTES:
+            ranges = split_ranges(n, workers, 16)
+            return run_in_shared_memory(
+                data, _ctr_range, ranges, (ek, nonce, counter), workers
+            )
+        return ctr_xor_bytes(data, ek, nonce, counter)
+
+    encrypt_block, _ = _block_ciphers(ks)
+
+    out = []
+    for i in range(0, n, 16):
+        block = data[i:i+16]
+        ctr_block = nonce + ((counter + i // 16) % (1 << 64)).to_bytes(8, "big")
+        ks_block = encrypt_block(ctr_block)
+        out.append(bytes([a ^ b for a, b in zip(block, ks_block)]))
+
+    return b"".join(out)
+
+
+def _ctr_range(buf, start, ek, nonce, counter):
+    """
+    Worker: XOR keystream vào đoạn [start, start+len(buf)) trong shared memory.
+    """
+    ctr_xor_inplace(buf, ek, nonce, counter + start // 16)
+
+
 # MODE ECB
 def aes_ecb_encrypt(plaintext: bytes, key: bytes) -> bytes:
     """
@@ -19,29 +204,14 @@ def aes_ecb_encrypt(plaintext: bytes, key: bytes) -> bytes:
     plaintext: bytes
     key: 16/24/32 byte
     """
-    round_keys = key_expansion(key)
-    padded = pkcs7_pad(plaintext, 16)
-
-    ciphertext = b""
-    for i in range(0, len(padded), 16):
-        block = padded[i:i+16]
-        ciphertext += aes_encrypt_block(block, round_keys)
-
-    return ciphertext
+    return ecb_encrypt_raw(pkcs7_pad(plaintext, 16), expand_key(key))
 
 
 def aes_ecb_decrypt(ciphertext: bytes, key: bytes) -> bytes:
     """
     AES ECB mode – giải mã
     """
-    round_keys = key_expansion(key)
-
-    plaintext = b""
-    for i in range(0, len(ciphertext), 16):
-        block = ciphertext[i:i+16]
-        plaintext += aes_decrypt_block(block, round_keys)
-
-    return pkcs7_unpad(plaintext)
+    return pkcs7_unpad(ecb_decrypt_raw(ciphertext, expand_key(key)))
 
 
 # MODE CBC
@@ -52,37 +222,586 @@ def aes_cbc_encrypt(plaintext: bytes, key: bytes, iv: bytes = None):
     Trả về (ciphertext, iv)
     """
     if iv is None:
-        iv = os.urandom(16)
+        iv = random_bytes(16)
 
-    round_keys = key_expansion(key)
-    padded = pkcs7_pad(plaintext, 16)
+    return cbc_encrypt_raw(pkcs7_pad(plaintext, 16), expand_key(key), iv), iv
 
-    ciphertext = b""
-    prev = iv
 
-    for i in range(0, len(padded), 16):
-        block = padded[i:i+16]
-        x = bytes([a ^ b for a, b in zip(block, prev)])
-        c = aes_encrypt_block(x, round_keys)
-        ciphertext += c
-        prev = c
+def aes_cbc_decrypt(ciphertext: bytes, key: bytes, iv: bytes, workers: int = None) -> bytes:
+    """
+    AES CBC mode – giải mã (batch / song song với buffer lớn, xem cbc_decrypt_raw)
+    """
+    if workers is None:
+        workers = default_workers()
+
+    return pkcs7_unpad(cbc_decrypt_raw(ciphertext, expand_key(key), iv, workers))
+
+
+# MODE CTR
+def aes_ctr_encrypt(plaintext: bytes, key: bytes, nonce: bytes = None,
+                    counter: int = 0, workers: int = None):
+    """
+    AES CTR mode – mã hóa (không padding)
+    Counter block = nonce (8 byte) || counter 64-bit big-endian.
+    Nếu nonce không cung cấp -> tự sinh nonce ngẫu nhiên 8 byte.
+    Trả về (ciphertext, nonce)
+    """
+    if nonce is None:
+        nonce = random_bytes(CTR_NONCE_SIZE)
+
+    if workers is None:
+        workers = default_workers()
+
+    return ctr_xor(plaintext, expand_key(key), nonce, counter, workers), nonce
+
+
+def aes_ctr_decrypt(ciphertext: bytes, key: bytes, nonce: bytes,
+                    counter: int = 0, workers: int = None) -> bytes:
+    """
+    AES CTR mode – giải mã (giống hệt mã hóa)
+    """
+    if workers is None:
+        workers = default_workers()
+
+    return ctr_xor(ciphertext, expand_key(key), nonce, counter, workers)
+
+
+def _xor_bytes(a, b) -> bytes:
+    """
+    a XOR b (cùng độ dài) trong 1 phép toán số nguyên lớn.
+    """
+    n = len(a)
+    return (int.from_bytes(a, "big") ^ int.from_bytes(b, "big")).to_bytes(n, "big")
+
+
+# MODE OFB
+# O_1 = E(IV), O_i = E(O_{i-1}); C = P XOR O. Keystream không phụ thuộc dữ liệu,
+# nên có thể sinh trước (ngoài critical path), khi mã hóa chỉ còn 1 phép XOR.
+def ofb_keystream_raw(ks, prev: bytes, nblocks: int) -> bytes:
+    """
+    nblocks block keystream tiếp theo sau block output `prev` (IV ở đầu message).
+    """
+    if BLOCK_BACKEND == "reference":
+        encrypt_block, _ = _block_ciphers(ks)
+        out = []
+        for _ in range(nblocks):
+            prev = encrypt_block(prev)
+            out.append(prev)
+        return b"".join(out)
+
+    ek = ks.ek
+    out = bytearray(16 * nblocks)
+    pack_into = BLOCK_WORDS.pack_into
+    s = BLOCK_WORDS.unpack(prev)
+    for off in range(0, 16 * nblocks, 16):
+        s = encrypt_words(*s, ek)
+        pack_into(out, off, *s)
+    return bytes(out)
+
+
+class OFBKeystream:
+    """
+    Keystream OFB sinh trước vào 1 buffer dùng lại được:
+      stream = OFBKeystream(key, iv)
+      stream.generate(1 << 20)      # lúc rảnh / trên thread nền
+      ct = stream.xor(plaintext)    # chỉ còn 1 phép XOR
+    xor() tự sinh thêm nếu keystream có sẵn không đủ; phần đã dùng được bỏ
+    khỏi buffer ở lần generate() kế tiếp. Mỗi object chỉ dùng cho 1 luồng
+    dữ liệu (1 IV) và 1 thread tại 1 thời điểm.
+    """
+
+    def __init__(self, key: bytes, iv: bytes = None):
+        if iv is None:
+            iv = random_bytes(16)
+        if len(iv) != 16:
+            raise ValueError("OFB IV must be 16 bytes")
+        self.iv = iv
+        self._ks = expand_key(key)
+        self._last = iv
+        self._buf = bytearray()
+        self._pos = 0
+
+    @property
+    def available(self) -> int:
+        return len(self._buf) - self._pos
+
+    def generate(self, nbytes: int):
+        """
+        Đảm bảo có sẵn ít nhất nbytes byte keystream chưa dùng.
+        """
+        need = nbytes - self.available
+        if need <= 0:
+            return
+        if self._pos:
+            del self._buf[:self._pos]
+            self._pos = 0
+        block = ofb_keystream_raw(self._ks, self._last, -(-need // 16))
+        self._last = block[-16:]
+        self._buf += block
+
+    def xor(self, data) -> bytes:
+        n = len(data)
+        self.generate(n)
+        ks = self._buf[self._pos:self._pos + n]
+        self._pos += n
+        return _xor_bytes(data, ks)
 
-    return ciphertext, iv
+
+def aes_ofb_keystream(key: bytes, iv: bytes, nbytes: int) -> bytes:
+    """
+    nbytes byte keystream OFB đầu tiên cho (key, iv), dùng lại cho
+    aes_ofb_encrypt(..., keystream=...).
+    """
+    if len(iv) != 16:
+        raise ValueError("OFB IV must be 16 bytes")
+    return ofb_keystream_raw(expand_key(key), iv, -(-nbytes // 16))[:nbytes]
+
+
+def aes_ofb_encrypt(plaintext: bytes, key: bytes, iv: bytes = None, keystream=None):
+    """
+    AES OFB mode – mã hóa (không padding)
+    keystream: keystream sinh trước bằng aes_ofb_keystream(key, iv, n), n >= len(plaintext)
+    Trả về (ciphertext, iv)
+    """
+    if iv is None:
+        if keystream is not None:
+            raise ValueError("OFB IV is required with a precomputed keystream")
+        iv = random_bytes(16)
+    n = len(plaintext)
+    if keystream is None:
+        keystream = aes_ofb_keystream(key, iv, n)
+    elif len(keystream) < n:
+        raise ValueError("OFB keystream is shorter than the data")
+    return _xor_bytes(plaintext, keystream[:n]), iv
 
 
-def aes_cbc_decrypt(ciphertext: bytes, key: bytes, iv: bytes) -> bytes:
+def aes_ofb_decrypt(ciphertext: bytes, key: bytes, iv: bytes, keystream=None) -> bytes:
     """
-    AES CBC mode – giải mã
+    AES OFB mode – giải mã (giống hệt mã hóa)
     """
-    round_keys = key_expansion(key)
+    return aes_ofb_encrypt(ciphertext, key, iv, keystream)[0]
+
+
+# MODE CFB (CFB-128 và CFB-8, không padding)
+# Mã hóa tuần tự (C_i phụ thuộc C_{i-1}); giải mã thì keystream chỉ phụ thuộc
+# ciphertext đã có -> batch NumPy và song song như CBC giải mã.
+def cfb_encrypt_raw(data, ks, iv: bytes) -> bytes:
+    encrypt_block, _ = _block_ciphers(ks)
 
-    plaintext = b""
+    out = []
     prev = iv
 
-    for i in range(0, len(ciphertext), 16):
-        block = ciphertext[i:i+16]
-        dec = aes_decrypt_block(block, round_keys)
-        plaintext += bytes([a ^ b for a, b in zip(dec, prev)])
+    for i in range(0, len(data), 16):
+        block = data[i:i+16]
+        prev = bytes([a ^ b for a, b in zip(block, encrypt_block(prev))])
+        out.append(prev)
+
+    return b"".join(out)
+
+
+def cfb_decrypt_raw(data, ks, iv: bytes, workers: int = 1) -> bytes:
+    n = len(data)
+    if _use_numpy(n):
+        ek = ks.ek
+        if workers > 1 and n >= PARALLEL_MIN_BYTES:
+            ranges = split_ranges(n, workers, 16)
+            prevs = [
+                (iv if start == 0 else bytes(data[start-16:start]),)
+                for start, _ in ranges
+            ]
+            return run_in_shared_memory(
+                data, _cfb_decrypt_range, ranges, (ek,), workers, prevs
+            )
+        buf = bytearray(data)
+        cfb_decrypt_inplace(as_array(buf, n), ek, iv)
+        return bytes(buf)
+
+    encrypt_block, _ = _block_ciphers(ks)
+
+    out = []
+    prev = iv
+
+    for i in range(0, n, 16):
+        block = data[i:i+16]
+        out.append(bytes([a ^ b for a, b in zip(block, encrypt_block(prev))]))
         prev = block
 
-    return pkcs7_unpad(plaintext)
+    return b"".join(out)
+
+
+def _cfb_decrypt_range(buf, start, ek, prev):
+    cfb_decrypt_inplace(buf, ek, prev)
+
+
+def cfb8_encrypt_raw(data, ks, iv: bytes) -> bytes:
+    """
+    CFB-8: mỗi byte cần 1 lần mã hóa block (thanh ghi dịch 16 byte).
+    """
+    encrypt_block, _ = _block_ciphers(ks)
+
+    out = bytearray(len(data))
+    reg = bytes(iv)
+
+    for i, p in enumerate(data):
+        c = p ^ encrypt_block(reg)[0]
+        out[i] = c
+        reg = reg[1:] + bytes((c,))
+
+    return bytes(out)
+
+
+def cfb8_decrypt_raw(data, ks, iv: bytes, workers: int = 1) -> bytes:
+    n = len(data)
+    if _use_numpy(16 * n):
+        ek = ks.ek
+        if workers > 1 and 16 * n >= PARALLEL_MIN_BYTES:
+            ranges = split_ranges(n, workers, 1)
+            # Mỗi đoạn chỉ cần 16 byte ciphertext (hoặc IV) đứng ngay trước nó
+            prevs = [
+                ((bytes(iv) + bytes(data[max(0, start-16):start]))[-16:],)
+                for start, _ in ranges
+            ]
+            return run_in_shared_memory(
+                data, _cfb8_decrypt_range, ranges, (ek,), workers, prevs
+            )
+        buf = bytearray(data)
+        cfb8_decrypt_inplace(as_array(buf, n), ek, iv)
+        return bytes(buf)
+
+    encrypt_block, _ = _block_ciphers(ks)
+
+    out = bytearray(n)
+    reg = bytes(iv)
+
+    for i, c in enumerate(data):
+        out[i] = c ^ encrypt_block(reg)[0]
+        reg = reg[1:] + bytes((c,))
+
+    return bytes(out)
+
+
+def _cfb8_decrypt_range(buf, start, ek, prev):
+    cfb8_decrypt_inplace(buf, ek, prev)
+
+
+def aes_cfb_encrypt(plaintext: bytes, key: bytes, iv: bytes = None):
+    """
+    AES CFB-128 mode – mã hóa (không padding)
+    Trả về (ciphertext, iv)
+    """
+    if iv is None:
+        iv = random_bytes(16)
+    if len(iv) != 16:
+        raise ValueError("CFB IV must be 16 bytes")
+    return cfb_encrypt_raw(plaintext, expand_key(key), iv), iv
+
+
+def aes_cfb_decrypt(ciphertext: bytes, key: bytes, iv: bytes, workers: int = None) -> bytes:
+    """
+    AES CFB-128 mode – giải mã (batch / song song với buffer lớn)
+    """
+    if workers is None:
+        workers = default_workers()
+    if len(iv) != 16:
+        raise ValueError("CFB IV must be 16 bytes")
+    return cfb_decrypt_raw(ciphertext, expand_key(key), iv, workers)
+
+
+def aes_cfb8_encrypt(plaintext: bytes, key: bytes, iv: bytes = None):
+    """
+    AES CFB-8 mode – mã hóa (không padding)
+    Trả về (ciphertext, iv)
+    """
+    if iv is None:
+        iv = random_bytes(16)
+    if len(iv) != 16:
+        raise ValueError("CFB8 IV must be 16 bytes")
+    return cfb8_encrypt_raw(plaintext, expand_key(key), iv), iv
+
+
+def aes_cfb8_decrypt(ciphertext: bytes, key: bytes, iv: bytes, workers: int = None) -> bytes:
+    """
+    AES CFB-8 mode – giải mã (cửa sổ trượt, batch / song song)
+    """
+    if workers is None:
+        workers = default_workers()
+    if len(iv) != 16:
+        raise ValueError("CFB8 IV must be 16 bytes")
+    return cfb8_decrypt_raw(ciphertext, expand_key(key), iv, workers)
+
+
+# MODE XTS (IEEE 1619)
+# Khóa XTS = K1 || K2 (32 byte: AES-128, 64 byte: AES-256). Dữ liệu là dãy
+# sector liên tiếp sector_size byte; sector i dùng tweak E_K2(số sector, 16 byte
+# little-endian) và độc lập hoàn toàn với các sector khác, nên có thể:
+#   - xử lý song song theo sector trên process pool
+#   - đọc ngẫu nhiên: aes_xts_decrypt(ct[off:off+size], key, sector=base + off // size, size)
+# Sector cuối có thể ngắn hơn (>= 16 byte) -> ciphertext stealing.
+def _xts_schedules(key: bytes):
+    if len(key) not in (32, 64):
+        raise ValueError("XTS key must be 32 or 64 bytes")
+    half = len(key) // 2
+    return expand_key(key[:half]), expand_key(key[half:])
+
+
+def _xts(data, key: bytes, sector: int, sector_size: int, workers, decrypt: bool) -> bytes:
+    if sector_size < 16:
+        raise ValueError("XTS sector size must be at least 16 bytes")
+    if sector < 0:
+        raise ValueError("XTS sector number must be non-negative")
+
+    n = len(data)
+    if n == 0:
+        return b""
+    if 0 < n % sector_size < 16:
+        raise ValueError("XTS data unit must be at least 16 bytes")
+
+    ks1, ks2 = _xts_schedules(key)
+    k1 = ks1.dk if decrypt else ks1.ek
+    if workers is None:
+        workers = default_workers()
+
+    if workers > 1 and n >= PARALLEL_MIN_BYTES:
+        ranges = split_ranges(n, workers, sector_size)
+        return run_in_shared_memory(
+            data, _xts_range, ranges, (k1, ks2.ek, sector, sector_size, decrypt), workers
+        )
+
+    buf = bytearray(data)
+    xts_inplace(as_array(buf, n), k1, ks2.ek, sector, sector_size, decrypt)
+    return bytes(buf)
+
+
+def _xts_range(buf, start, k1, ek2, sector, sector_size, decrypt):
+    """
+    Worker: XTS cho các sector trong đoạn [start, start+len(buf)) của shared memory.
+    """
+    xts_inplace(buf, k1, ek2, sector + start // sector_size, sector_size, decrypt)
+
+
+def aes_xts_encrypt(plaintext: bytes, key: bytes, sector: int = 0,
+                    sector_size: int = XTS_SECTOR_SIZE, workers: int = None) -> bytes:
+    """
+    AES XTS mode – mã hóa (không padding, ciphertext cùng độ dài plaintext)
+    sector: số sector của sector_size byte đầu tiên trong plaintext
+    """
+    return _xts(plaintext, key, sector, sector_size, workers, decrypt=False)
+
+
+def aes_xts_decrypt(ciphertext: bytes, key: bytes, sector: int = 0,
+                    sector_size: int = XTS_SECTOR_SIZE, workers: int = None) -> bytes:
+    """
+    AES XTS mode – giải mã; có thể giải mã riêng 1 sector bất kỳ
+    """
+    return _xts(ciphertext, key, sector, sector_size, workers, decrypt=True)
+
+
+# API GHI VÀO BUFFER CÓ SẴN (*_into)
+# src / dst là bytes-like (bytearray, memoryview, mmap, ...); dst phải ghi được
+# và có thể trùng với src (xử lý tại chỗ). Kết quả được ghi thẳng vào dst,
+# không tạo bytes cho từng block. Trả về số byte đã ghi vào dst.
+#   pad=True   : thêm PKCS#7, dst cần >= padded_size(len(src)) byte
+#   pad=False  : len(src) phải chia hết cho 16 (vd. các chunk giữa luồng)
+#   unpad=True : bỏ PKCS#7, giá trị trả về là độ dài plaintext thật
+def padded_size(n: int, block_size: int = 16) -> int:
+    return n + block_size - n % block_size
+
+
+def _into_layout(src, dst, pad: bool):
+    """
+    Trả về (n_full, total): số byte block đầy đủ lấy thẳng từ src,
+    và tổng số byte sẽ ghi vào dst.
+    """
+    n = len(src)
+    if pad:
+        n_full, total = n - n % 16, padded_size(n)
+    else:
+        if n % 16:
+            raise ValueError("Input length must be a multiple of 16 when pad=False")
+        n_full = total = n
+    if len(dst) < total:
+        raise ValueError(f"Output buffer too small: need {total} bytes")
+    return n_full, total
+
+
+def _pad_tail(src, n_full: int) -> bytearray:
+    """
+    Block cuối đã thêm PKCS#7 (phần lẻ của src + padding), 16 byte.
+    """
+    tail = bytearray(src[n_full:])
+    pad = 16 - len(tail)
+    tail += bytes([pad]) * pad
+    return tail
+
+
+def _copy_into(src, dst, n: int):
+    if n and src is not dst:
+        memoryview(dst)[:n] = memoryview(src)[:n]
+
+
+def _unpad_len(dst, n: int, unpad: bool) -> int:
+    if not unpad:
+        return n
+    if n == 0:
+        raise ValueError("Ciphertext is empty")
+    return n - dst[n - 1]
+
+
+def _check_decrypt_input(src, dst):
+    n = len(src)
+    if n % 16:
+        raise ValueError("Ciphertext length must be a multiple of 16")
+    if len(dst) < n:
+        raise ValueError(f"Output buffer too small: need {n} bytes")
+    return n
+
+
+def _ecb_into(src, dst, n: int, ks, decrypt: bool):
+    if n == 0:
+        return
+    if BLOCK_BACKEND == "reference":
+        raw = ecb_decrypt_raw if decrypt else ecb_encrypt_raw
+        memoryview(dst)[:n] = raw(memoryview(src)[:n], ks)
+    elif _use_numpy(n):
+        _copy_into(src, dst, n)
+        (ecb_decrypt_inplace if decrypt else ecb_encrypt_inplace)(
+            as_array(dst, n), ks.dk if decrypt else ks.ek
+        )
+    else:
+        fn, keys = (decrypt_words, ks.dk) if decrypt else (encrypt_words, ks.ek)
+        unpack_from, pack_into = BLOCK_WORDS.unpack_from, BLOCK_WORDS.pack_into
+        for off in range(0, n, 16):
+            pack_into(dst, off, *fn(*unpack_from(src, off), keys))
+
+
+def aes_ecb_encrypt_into(src, dst, key: bytes, pad: bool = True) -> int:
+    """
+    AES ECB – mã hóa src vào dst.
+    """
+    ks = expand_key(key)
+    n_full, total = _into_layout(src, dst, pad)
+    _ecb_into(src, dst, n_full, ks, decrypt=False)
+    if pad:
+        tail = _pad_tail(src, n_full)
+        _ecb_into(tail, tail, 16, ks, decrypt=False)
+        memoryview(dst)[n_full:total] = tail
+    return total
+
+
+def aes_ecb_decrypt_into(src, dst, key: bytes, unpad: bool = True) -> int:
+    """
+    AES ECB – giải mã src vào dst.
+    """
+    ks = expand_key(key)
+    n = _check_decrypt_input(src, dst)
+    _ecb_into(src, dst, n, ks, decrypt=True)
+    return _unpad_len(dst, n, unpad)
+
+
+def _cbc_encrypt_into(src, dst, n: int, ek, chain):
+    """
+    CBC mã hóa n byte (đã căn 16) từ src vào dst; chain = 4 word của
+    block ciphertext trước đó. Trả về chain mới.
+    """
+    p0, p1, p2, p3 = chain
+    unpack_from, pack_into = BLOCK_WORDS.unpack_from, BLOCK_WORDS.pack_into
+    for off in range(0, n, 16):
+        s0, s1, s2, s3 = unpack_from(src, off)
+        p0, p1, p2, p3 = encrypt_words(s0 ^ p0, s1 ^ p1, s2 ^ p2, s3 ^ p3, ek)
+        pack_into(dst, off, p0, p1, p2, p3)
+    return p0, p1, p2, p3
+
+
+def aes_cbc_encrypt_into(src, dst, key: bytes, iv: bytes, pad: bool = True) -> int:
+    """
+    AES CBC – mã hóa src vào dst (iv bắt buộc, 16 byte).
+    Block ciphertext cuối trong dst là IV cho chunk kế tiếp khi mã hóa theo luồng.
+    """
+    ks = expand_key(key)
+    n_full, total = _into_layout(src, dst, pad)
+
+    if BLOCK_BACKEND == "reference":
+        data = memoryview(src)[:n_full]
+        if pad:
+            data = bytes(data) + bytes(_pad_tail(src, n_full))
+        memoryview(dst)[:total] = cbc_encrypt_raw(data, ks, iv)
+        return total
+
+    chain = _cbc_encrypt_into(src, dst, n_full, ks.ek, BLOCK_WORDS.unpack(iv))
+    if pad:
+        tail = _pad_tail(src, n_full)
+        _cbc_encrypt_into(tail, tail, 16, ks.ek, chain)
+        memoryview(dst)[n_full:total] = tail
+    return total
+
+
+def aes_cbc_decrypt_into(src, dst, key: bytes, iv: bytes, unpad: bool = True) -> int:
+    """
+    AES CBC – giải mã src vào dst (iv bắt buộc).
+    """
+    ks = expand_key(key)
+    n = _check_decrypt_input(src, dst)
+
+    if n == 0:
+        pass
+    elif BLOCK_BACKEND == "reference":
+        memoryview(dst)[:n] = cbc_decrypt_raw(memoryview(src)[:n], ks, iv)
+    elif _use_numpy(n):
+        _copy_into(src, dst, n)
+        cbc_decrypt_inplace(as_array(dst, n), ks.dk, iv)
+    else:
+        dk = ks.dk
+        p0, p1, p2, p3 = BLOCK_WORDS.unpack(iv)
+        unpack_from, pack_into = BLOCK_WORDS.unpack_from, BLOCK_WORDS.pack_into
+        for off in range(0, n, 16):
+            c0, c1, c2, c3 = unpack_from(src, off)
+            d0, d1, d2, d3 = decrypt_words(c0, c1, c2, c3, dk)
+            pack_into(dst, off, d0 ^ p0, d1 ^ p1, d2 ^ p2, d3 ^ p3)
+            p0, p1, p2, p3 = c0, c1, c2, c3
+
+    return _unpad_len(dst, n, unpad)
+
+
+def aes_ctr_encrypt_into(src, dst, key: bytes, nonce: bytes, counter: int = 0) -> int:
+    """
+    AES CTR – src XOR keystream vào dst (độ dài bất kỳ, không padding).
+    """
+    if len(nonce) != CTR_NONCE_SIZE:
+        raise ValueError("CTR nonce must be 8 bytes")
+    n = len(src)
+    if len(dst) < n:
+        raise ValueError(f"Output buffer too small: need {n} bytes")
+
+    ks = expand_key(key)
+    if n == 0:
+        pass
+    elif BLOCK_BACKEND == "reference":
+        memoryview(dst)[:n] = ctr_xor(memoryview(src)[:n], ks, nonce, counter)
+    elif _use_numpy(n):
+        _copy_into(src, dst, n)
+        ctr_xor_inplace(as_array(dst, n), ks.ek, nonce, counter)
+    else:
+        ek = ks.ek
+        n0, n1 = int.from_bytes(nonce[:4], "big"), int.from_bytes(nonce[4:], "big")
+        unpack_from, pack_into = BLOCK_WORDS.unpack_from, BLOCK_WORDS.pack_into
+        n_full = n - n % 16
+        ctr = counter
+        for off in range(0, n_full, 16):
+            ctr &= 0xFFFFFFFFFFFFFFFF
+            k0, k1, k2, k3 = encrypt_words(n0, n1, ctr >> 32, ctr & 0xFFFFFFFF, ek)
+            s0, s1, s2, s3 = unpack_from(src, off)
+            pack_into(dst, off, s0 ^ k0, s1 ^ k1, s2 ^ k2, s3 ^ k3)
+            ctr += 1
+        if n_full < n:
+            ctr &= 0xFFFFFFFFFFFFFFFF
+            ks_block = BLOCK_WORDS.pack(
+                *encrypt_words(n0, n1, ctr >> 32, ctr & 0xFFFFFFFF, ek)
+            )
+            for i in range(n_full, n):
+                dst[i] = src[i] ^ ks_block[i - n_full]
+
+    return n
+
+
+# CTR: giải mã giống hệt mã hóa
+aes_ctr_decrypt_into = aes_ctr_encrypt_into
@@ -0,0 +1,387 @@
+import numpy as np
+from tasks.aes_tables import SBOX, INV_SBOX, RCON, xtime
+
+# Engine AES vector hóa: mỗi hàng của mảng (N, 16) uint8 là 1 block,
+# mọi bước của 1 round được áp dụng cho cả N block cùng lúc.
+# Thứ tự byte trong hàng giống block16: byte[r + 4*c] = state[r][c].
+
+SBOX_NP = np.array(SBOX, dtype=np.uint8)
+INV_SBOX_NP = np.array(INV_SBOX, dtype=np.uint8)
+XTIME_NP = np.array([xtime(a) for a in range(256)], dtype=np.uint8)
+
+# ShiftRows: out[r + 4c] = in[r + 4*((c + r) % 4)]
+SHIFT_ROWS = np.array([r + 4 * ((c + r) % 4) for c in range(4) for r in range(4)])
+INV_SHIFT_ROWS = np.array([r + 4 * ((c - r) % 4) for c in range(4) for r in range(4)])
+
+# Vị trí hàng r+1 / r+2 trong 1 cột (dùng cho MixColumns)
+_ROT1 = [1, 2, 3, 0]
+_ROT2 = [2, 3, 0, 1]
+
+# Số block xử lý mỗi lượt, giới hạn bộ nhớ tạm (~1 MB / mảng)
+CHUNK_BLOCKS = 1 << 16
+
+
+#  Round key dạng mảng
+def words_to_round_keys(words):
+    """
+    Chuyển round key dạng word (aes_ttable) thành mảng (Nr+1, 16) uint8.
+    Word big-endian của cột c nằm đúng ở byte 4c..4c+3 của block.
+    """
+    return np.array(words, dtype=">u4").view(np.uint8).reshape(-1, 16)
+
+
+# MixColumns & InvMixColumns trên (N, 16)
+def mix_columns(state):
+    """
+    MixColumns cho mọi block: out_r = a_r ^ t ^ xtime(a_r ^ a_{r+1}),
+    với t = a0 ^ a1 ^ a2 ^ a3.
+    """
+    s = state.reshape(-1, 4, 4)
+    t = s[:, :, 0] ^ s[:, :, 1] ^ s[:, :, 2] ^ s[:, :, 3]
+    out = s ^ t[:, :, None] ^ XTIME_NP[s ^ s[:, :, _ROT1]]
+    return out.reshape(-1, 16)
+
+
+def inv_mix_columns(state):
+    """
+    InvMixColumns = tiền xử lý a_r ^= xtime(xtime(a_r ^ a_{r+2})) rồi MixColumns.
+    """
+    s = state.reshape(-1, 4, 4)
+    s = s ^ XTIME_NP[XTIME_NP[s ^ s[:, :, _ROT2]]]
+    return mix_columns(s.reshape(-1, 16))
+
+
+#  AES Encrypt / Decrypt nhiều block
+def encrypt_blocks(blocks, round_keys):
+    """
+    Mã hóa mảng (N, 16) uint8.
+    round_keys: dãy Nr+1 mảng, mỗi mảng broadcast được với (N, 16)
+    (thường là words_to_round_keys(ek)).
+    """
+    Nr = len(round_keys) - 1
+    state = blocks ^ round_keys[0]
+
+    for rnd in range(1, Nr):
+        state = SBOX_NP[state][:, SHIFT_ROWS]
+        state = mix_columns(state)
+        state ^= round_keys[rnd]
+
+    state = SBOX_NP[state][:, SHIFT_ROWS]
+    state ^= round_keys[Nr]
+    return state
+
+
+def decrypt_blocks(blocks, round_keys):
+    """
+    Giải mã mảng (N, 16) uint8 theo equivalent inverse cipher.
+    round_keys: round key giải mã (words_to_round_keys(inverse_key_words(ek))).
+    """
+    Nr = len(round_keys) - 1
+    state = blocks ^ round_keys[0]
+
+    for rnd in range(1, Nr):
+        state = INV_SBOX_NP[state][:, INV_SHIFT_ROWS]
+        state = inv_mix_columns(state)
+        state ^= round_keys[rnd]
+
+    state = INV_SBOX_NP[state][:, INV_SHIFT_ROWS]
+    state ^= round_keys[Nr]
+    return state
+
+
+#  Mở rộng nhiều khóa cùng lúc (mỗi block 1 khóa riêng)
+def expand_keys(keys):
+    """
+    keys: mảng (N, Nk*4) uint8 hoặc list N khóa bytes cùng độ dài (16/24/32).
+    Trả về round key dạng (Nr+1, N, 16): round_keys[r][k] là round key r của
+    khóa k, dùng thẳng được với encrypt_blocks() cho N block, mỗi block 1 khóa.
+    RotWord / SubWord / Rcon chạy cùng lúc cho cả N khóa.
+    """
+    if not isinstance(keys, np.ndarray):
+        keys = np.frombuffer(b"".join(keys), dtype=np.uint8).reshape(len(keys), -1)
+    key_len = keys.shape[1]
+    if key_len not in (16, 24, 32):
+        raise ValueError("AES key must be 128/192/256 bits (16/24/32 bytes).")
+
+    Nk = key_len // 4
+    Nr = {16:10, 24:12, 32:14}[key_len]
+
+    w = np.empty((4 * (Nr + 1), len(keys), 4), dtype=np.uint8)
+    w[:Nk] = keys.reshape(-1, Nk, 4).transpose(1, 0, 2)
+
+    for i in range(Nk, 4 * (Nr + 1)):
+        temp = w[i - 1]
+
+        if i % Nk == 0:
+            temp = SBOX_NP[temp[:, _ROT1]]          # RotWord + SubWord
+            temp[:, 0] ^= RCON[i // Nk]
+
+        elif Nk == 8 and (i % Nk == 4):
+            temp = SBOX_NP[temp]
+
+        w[i] = w[i - Nk] ^ temp
+
+    # (4*(Nr+1), N, 4) -> (Nr+1, N, 16): word c của round r = byte 4c..4c+3
+    return w.reshape(Nr + 1, 4, -1, 4).transpose(0, 2, 1, 3).reshape(Nr + 1, -1, 16)
+
+
+def inverse_round_keys(round_keys):
+    """
+    Round key (Nr+1, N, 16) từ expand_keys() -> round key cho decrypt_blocks()
+    (equivalent inverse cipher: đảo thứ tự, InvMixColumns các round giữa).
+    """
+    Nr = len(round_keys) - 1
+    dk = np.empty_like(round_keys)
+    dk[0] = round_keys[Nr]
+    dk[Nr] = round_keys[0]
+    if Nr > 1:
+        middle = round_keys[Nr - 1:0:-1].reshape(-1, 16)
+        dk[1:Nr] = inv_mix_columns(middle).reshape(Nr - 1, -1, 16)
+    return dk
+
+
+#  ECB trên buffer đã căn 16 byte
+def ecb_encrypt_bytes(data, ek) -> bytes:
+    """
+    Mã hóa ECB toàn bộ data (độ dài chia hết cho 16), xử lý theo từng chunk.
+    """
+    return _process_chunks(data, words_to_round_keys(ek), encrypt_blocks)
+
+
+def ecb_decrypt_bytes(data, dk) -> bytes:
+    """
+    Giải mã ECB toàn bộ data (độ dài chia hết cho 16).
+    """
+    return _process_chunks(data, words_to_round_keys(dk), decrypt_blocks)
+
+
+def _process_chunks(data, round_keys, block_fn):
+    blocks = np.frombuffer(data, dtype=np.uint8).reshape(-1, 16)
+    out = np.empty_like(blocks)
+    for i in range(0, len(blocks), CHUNK_BLOCKS):
+        out[i:i + CHUNK_BLOCKS] = block_fn(blocks[i:i + CHUNK_BLOCKS], round_keys)
+    return out.tobytes()
+
+
+#  CTR: keystream cho nhiều counter block cùng lúc
+def ctr_blocks(nonce: bytes, counter: int, nblocks: int):
+    """
+    Counter block = nonce (8 byte) || counter 64-bit big-endian,
+    counter tăng dần theo block (mod 2^64).
+    """
+    ctrs = np.arange(nblocks, dtype=np.uint64) + np.uint64(counter % (1 << 64))
+    blocks = np.empty((nblocks, 16), dtype=np.uint8)
+    blocks[:, :8] = np.frombuffer(nonce, dtype=np.uint8)
+    blocks[:, 8:] = ctrs.astype(">u8").view(np.uint8).reshape(-1, 8)
+    return blocks
+
+
+def ctr_xor_inplace(buf, ek, nonce: bytes, counter: int):
+    """
+    XOR keystream CTR vào mảng uint8 1 chiều `buf` (ghi đè tại chỗ).
+    Block đầu tiên của buf dùng counter `counter`.
+    """
+    round_keys = words_to_round_keys(ek)
+    n = len(buf)
+    step = CHUNK_BLOCKS * 16
+    for off in range(0, n, step):
+        chunk = buf[off:off + step]
+        nblocks = -(-len(chunk) // 16)
+        ks = encrypt_blocks(ctr_blocks(nonce, counter + off // 16, nblocks), round_keys)
+        chunk ^= ks.reshape(-1)[:len(chunk)]
+
+
+def ctr_xor_bytes(data, ek, nonce: bytes, counter: int) -> bytes:
+    """
+    data XOR keystream CTR, trả về bytes mới.
+    """
+    buf = np.frombuffer(data, dtype=np.uint8).copy()
+    ctr_xor_inplace(buf, ek, nonce, counter)
+    return buf.tobytes()
+
+
+#  CBC decrypt: giải mã cả batch rồi XOR với ciphertext dịch 1 block
+def cbc_decrypt_inplace(buf, dk, iv: bytes):
+    """
+    Giải mã CBC tại chỗ trên mảng uint8 1 chiều `buf` (độ dài chia hết cho 16).
+    iv: block ciphertext đứng ngay trước buf (hoặc IV thật nếu buf là đầu message).
+    """
+    round_keys = words_to_round_keys(dk)
+    prev = np.frombuffer(iv, dtype=np.uint8)
+    step = CHUNK_BLOCKS * 16
+    for off in range(0, len(buf), step):
+        blocks = buf[off:off + step].reshape(-1, 16)
+        dec = decrypt_blocks(blocks, round_keys)
+        dec[0] ^= prev
+        dec[1:] ^= blocks[:-1]
+        prev = blocks[-1].copy()
+        blocks[:] = dec
+
+
+def cbc_decrypt_bytes(data, dk, iv: bytes) -> bytes:
+    """
+    Giải mã CBC toàn bộ data (chưa bỏ padding), trả về bytes mới.
+    """
+    buf = np.frombuffer(data, dtype=np.uint8).copy()
+    cbc_decrypt_inplace(buf, dk, iv)
+    return buf.tobytes()
+
+
+#  CFB decrypt: mọi block keystream = E(block ciphertext trước đó) -> 1 batch
+def cfb_decrypt_inplace(buf, ek, iv: bytes):
+    """
+    Giải mã CFB-128 tại chỗ trên mảng uint8 1 chiều `buf` (độ dài bất kỳ).
+    iv: 16 byte ciphertext đứng ngay trước buf (hoặc IV thật ở đầu message).
+    """
+    round_keys = words_to_round_keys(ek)
+    prev = np.frombuffer(iv, dtype=np.uint8)
+    step = CHUNK_BLOCKS * 16
+    for off in range(0, len(buf), step):
+        chunk = buf[off:off + step]
+        n = len(chunk)
+        nblocks = -(-n // 16)
+        prevs = np.empty((nblocks, 16), dtype=np.uint8)
+        prevs[0] = prev
+        prevs[1:] = chunk[:16 * (nblocks - 1)].reshape(-1, 16)
+        if n % 16 == 0:
+            prev = chunk[-16:].copy()
+        chunk ^= encrypt_blocks(prevs, round_keys).reshape(-1)[:n]
+
+
+def cfb8_decrypt_inplace(buf, ek, iv: bytes):
+    """
+    Giải mã CFB-8 tại chỗ: keystream của byte i = byte đầu của E(16 byte
+    ciphertext đứng trước byte i) -> các cửa sổ trượt 16 byte, 1 batch.
+    iv: 16 byte ciphertext đứng ngay trước buf (hoặc IV thật).
+    """
+    round_keys = words_to_round_keys(ek)
+    prev = np.frombuffer(iv, dtype=np.uint8)
+    for off in range(0, len(buf), CHUNK_BLOCKS):
+        chunk = buf[off:off + CHUNK_BLOCKS]
+        n = len(chunk)
+        stream = np.concatenate([prev, chunk])
+        windows = np.lib.stride_tricks.sliding_window_view(stream, 16)[:n]
+        prev = stream[-16:].copy()
+        chunk ^= encrypt_blocks(np.ascontiguousarray(windows), round_keys)[:, 0]
+
+
+#  Xử lý tại chỗ trên buffer của caller (dùng cho các API *_into)
+def as_array(buf, n: int):
+    """
+    Mảng uint8 trỏ thẳng vào n byte đầu của buf (không copy).
+    """
+    return np.frombuffer(buf, dtype=np.uint8, count=n)
+
+
+def ecb_encrypt_inplace(buf, ek):
+    _ecb_inplace(buf, words_to_round_keys(ek), encrypt_blocks)
+
+
+def ecb_decrypt_inplace(buf, dk):
+    _ecb_inplace(buf, words_to_round_keys(dk), decrypt_blocks)
+
+
+def _ecb_inplace(buf, round_keys, block_fn):
+    blocks = buf.reshape(-1, 16)
+    for i in range(0, len(blocks), CHUNK_BLOCKS):
+        blocks[i:i + CHUNK_BLOCKS] = block_fn(blocks[i:i + CHUNK_BLOCKS], round_keys)
+
+
+#  XTS (IEEE 1619): tweak α^j và ciphertext stealing cho nhiều sector cùng lúc
+XTS_GF_POLY = 0x87      # x^128 = x^7 + x^2 + x + 1
+
+
+def xts_sector_blocks(first: int, count: int):
+    """
+    Số sector first, first+1, ... dạng block 16 byte little-endian -> (count, 16).
+    """
+    if first + count <= 1 << 64:
+        words = np.zeros((count, 2), dtype="<u8")
+        words[:, 0] = np.arange(count, dtype=np.uint64) + np.uint64(first)
+        return words.view(np.uint8)
+    data = b"".join((first + i).to_bytes(16, "little") for i in range(count))
+    return np.frombuffer(data, dtype=np.uint8).reshape(count, 16)
+
+
+def xts_tweaks(t0, nblocks: int):
+    """
+    t0: mảng (S, 16) = E_K2(số sector) -> mảng (S, nblocks, 16) với
+    tweak của block j = t0 · α^j (nhân đôi trong GF(2^128), little-endian).
+    Mỗi bước nhân đôi chạy cùng lúc cho cả S sector.
+    """
+    words = np.ascontiguousarray(t0).view("<u8")
+    lo, hi = words[:, 0].copy(), words[:, 1].copy()
+    one, top = np.uint64(1), np.uint64(63)
+    poly = np.uint64(XTS_GF_POLY)
+
+    out = np.empty((len(t0), nblocks, 2), dtype="<u8")
+    for j in range(nblocks):
+        out[:, j, 0] = lo
+        out[:, j, 1] = hi
+        carry = hi >> top
+        hi = (hi << one) | (lo >> top)
+        lo = (lo << one) ^ (carry * poly)
+    return out.view(np.uint8).reshape(len(t0), nblocks, 16)
+
+
+def xts_sectors_inplace(arr, round_keys, tweak_keys, sectors, decrypt: bool):
+    """
+    arr: mảng (S, L) uint8 gồm S sector cùng độ dài L >= 16, ghi đè tại chỗ.
+    round_keys: round key của K1 (mã hóa hoặc giải mã); tweak_keys: round key
+    mã hóa của K2; sectors: (S, 16) từ xts_sector_blocks().
+    L không chia hết cho 16 -> ciphertext stealing ở 2 block cuối mỗi sector.
+    """
+    S, L = arr.shape
+    m, r = divmod(L, 16)
+    T = xts_tweaks(encrypt_blocks(sectors, tweak_keys), m + (1 if r else 0))
+    block_fn = decrypt_blocks if decrypt else encrypt_blocks
+
+    def crypt(x, t):
+        return block_fn(x ^ t, round_keys) ^ t
+
+    k = m - 1 if r else m        # số block xử lý bình thường
+    if k:
+        head = arr[:, :16 * k].reshape(S * k, 16)
+        out = crypt(head, T[:, :k].reshape(S * k, 16))
+
+    if r:
+        last = arr[:, 16 * (m - 1):16 * m]
+        tail = arr[:, 16 * m:]
+        # Mã hóa: CC = E(P_{m-1}, T_{m-1}); C_{m-1} = E(P_m || CC[r:], T_m); C_m = CC[:r]
+        # Giải mã: đổi vai trò 2 tweak
+        t_first, t_second = (T[:, m], T[:, m - 1]) if decrypt else (T[:, m - 1], T[:, m])
+        cc = crypt(last, t_first)
+        stolen = np.concatenate([tail, cc[:, r:]], axis=1)
+        last[:] = crypt(stolen, t_second)
+        tail[:] = cc[:, :r]
+
+    if k:
+        arr[:, :16 * k] = out.reshape(S, 16 * k)
+
+
+def xts_inplace(buf, k1_words, k2_words, first_sector: int, sector_size: int,
+                decrypt: bool):
+    """
+    XTS trên mảng uint8 1 chiều `buf` gồm các sector liên tiếp, bắt đầu
+    từ sector first_sector; sector cuối có thể ngắn hơn (>= 16 byte).
+    k1_words: ek (mã hóa) hoặc dk (giải mã) của K1; k2_words: ek của K2.
+    """
+    round_keys = words_to_round_keys(k1_words)
+    tweak_keys = words_to_round_keys(k2_words)
+    n = len(buf)
+    n_full = n - n % sector_size
+    per_chunk = max(1, CHUNK_BLOCKS * 16 // sector_size)
+
+    sector = first_sector
+    for off in range(0, n_full, per_chunk * sector_size):
+        stop = min(off + per_chunk * sector_size, n_full)
+        count = (stop - off) // sector_size
+        arr = buf[off:stop].reshape(count, sector_size)
+        xts_sectors_inplace(arr, round_keys, tweak_keys,
+                            xts_sector_blocks(sector, count), decrypt)
+        sector += count
+
+    if n_full < n:
+        arr = buf[n_full:].reshape(1, n - n_full)
+        xts_sectors_inplace(arr, round_keys, tweak_keys,
+                            xts_sector_blocks(sector, 1), decrypt)
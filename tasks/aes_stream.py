@@ -0,0 +1,151 @@
+from tasks.aes_modes import (
+    expand_key, pkcs7_pad, pkcs7_unpad,
+    ecb_encrypt_raw, ecb_decrypt_raw,
+    cbc_encrypt_raw, cbc_decrypt_raw,
+    ctr_xor, CTR_NONCE_SIZE
+)
+from tasks.drbg import random_bytes
+
+# Context mã hóa / giải mã AES theo luồng (update / finalize).
+# Khóa được mở rộng 1 lần khi tạo context; mỗi update() chỉ xử lý các block
+# đầy đủ và giữ lại phần lẻ, nên bộ nhớ dùng không phụ thuộc độ dài message.
+STREAM_MODES = ("ECB", "CBC", "CTR")
+
+
+class _AESStream:
+    def __init__(self, key: bytes, mode: str, iv: bytes = None, counter: int = 0,
+                 workers: int = 1):
+        mode = mode.upper()
+        if mode not in STREAM_MODES:
+            raise ValueError("AES stream mode must be ECB, CBC or CTR")
+
+        if mode == "CBC" and iv is not None and len(iv) != 16:
+            raise ValueError("CBC IV must be 16 bytes")
+        if mode == "CTR" and iv is not None and len(iv) != CTR_NONCE_SIZE:
+            raise ValueError("CTR nonce must be 8 bytes")
+
+        self.mode = mode
+        self.iv = iv
+        self.workers = workers
+        self._ks = expand_key(key)
+        self._buf = b""
+        self._chain = iv           # CBC: block ciphertext cuối cùng
+        self._counter = counter    # CTR: counter của block kế tiếp
+        self._keystream = b""      # CTR: phần keystream chưa dùng của block dở
+        self._finalized = False
+
+    def _check(self):
+        if self._finalized:
+            raise ValueError("Context already finalized")
+
+    def _split(self, data, hold_last: bool):
+        """
+        Ghép phần lẻ trước đó với data, trả về memoryview các block đầy đủ
+        sẵn sàng xử lý; phần còn lại được giữ trong self._buf.
+        """
+        buf = self._buf + data if self._buf else data
+        n = len(buf) - len(buf) % 16
+        if hold_last and n and n == len(buf):
+            n -= 16
+        self._buf = bytes(buf[n:])
+        return memoryview(buf)[:n]
+
+    def _ctr_update(self, data) -> bytes:
+        out = []
+        ks = self._keystream
+        if ks and data:
+            k = min(len(ks), len(data))
+            out.append(bytes([a ^ b for a, b in zip(data[:k], ks)]))
+            self._keystream = ks[k:]
+            data = data[k:]
+
+        if data:
+            nonce = self.iv
+            out.append(ctr_xor(data, self._ks, nonce, self._counter, self.workers))
+            self._counter += -(-len(data) // 16)
+            tail = len(data) % 16
+            if tail:
+                last = ctr_xor(bytes(16), self._ks, nonce, self._counter - 1)
+                self._keystream = last[tail:]
+
+        return b"".join(out)
+
+
+class AESEncryptor(_AESStream):
+    """
+    Mã hóa AES theo luồng.
+      enc = AESEncryptor(key, "CBC")
+      ct = enc.update(chunk1) + enc.update(chunk2) + enc.finalize()
+    ECB/CBC: PKCS#7 chỉ được thêm ở finalize(). CTR: không padding.
+    Nếu iv (nonce với CTR) không cung cấp -> tự sinh ngẫu nhiên (xem .iv).
+    """
+
+    def __init__(self, key: bytes, mode: str = "CBC", iv: bytes = None,
+                 counter: int = 0, workers: int = 1):
+        mode = mode.upper()
+        if iv is None and mode == "CBC":
+            iv = random_bytes(16)
+        elif iv is None and mode == "CTR":
+            iv = random_bytes(CTR_NONCE_SIZE)
+        super().__init__(key, mode, iv, counter, workers)
+
+    def update(self, data) -> bytes:
+        self._check()
+        if self.mode == "CTR":
+            return self._ctr_update(data)
+        return self._process(self._split(data, hold_last=False))
+
+    def finalize(self) -> bytes:
+        self._check()
+        self._finalized = True
+        if self.mode == "CTR":
+            return b""
+        return self._process(pkcs7_pad(self._buf, 16))
+
+    def _process(self, blocks) -> bytes:
+        if not blocks:
+            return b""
+        if self.mode == "ECB":
+            return ecb_encrypt_raw(blocks, self._ks)
+
+        out = cbc_encrypt_raw(blocks, self._ks, self._chain)
+        self._chain = out[-16:]
+        return out
+
+
+class AESDecryptor(_AESStream):
+    """
+    Giải mã AES theo luồng (CBC/CTR bắt buộc có iv / nonce).
+    ECB/CBC: block cuối luôn được giữ lại đến finalize() để bỏ padding PKCS#7.
+    """
+
+    def __init__(self, key: bytes, mode: str = "CBC", iv: bytes = None,
+                 counter: int = 0, workers: int = 1):
+        if iv is None and mode.upper() in ("CBC", "CTR"):
+            raise ValueError("IV / nonce is required for decryption")
+        super().__init__(key, mode, iv, counter, workers)
+
+    def update(self, data) -> bytes:
+        self._check()
+        if self.mode == "CTR":
+            return self._ctr_update(data)
+        return self._process(self._split(data, hold_last=True))
+
+    def finalize(self) -> bytes:
+        self._check()
+        self._finalized = True
+        if self.mode == "CTR":
+            return b""
+        if len(self._buf) != 16:
+            raise ValueError("Ciphertext length must be a non-zero multiple of 16")
+        return pkcs7_unpad(self._process(self._buf))
+
+    def _process(self, blocks) -> bytes:
+        if not blocks:
+            return b""
+        if self.mode == "ECB":
+            return ecb_decrypt_raw(blocks, self._ks)
+
+        out = cbc_decrypt_raw(blocks, self._ks, self._chain, self.workers)
+        self._chain = bytes(blocks[-16:])
+        return out
@@ -45,3 +45,42 @@ RCON = [
 # --------- toán tử GF(2^8) ----------
 def xtime(a):
     return ((a << 1) ^ 0x1B) & 0xFF if a & 0x80 else ((a << 1) & 0xFF)
+
+
+# --------- bảng T (Te0..Te3 / Td0..Td3) ----------
+# Mỗi bảng 256 word 32-bit, gộp SubBytes + ShiftRows + MixColumns của 1 byte
+# vào 1 cột (big-endian: byte hàng 0 ở 8 bit cao nhất).
+def _mul(a, b):
+    """Nhân GF(2^8) dùng xtime (chỉ dùng lúc dựng bảng)."""
+    p = 0
+    while b:
+        if b & 1:
+            p ^= a
+        a = xtime(a)
+        b >>= 1
+    return p
+
+
+def _ror8(w):
+    return ((w >> 8) | (w << 24)) & 0xFFFFFFFF
+
+
+def _build_t_tables(box, coeffs):
+    t0 = []
+    for x in range(256):
+        s = box[x]
+        t0.append(
+            (_mul(s, coeffs[0]) << 24) | (_mul(s, coeffs[1]) << 16) |
+            (_mul(s, coeffs[2]) << 8) | _mul(s, coeffs[3])
+        )
+    t1 = [_ror8(w) for w in t0]
+    t2 = [_ror8(w) for w in t1]
+    t3 = [_ror8(w) for w in t2]
+    return t0, t1, t2, t3
+
+
+# Mã hóa: cột MixColumns (2, 1, 1, 3)
+TE0, TE1, TE2, TE3 = _build_t_tables(SBOX, (2, 1, 1, 3))
+
+# Giải mã: cột InvMixColumns (14, 9, 13, 11)
+TD0, TD1, TD2, TD3 = _build_t_tables(INV_SBOX, (14, 9, 13, 11))
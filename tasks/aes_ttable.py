@@ -0,0 +1,112 @@
+import struct
+from tasks.aes_tables import (
+    SBOX, INV_SBOX,
+    TE0, TE1, TE2, TE3,
+    TD0, TD1, TD2, TD3
+)
+
+# State được giữ dưới dạng 4 word 32-bit (mỗi word = 1 cột, big-endian)
+BLOCK_WORDS = struct.Struct(">4I")
+
+
+#  Chuẩn bị round key dạng word
+def round_keys_to_words(round_keys):
+    """
+    Chuyển round keys 4×4 (từ key_expansion) thành list word 32-bit.
+    Round r chiếm các word [4r, 4r+4), word c = cột c của round key.
+    """
+    words = []
+    for rk in round_keys:
+        for c in range(4):
+            words.append(
+                (rk[0][c] << 24) | (rk[1][c] << 16) | (rk[2][c] << 8) | rk[3][c]
+            )
+    return words
+
+
+#  AES Encrypt 1 block (T-table)
+def encrypt_words(s0, s1, s2, s3, ek):
+    """
+    Mã hóa 1 block cho sẵn dưới dạng 4 word cột, trả về 4 word.
+    ek: round key dạng word (key_expansion_words / round_keys_to_words).
+    Mỗi round = 16 lần tra bảng Te + XOR, kết quả giống hệt aes_encrypt_block.
+    """
+    Nr = len(ek) // 4 - 1
+    s0 ^= ek[0]
+    s1 ^= ek[1]
+    s2 ^= ek[2]
+    s3 ^= ek[3]
+
+    k = 4
+    for _ in range(Nr - 1):
+        t0 = TE0[s0 >> 24] ^ TE1[(s1 >> 16) & 0xFF] ^ TE2[(s2 >> 8) & 0xFF] ^ TE3[s3 & 0xFF] ^ ek[k]
+        t1 = TE0[s1 >> 24] ^ TE1[(s2 >> 16) & 0xFF] ^ TE2[(s3 >> 8) & 0xFF] ^ TE3[s0 & 0xFF] ^ ek[k + 1]
+        t2 = TE0[s2 >> 24] ^ TE1[(s3 >> 16) & 0xFF] ^ TE2[(s0 >> 8) & 0xFF] ^ TE3[s1 & 0xFF] ^ ek[k + 2]
+        t3 = TE0[s3 >> 24] ^ TE1[(s0 >> 16) & 0xFF] ^ TE2[(s1 >> 8) & 0xFF] ^ TE3[s2 & 0xFF] ^ ek[k + 3]
+        s0, s1, s2, s3 = t0, t1, t2, t3
+        k += 4
+
+    # Round cuối: SubBytes + ShiftRows + AddRoundKey (không MixColumns)
+    S = SBOX
+    return (
+        ((S[s0 >> 24] << 24) | (S[(s1 >> 16) & 0xFF] << 16) |
+         (S[(s2 >> 8) & 0xFF] << 8) | S[s3 & 0xFF]) ^ ek[k],
+        ((S[s1 >> 24] << 24) | (S[(s2 >> 16) & 0xFF] << 16) |
+         (S[(s3 >> 8) & 0xFF] << 8) | S[s0 & 0xFF]) ^ ek[k + 1],
+        ((S[s2 >> 24] << 24) | (S[(s3 >> 16) & 0xFF] << 16) |
+         (S[(s0 >> 8) & 0xFF] << 8) | S[s1 & 0xFF]) ^ ek[k + 2],
+        ((S[s3 >> 24] << 24) | (S[(s0 >> 16) & 0xFF] << 16) |
+         (S[(s1 >> 8) & 0xFF] << 8) | S[s2 & 0xFF]) ^ ek[k + 3],
+    )
+
+
+#  AES Decrypt 1 block (T-table)
+def decrypt_words(s0, s1, s2, s3, dk):
+    """
+    Giải mã 1 block dạng 4 word với round key từ inverse_key_words().
+    Cấu trúc round giống hệt mã hóa, chỉ đổi sang bảng Td / INV_SBOX.
+    """
+    Nr = len(dk) // 4 - 1
+    s0 ^= dk[0]
+    s1 ^= dk[1]
+    s2 ^= dk[2]
+    s3 ^= dk[3]
+
+    k = 4
+    for _ in range(Nr - 1):
+        t0 = TD0[s0 >> 24] ^ TD1[(s3 >> 16) & 0xFF] ^ TD2[(s2 >> 8) & 0xFF] ^ TD3[s1 & 0xFF] ^ dk[k]
+        t1 = TD0[s1 >> 24] ^ TD1[(s0 >> 16) & 0xFF] ^ TD2[(s3 >> 8) & 0xFF] ^ TD3[s2 & 0xFF] ^ dk[k + 1]
+        t2 = TD0[s2 >> 24] ^ TD1[(s1 >> 16) & 0xFF] ^ TD2[(s0 >> 8) & 0xFF] ^ TD3[s3 & 0xFF] ^ dk[k + 2]
+        t3 = TD0[s3 >> 24] ^ TD1[(s2 >> 16) & 0xFF] ^ TD2[(s1 >> 8) & 0xFF] ^ TD3[s0 & 0xFF] ^ dk[k + 3]
+        s0, s1, s2, s3 = t0, t1, t2, t3
+        k += 4
+
+    # Round cuối: InvShiftRows + InvSubBytes + AddRoundKey
+    S = INV_SBOX
+    return (
+        ((S[s0 >> 24] << 24) | (S[(s3 >> 16) & 0xFF] << 16) |
+         (S[(s2 >> 8) & 0xFF] << 8) | S[s1 & 0xFF]) ^ dk[k],
+        ((S[s1 >> 24] << 24) | (S[(s0 >> 16) & 0xFF] << 16) |
+         (S[(s3 >> 8) & 0xFF] << 8) | S[s2 & 0xFF]) ^ dk[k + 1],
+        ((S[s2 >> 24] << 24) | (S[(s1 >> 16) & 0xFF] << 16) |
+         (S[(s0 >> 8) & 0xFF] << 8) | S[s3 & 0xFF]) ^ dk[k + 2],
+        ((S[s3 >> 24] << 24) | (S[(s2 >> 16) & 0xFF] << 16) |
+         (S[(s1 >> 8) & 0xFF] << 8) | S[s0 & 0xFF]) ^ dk[k + 3],
+    )
+
+
+#  Giao diện bytes
+def encrypt_block_words(block16, ek):
+    """
+    Mã hóa 1 block 16 byte (bytes-like) -> bytes.
+    """
+    s0, s1, s2, s3 = BLOCK_WORDS.unpack(block16)
+    return BLOCK_WORDS.pack(*encrypt_words(s0, s1, s2, s3, ek))
+
+
+def decrypt_block_words(block16, dk):
+    """
+    Giải mã 1 block 16 byte (bytes-like) -> bytes.
+    """
+    s0, s1, s2, s3 = BLOCK_WORDS.unpack(block16)
+    return BLOCK_WORDS.pack(*decrypt_words(s0, s1, s2, s3, dk))
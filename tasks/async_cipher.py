@@ -0,0 +1,290 @@
+import asyncio
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from tasks.aes import aes_encrypt, aes_decrypt
+from tasks.aes_modes import (
+    expand_key, pkcs7_pad, pkcs7_unpad,
+    ecb_encrypt_raw, ecb_decrypt_raw, cbc_decrypt_raw, ctr_xor,
+    CTR_NONCE_SIZE
+)
+from tasks.des import (
+    des_encrypt, des_decrypt,
+    ECB_encrypt_into, ECB_decrypt_into, CBC_decrypt_into,
+    pkcs7_pad as des_pkcs7_pad, pkcs7_unpad as des_pkcs7_unpad
+)
+from tasks.parallel import default_workers, get_pool
+from tasks.drbg import random_bytes
+
+# API asyncio cho AES / DES: phần tính toán chạy trên executor để không chặn
+# event loop.
+#   - payload nhỏ (< INLINE_MAX_BYTES) chạy thẳng trên loop (rẻ hơn chi phí dispatch)
+#   - payload lớn được chia thành chunk CHUNK_SIZE byte; các mode cho phép xử lý
+#     độc lập từng chunk (ECB, CTR, CBC giải mã) chạy các chunk song song, các
+#     mode tuần tự (CBC mã hóa, GCM) chạy thành 1 job
+#   - số job đang chạy trên mỗi event loop bị giới hạn bởi MAX_IN_FLIGHT
+#     (backpressure): các request lớn đồng thời phải chờ đến lượt
+#
+# executor: None -> thread pool mặc định của loop, "process" -> process pool
+# dùng chung (tasks.parallel), hoặc 1 concurrent.futures.Executor bất kỳ.
+
+INLINE_MAX_BYTES = 64 << 10
+CHUNK_SIZE = 1 << 20
+MAX_IN_FLIGHT = 2 * default_workers()
+
+_DEFAULT_EXECUTOR = None
+_limits = weakref.WeakKeyDictionary()     # event loop -> (giới hạn, Semaphore)
+
+
+def set_executor(executor):
+    """
+    Đặt executor mặc định (None, "process" hoặc 1 Executor).
+    """
+    global _DEFAULT_EXECUTOR
+    _DEFAULT_EXECUTOR = executor
+
+
+def set_max_in_flight(n: int):
+    """
+    Số job tối đa đang chạy trên executor cho mỗi event loop.
+    """
+    global MAX_IN_FLIGHT
+    if n < 1:
+        raise ValueError("max in-flight jobs must be at least 1")
+    MAX_IN_FLIGHT = n
+
+
+def _resolve_executor(executor):
+    if executor is None:
+        executor = _DEFAULT_EXECUTOR
+    if executor == "process":
+        executor = get_pool(default_workers())
+    return executor
+
+
+def _limiter() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    entry = _limits.get(loop)
+    if entry is None or entry[0] != MAX_IN_FLIGHT:
+        entry = (MAX_IN_FLIGHT, asyncio.Semaphore(MAX_IN_FLIGHT))
+        _limits[loop] = entry
+    return entry[1]
+
+
+async def _submit(executor, fn, *args):
+    """
+    Chạy fn(*args) trên executor, chờ nếu đã đủ MAX_IN_FLIGHT job.
+    """
+    async with _limiter():
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, fn, *args)
+
+
+async def _map_chunks(executor, fn, data, block: int, chunk_size: int, make_args):
+    """
+    Chia data thành chunk (căn theo block), chạy fn(chunk, *make_args(start))
+    trên executor, trả về kết quả đã ghép đúng thứ tự.
+    """
+    chunk_size = max(block, chunk_size - chunk_size % block)
+    view = memoryview(data)
+
+    async def one(start):
+        # Chunk chỉ được copy khi đến lượt chạy -> bộ nhớ tạm bị giới hạn
+        async with _limiter():
+            chunk = bytes(view[start:start + chunk_size])
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(executor, fn, chunk, *make_args(start))
+
+    parts = await asyncio.gather(*(one(s) for s in range(0, len(data), chunk_size)))
+    return b"".join(parts)
+
+
+#  Job chạy trên executor (hàm cấp module -> dùng được với process pool)
+def _aes_ecb_job(chunk, key, decrypt):
+    ks = expand_key(key)
+    return ecb_decrypt_raw(chunk, ks) if decrypt else ecb_encrypt_raw(chunk, ks)
+
+
+def _aes_cbc_decrypt_job(chunk, key, prev):
+    return cbc_decrypt_raw(chunk, expand_key(key), prev)
+
+
+def _aes_ctr_job(chunk, key, nonce, counter):
+    return ctr_xor(chunk, expand_key(key), nonce, counter)
+
+
+def _des_ecb_job(chunk, key, decrypt):
+    out = bytearray(len(chunk))
+    if decrypt:
+        ECB_decrypt_into(chunk, out, key, unpad=False)
+    else:
+        ECB_encrypt_into(chunk, out, key, pad=False)
+    return bytes(out)
+
+
+def _des_cbc_decrypt_job(chunk, key, prev):
+    out = bytearray(len(chunk))
+    CBC_decrypt_into(chunk, out, key, prev, unpad=False)
+    return bytes(out)
+
+
+#  AES
+async def aes_encrypt_async(plaintext: bytes, key: bytes, mode: str, iv=None,
+                            counter: int = 0, aad: bytes = b"", executor=None,
+                            chunk_size: int = CHUNK_SIZE):
+    """
+    Phiên bản awaitable của aes_encrypt, cùng tham số và kết quả (hex, iv).
+    """
+    mode = mode.upper()
+    if len(plaintext) < INLINE_MAX_BYTES:
+        return aes_encrypt(plaintext, key, mode, iv, counter, aad)
+
+    executor = _resolve_executor(executor)
+    key = bytes(key)
+
+    if mode == "ECB":
+        ct = await _map_chunks(executor, _aes_ecb_job, pkcs7_pad(plaintext, 16), 16,
+                               chunk_size, lambda start: (key, False))
+        return ct.hex(), None
+
+    if mode == "CTR":
+        if iv is None:
+            iv = random_bytes(CTR_NONCE_SIZE)
+        if len(iv) != CTR_NONCE_SIZE:
+            raise ValueError("CTR nonce must be 8 bytes")
+        ct = await _map_chunks(executor, _aes_ctr_job, plaintext, 16, chunk_size,
+                               lambda start: (key, iv, counter + start // 16))
+        return ct.hex(), iv
+
+    # CBC mã hóa / GCM: chuỗi phụ thuộc tuần tự -> 1 job
+    return await _submit(executor, aes_encrypt, plaintext, key, mode, iv, counter, aad)
+
+
+async def aes_decrypt_async(ciphertext_hex: str, key: bytes, mode: str, iv=None,
+                            counter: int = 0, aad: bytes = b"", executor=None,
+                            chunk_size: int = CHUNK_SIZE):
+    """
+    Phiên bản awaitable của aes_decrypt, cùng tham số và kết quả.
+    """
+    mode = mode.upper()
+    if len(ciphertext_hex) < 2 * INLINE_MAX_BYTES:
+        return aes_decrypt(ciphertext_hex, key, mode, iv, counter, aad)
+
+    executor = _resolve_executor(executor)
+    key = bytes(key)
+    if mode not in ("ECB", "CBC", "CTR"):
+        return await _submit(executor, aes_decrypt, ciphertext_hex, key, mode, iv, counter, aad)
+
+    ct = bytes.fromhex(ciphertext_hex)
+
+    if mode == "CTR":
+        if iv is None:
+            raise ValueError("Nonce is required for CTR decryption")
+        if len(iv) != CTR_NONCE_SIZE:
+            raise ValueError("CTR nonce must be 8 bytes")
+        return await _map_chunks(executor, _aes_ctr_job, ct, 16, chunk_size,
+                                 lambda start: (key, iv, counter + start // 16))
+
+    if len(ct) == 0 or len(ct) % 16:
+        raise ValueError("Ciphertext length must be a non-zero multiple of 16")
+
+    if mode == "ECB":
+        pt = await _map_chunks(executor, _aes_ecb_job, ct, 16, chunk_size,
+                               lambda start: (key, True))
+    else:
+        if iv is None:
+            raise ValueError("IV is required for CBC decryption")
+        # CBC giải mã: mỗi chunk chỉ cần block ciphertext đứng trước nó
+        pt = await _map_chunks(executor, _aes_cbc_decrypt_job, ct, 16, chunk_size,
+                               lambda start: (key, ct[start - 16:start] if start else iv))
+    return pkcs7_unpad(pt)
+
+
+#  DES
+async def des_encrypt_async(plaintext: bytes, key: bytes, mode: str, iv=None,
+                            executor=None, chunk_size: int = CHUNK_SIZE):
+    """
+    Phiên bản awaitable của des_encrypt, trả về (ciphertext, iv).
+    """
+    mode = mode.upper()
+    if len(plaintext) < INLINE_MAX_BYTES:
+        return des_encrypt(plaintext, key, mode, iv)
+
+    executor = _resolve_executor(executor)
+    key = bytes(key)
+
+    if mode == "ECB":
+        ct = await _map_chunks(executor, _des_ecb_job, des_pkcs7_pad(plaintext, 8), 8,
+                               chunk_size, lambda start: (key, False))
+        return ct, None
+
+    return await _submit(executor, des_encrypt, plaintext, key, mode, iv)
+
+
+async def des_decrypt_async(ciphertext: bytes, key: bytes, mode: str, iv=None,
+                            executor=None, chunk_size: int = CHUNK_SIZE):
+    """
+    Phiên bản awaitable của des_decrypt, trả về plaintext.
+    """
+    mode = mode.upper()
+    if len(ciphertext) < INLINE_MAX_BYTES:
+        return des_decrypt(ciphertext, key, mode, iv)
+
+    executor = _resolve_executor(executor)
+    key = bytes(key)
+    if mode not in ("ECB", "CBC"):
+        return await _submit(executor, des_decrypt, ciphertext, key, mode, iv)
+    if len(ciphertext) % 8:
+        raise ValueError("Ciphertext length must be a multiple of 8")
+
+    ct = bytes(ciphertext)
+
+    if mode == "ECB":
+        pt = await _map_chunks(executor, _des_ecb_job, ct, 8, chunk_size,
+                               lambda start: (key, True))
+    else:
+        if iv is None:
+            raise ValueError("CBC mode requires IV")
+        pt = await _map_chunks(executor, _des_cbc_decrypt_job, ct, 8, chunk_size,
+                               lambda start: (key, ct[start - 8:start] if start else iv))
+    return des_pkcs7_unpad(pt)
+
+
+#  Luồng dữ liệu (async iterator)
+async def _iterate(chunks):
+    if hasattr(chunks, "__aiter__"):
+        async for chunk in chunks:
+            yield chunk
+    else:
+        for chunk in chunks:
+            yield chunk
+
+
+async def stream_cipher(context, chunks, executor=None, inline_max: int = INLINE_MAX_BYTES):
+    """
+    Chạy 1 context update/finalize (AESEncryptor, AESGCMEncryptor, DESDecryptor, ...)
+    trên body dạng luồng (async iterable hoặc iterable bytes), yield output
+    theo từng phần:
+
+        enc = AESEncryptor(key, "CTR")
+        async for part in stream_cipher(enc, request.body):
+            await response.write(part)
+
+    Mỗi lần chỉ xử lý 1 chunk -> nguồn bị đọc chậm lại khi bên nhận chậm
+    (backpressure tự nhiên của async generator). Chunk lớn chạy trên
+    executor kiểu thread (context giữ trạng thái trong process hiện tại).
+    """
+    executor = _resolve_executor(executor)
+    if isinstance(executor, ProcessPoolExecutor):
+        raise ValueError("Streaming contexts require a thread executor")
+
+    async for chunk in _iterate(chunks):
+        if len(chunk) < inline_max:
+            out = context.update(chunk)
+        else:
+            out = await _submit(executor, context.update, chunk)
+        if out:
+            yield out
+
+    out = context.finalize()
+    if out:
+        yield out
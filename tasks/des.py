@@ -1,5 +1,30 @@
-import os
+from functools import partial
+import numpy as np
+from .drbg import random_bytes
 from .des_tables import IP, FP, E, P, SBOX, PC1, PC2, SHIFTS
+from .des_spbox import (
+    BLOCK, get_subkeys, get_subkeys3, crypt_int, crypt3_int, crypt_block, crypt3_block,
+    TDES_KEY_SIZES
+)
+from .des_numpy import get_key_masks, as_array, ecb_inplace, cbc_decrypt_inplace, ctr_blocks
+from .parallel import default_workers, split_ranges, run_in_shared_memory
+
+# Block engine: "spbox" (số nguyên + SP-box, tasks/des_spbox.py) hoặc
+# "reference" (list bit bên dưới). Hai engine cho kết quả giống hệt nhau.
+BLOCK_BACKENDS = ("spbox", "reference")
+BLOCK_BACKEND = "spbox"
+
+# Với backend "spbox", ECB / CBC giải mã trên buffer từ ngưỡng này trở lên
+# chạy bằng engine bitsliced NumPy (tasks/des_numpy.py) thay vì từng block.
+NUMPY_MIN_BYTES = 2048
+
+# Từ ngưỡng này trở lên, ECB và CBC giải mã được chia thành các chunk căn
+# 8 byte (PARALLEL_CHUNK_SIZE byte / chunk) và chạy trên process pool dùng chung.
+PARALLEL_MIN_BYTES = 1 << 19
+PARALLEL_CHUNK_SIZE = 1 << 20
+
+# CTR: IV 8 byte là counter block đầu tiên, tăng dần mod 2^64
+CTR_NONCE_SIZE = 8
 
 # Bit utilities
 def bytes_to_bits(data: bytes):
@@ -80,6 +105,83 @@ def des_decrypt_block(bits64, subkeys):
     return permute(R + L, FP)
 
 
+def set_block_backend(name: str):
+    global BLOCK_BACKEND
+    if name not in BLOCK_BACKENDS:
+        raise ValueError("DES block backend must be one of: " + ", ".join(BLOCK_BACKENDS))
+    BLOCK_BACKEND = name
+
+
+def _reference_block(block, subkeys, block_fn):
+    return bits_to_bytes(block_fn(bytes_to_bits(block), subkeys))
+
+
+def _compose(*fns):
+    def block_fn(block):
+        for fn in fns:
+            block = fn(block)
+        return block
+    return block_fn
+
+
+def _block_ciphers(key: bytes):
+    """
+    Trả về (encrypt_block, decrypt_block): bytes8 -> bytes8 theo backend đang chọn.
+    Khóa 8 byte: DES; 16 / 24 byte: 3DES-EDE2 / EDE3 (E_K3 D_K2 E_K1).
+    """
+    if len(key) in TDES_KEY_SIZES:
+        if BLOCK_BACKEND == "reference":
+            k3 = key[16:] if len(key) == 24 else key[:8]
+            e1, d1 = _block_ciphers(key[:8])
+            e2, d2 = _block_ciphers(key[8:16])
+            e3, d3 = _block_ciphers(k3)
+            return _compose(e1, d2, e3), _compose(d3, e2, d1)
+        ek3, dk3 = get_subkeys3(bytes(key))
+        return partial(crypt3_block, ks3=ek3), partial(crypt3_block, ks3=dk3)
+
+    if BLOCK_BACKEND == "reference":
+        subkeys = key_schedule(bytes_to_bits(key))
+        return (
+            partial(_reference_block, subkeys=subkeys, block_fn=des_encrypt_block),
+            partial(_reference_block, subkeys=subkeys, block_fn=des_decrypt_block),
+        )
+    ek, dk = get_subkeys(bytes(key))
+    return partial(crypt_block, ks=ek), partial(crypt_block, ks=dk)
+
+
+def _int_block(x: int, block_fn) -> int:
+    return BLOCK.unpack(block_fn(BLOCK.pack(x)))[0]
+
+
+def _int_ciphers(key: bytes):
+    """
+    Như _block_ciphers nhưng trên block dạng int 64-bit (dùng cho *_into:
+    đọc / ghi buffer bằng unpack_from / pack_into, không tạo bytes mỗi block).
+    """
+    if BLOCK_BACKEND == "reference":
+        encrypt, decrypt = _block_ciphers(key)
+        return partial(_int_block, block_fn=encrypt), partial(_int_block, block_fn=decrypt)
+    if len(key) in TDES_KEY_SIZES:
+        ek3, dk3 = get_subkeys3(bytes(key))
+        return partial(crypt3_int, ks3=ek3), partial(crypt3_int, ks3=dk3)
+    ek, dk = get_subkeys(bytes(key))
+    return partial(crypt_int, ks=ek), partial(crypt_int, ks=dk)
+
+
+def _use_numpy(nbytes: int) -> bool:
+    return BLOCK_BACKEND == "spbox" and nbytes >= NUMPY_MIN_BYTES
+
+
+def _use_parallel(nbytes: int, workers: int) -> bool:
+    return workers > 1 and nbytes >= PARALLEL_MIN_BYTES and _use_numpy(nbytes)
+
+
+def _chunk_ranges(nbytes: int, chunk_size: int = None):
+    chunk_size = chunk_size or PARALLEL_CHUNK_SIZE
+    chunk_size = max(8, chunk_size - chunk_size % 8)
+    return split_ranges(nbytes, -(-nbytes // chunk_size), 8)
+
+
 # PKCS7 Padding
 def pkcs7_pad(data: bytes, block=8):
     pad_len = block - (len(data) % block)
@@ -92,68 +194,348 @@ def pkcs7_unpad(data: bytes):
 
 
 # ECB Mode
-def ECB_encrypt(plaintext: bytes, key: bytes):
-    subkeys = key_schedule(bytes_to_bits(key))
+# workers: số process cho buffer lớn (None = số CPU, 1 = chỉ process hiện tại)
+# chunk_size: kích thước mỗi phần việc gửi cho pool (mặc định PARALLEL_CHUNK_SIZE)
+def ECB_encrypt(plaintext: bytes, key: bytes, workers: int = None, chunk_size: int = None):
+    if workers is None:
+        workers = default_workers()
     pt = pkcs7_pad(plaintext, 8)
-    out = b""
-
-    for i in range(0, len(pt), 8):
-        block = bytes_to_bits(pt[i:i+8])
-        enc_bits = des_encrypt_block(block, subkeys)
-        out += bits_to_bytes(enc_bits)
-
-    return out
-
+    out = bytearray(len(pt))
+    ECB_encrypt_into(pt, out, key, pad=False, workers=workers, chunk_size=chunk_size)
+    return bytes(out)
 
-def ECB_decrypt(cipher: bytes, key: bytes):
-    subkeys = key_schedule(bytes_to_bits(key))
-    out = b""
 
-    for i in range(0, len(cipher), 8):
-        block = bytes_to_bits(cipher[i:i+8])
-        dec_bits = des_decrypt_block(block, subkeys)
-        out += bits_to_bytes(dec_bits)
-
-    return pkcs7_unpad(out)
+def ECB_decrypt(cipher: bytes, key: bytes, workers: int = None, chunk_size: int = None):
+    if workers is None:
+        workers = default_workers()
+    out = bytearray(len(cipher))
+    n = ECB_decrypt_into(cipher, out, key, workers=workers, chunk_size=chunk_size)
+    return bytes(out[:n])
 
 
 # CBC Mode
 def CBC_encrypt(plaintext: bytes, key: bytes, iv: bytes = None):
     if iv is None:
-        iv = os.urandom(8)
+        iv = random_bytes(8)
 
-    subkeys = key_schedule(bytes_to_bits(key))
     pt = pkcs7_pad(plaintext)
+    out = bytearray(len(pt))
+    CBC_encrypt_into(pt, out, key, iv, pad=False)
+    return bytes(out), iv
+
+
+def CBC_decrypt(cipher: bytes, key: bytes, iv: bytes, workers: int = None,
+                chunk_size: int = None):
+    if workers is None:
+        workers = default_workers()
+    out = bytearray(len(cipher))
+    n = CBC_decrypt_into(cipher, out, key, iv, workers=workers, chunk_size=chunk_size)
+    return bytes(out[:n])
+
+
+# OFB / CFB Mode (không padding)
+def _xor_bytes(a, b):
+    n = len(a)
+    return (int.from_bytes(a, "big") ^ int.from_bytes(b, "big")).to_bytes(n, "big")
+
+
+def OFB_keystream(key: bytes, iv: bytes, nbytes: int):
+    """
+    nbytes byte keystream OFB đầu tiên (không phụ thuộc dữ liệu -> sinh trước được).
+    """
+    if len(iv) != 8:
+        raise ValueError("OFB IV must be 8 bytes")
+    encrypt, _ = _block_ciphers(key)
+    out = []
     prev = iv
-    out = b""
 
-    for i in range(0, len(pt), 8):
-        block = pt[i:i+8]
-        xored = bytes([a ^ b for a, b in zip(block, prev)])
-        enc_bits = des_encrypt_block(bytes_to_bits(xored), subkeys)
-        ct = bits_to_bytes(enc_bits)
-        out += ct
-        prev = ct
+    for _ in range(-(-nbytes // 8)):
+        prev = encrypt(prev)
+        out.append(prev)
+
+    return b"".join(out)[:nbytes]
+
+
+def OFB_encrypt(plaintext: bytes, key: bytes, iv: bytes = None, keystream=None):
+    """
+    keystream: kết quả OFB_keystream(key, iv, n) với n >= len(plaintext)
+    -> mã hóa chỉ còn 1 phép XOR.
+    """
+    if iv is None:
+        if keystream is not None:
+            raise ValueError("OFB IV is required with a precomputed keystream")
+        iv = random_bytes(8)
+    if len(iv) != 8:
+        raise ValueError("OFB IV must be 8 bytes")
+
+    n = len(plaintext)
+    if keystream is None:
+        keystream = OFB_keystream(key, iv, n)
+    elif len(keystream) < n:
+        raise ValueError("OFB keystream is shorter than the data")
+
+    return _xor_bytes(plaintext, keystream[:n]), iv
+
 
-    return out, iv
+def OFB_decrypt(cipher: bytes, key: bytes, iv: bytes, keystream=None):
+    return OFB_encrypt(cipher, key, iv, keystream)[0]
 
 
-def CBC_decrypt(cipher: bytes, key: bytes, iv: bytes):
-    subkeys = key_schedule(bytes_to_bits(key))
+def CFB_encrypt(plaintext: bytes, key: bytes, iv: bytes = None):
+    """
+    CFB-64: C_i = P_i XOR E(C_{i-1}), block cuối có thể ngắn hơn 8 byte.
+    """
+    if iv is None:
+        iv = random_bytes(8)
+    if len(iv) != 8:
+        raise ValueError("CFB IV must be 8 bytes")
+
+    encrypt, _ = _block_ciphers(key)
     prev = iv
-    out = b""
+    out = []
 
-    for i in range(0, len(cipher), 8):
-        block = cipher[i:i+8]
-        dec_bits = des_decrypt_block(bytes_to_bits(block), subkeys)
-        dec = bits_to_bytes(dec_bits)
-        out += bytes([a ^ b for a, b in zip(dec, prev)])
+    for i in range(0, len(plaintext), 8):
+        block = plaintext[i:i+8]
+        prev = _xor_bytes(block, encrypt(prev)[:len(block)])
+        out.append(prev)
+
+    return b"".join(out), iv
+
+
+def CFB_decrypt(cipher: bytes, key: bytes, iv: bytes, workers: int = None,
+                chunk_size: int = None):
+    """
+    Keystream block i = E(C_{i-1}) chỉ phụ thuộc ciphertext -> mã hóa cả dãy
+    IV || C[:-8] trong 1 lượt (song song như ECB nếu đủ lớn) rồi XOR 1 lần.
+    """
+    if len(iv) != 8:
+        raise ValueError("CFB IV must be 8 bytes")
+    if workers is None:
+        workers = default_workers()
+    n = len(cipher)
+    nblocks = -(-n // 8)
+    prevs = bytearray(bytes(iv) + bytes(cipher[:8 * (nblocks - 1)]))
+    _ecb_key_into(prevs, prevs, len(prevs), key, False, workers, chunk_size)
+    return _xor_bytes(cipher, prevs[:n])
+
+
+def CFB8_encrypt(plaintext: bytes, key: bytes, iv: bytes = None):
+    """
+    CFB-8: thanh ghi dịch 8 byte, mỗi byte cần 1 lần mã hóa block.
+    """
+    if iv is None:
+        iv = random_bytes(8)
+    if len(iv) != 8:
+        raise ValueError("CFB8 IV must be 8 bytes")
+
+    encrypt, _ = _block_ciphers(key)
+    reg = bytes(iv)
+    out = bytearray(len(plaintext))
+
+    for i, p in enumerate(plaintext):
+        c = p ^ encrypt(reg)[0]
+        out[i] = c
+        reg = reg[1:] + bytes((c,))
+
+    return bytes(out), iv
+
+
+def CFB8_decrypt(cipher: bytes, key: bytes, iv: bytes, workers: int = None,
+                 chunk_size: int = None):
+    """
+    Keystream của byte i = byte đầu của E(8 byte đứng trước nó trong IV || C):
+    các cửa sổ độc lập với nhau -> gom tất cả vào 1 buffer, mã hóa như ECB
+    (song song nếu đủ lớn) rồi lấy byte đầu mỗi block.
+    """
+    if len(iv) != 8:
+        raise ValueError("CFB8 IV must be 8 bytes")
+    if workers is None:
+        workers = default_workers()
+
+    n = len(cipher)
+    stream = np.frombuffer(bytes(iv) + bytes(cipher), dtype=np.uint8)
+    windows = bytearray(np.lib.stride_tricks.sliding_window_view(stream, 8)[:n].tobytes())
+    _ecb_key_into(windows, windows, len(windows), key, False, workers, chunk_size)
+    return _xor_bytes(cipher, windows[::8])
+
+
+# CTR Mode (không padding)
+def CTR_keystream(key: bytes, iv: bytes, counter: int, nbytes: int):
+    """
+    nbytes byte keystream bắt đầu từ counter block IV + counter.
+    """
+    nblocks = -(-nbytes // 8)
+    ks = bytearray(ctr_blocks(iv, counter, nblocks).tobytes())
+    _ecb_key_into(ks, ks, len(ks), key, False)
+    return bytes(ks[:nbytes])
+
+
+def CTR_encrypt(plaintext: bytes, key: bytes, iv: bytes = None, counter: int = 0):
+    """
+    iv: counter block đầu 8 byte (tự sinh nếu không có), counter: số block
+    bỏ qua tính từ iv. Trả về (ciphertext, iv).
+    """
+    if iv is None:
+        iv = random_bytes(CTR_NONCE_SIZE)
+    if len(iv) != CTR_NONCE_SIZE:
+        raise ValueError("DES CTR IV must be 8 bytes")
+    return _xor_bytes(plaintext, CTR_keystream(key, iv, counter, len(plaintext))), iv
+
+
+def CTR_decrypt(cipher: bytes, key: bytes, iv: bytes, counter: int = 0):
+    return CTR_encrypt(cipher, key, iv, counter)[0]
+
+
+# Buffer API (*_into): ghi thẳng vào dst (bytearray / memoryview / mmap),
+# dst có thể trùng src. Trả về số byte đã ghi (unpad=True: độ dài plaintext).
+def _into_layout(src, dst, pad):
+    n = len(src)
+    if pad:
+        n_full, total = n - n % 8, n + 8 - n % 8
+    else:
+        if n % 8:
+            raise ValueError("Input length must be a multiple of 8 when pad=False")
+        n_full = total = n
+    if len(dst) < total:
+        raise ValueError(f"Output buffer too small: need {total} bytes")
+    return n_full, total
+
+
+def _check_decrypt_into(src, dst):
+    n = len(src)
+    if n % 8:
+        raise ValueError("Ciphertext length must be a multiple of 8")
+    if len(dst) < n:
+        raise ValueError(f"Output buffer too small: need {n} bytes")
+    return n
+
+
+def _pad_tail(src, n_full):
+    tail = bytearray(src[n_full:])
+    pad_len = 8 - len(tail)
+    tail += bytes([pad_len]) * pad_len
+    return tail
+
+
+def _unpad_len(dst, n, unpad):
+    if not unpad:
+        return n
+    if n == 0:
+        raise ValueError("Ciphertext is empty")
+    return n - dst[n - 1]
+
+
+def _ecb_into(src, dst, n, crypt):
+    unpack_from, pack_into = BLOCK.unpack_from, BLOCK.pack_into
+    for off in range(0, n, 8):
+        pack_into(dst, off, crypt(unpack_from(src, off)[0]))
+
+
+def _copy_into(src, dst, n):
+    if n and src is not dst:
+        memoryview(dst)[:n] = memoryview(src)[:n]
+
+
+def _ecb_key_into(src, dst, n, key, decrypt, workers=1, chunk_size=None):
+    """
+    ECB trên n byte đầu của src -> dst: engine bitsliced nếu đủ lớn (song song
+    trên process pool nếu rất lớn), ngược lại từng block.
+    """
+    if _use_parallel(n, workers):
+        # Mask khóa tính 1 lần ở đây rồi gửi cho mọi chunk
+        masks = get_key_masks(bytes(key))[decrypt]
+        run_in_shared_memory(memoryview(src)[:n], _ecb_range, _chunk_ranges(n, chunk_size),
+                             (masks,), workers, out=dst)
+    elif _use_numpy(n):
+        _copy_into(src, dst, n)
+        ecb_inplace(as_array(dst, n), get_key_masks(bytes(key))[decrypt])
+    else:
+        _ecb_into(src, dst, n, _int_ciphers(key)[decrypt])
+
+
+def _ecb_range(buf, start, masks):
+    """
+    Worker: ECB tại chỗ trên đoạn [start, start+len(buf)) trong shared memory.
+    """
+    ecb_inplace(buf, masks)
+
+
+def _cbc_decrypt_range(buf, start, masks, prev):
+    """
+    Worker: giải mã CBC đoạn trong shared memory; prev là block ciphertext
+    ngay trước đoạn (lấy trước khi chia việc).
+    """
+    cbc_decrypt_inplace(buf, masks, prev)
+
+
+def _cbc_encrypt_into(src, dst, n, encrypt, prev: int) -> int:
+    """
+    CBC mã hóa n byte (đã căn 8) từ src vào dst; prev = block ciphertext
+    trước đó dạng int. Trả về prev mới.
+    """
+    unpack_from, pack_into = BLOCK.unpack_from, BLOCK.pack_into
+    for off in range(0, n, 8):
+        prev = encrypt(unpack_from(src, off)[0] ^ prev)
+        pack_into(dst, off, prev)
+    return prev
+
+
+def ECB_encrypt_into(src, dst, key: bytes, pad=True, workers: int = 1, chunk_size: int = None):
+    n_full, total = _into_layout(src, dst, pad)
+    _ecb_key_into(src, dst, n_full, key, False, workers, chunk_size)
+    if pad:
+        tail = _pad_tail(src, n_full)
+        _ecb_key_into(tail, tail, 8, key, False)
+        dst[n_full:total] = tail
+    return total
+
+
+def ECB_decrypt_into(src, dst, key: bytes, unpad=True, workers: int = 1, chunk_size: int = None):
+    n = _check_decrypt_into(src, dst)
+    _ecb_key_into(src, dst, n, key, True, workers, chunk_size)
+    return _unpad_len(dst, n, unpad)
+
+
+def CBC_encrypt_into(src, dst, key: bytes, iv: bytes, pad=True):
+    encrypt, _ = _int_ciphers(key)
+    n_full, total = _into_layout(src, dst, pad)
+    prev = _cbc_encrypt_into(src, dst, n_full, encrypt, BLOCK.unpack(iv)[0])
+    if pad:
+        tail = _pad_tail(src, n_full)
+        _cbc_encrypt_into(tail, tail, 8, encrypt, prev)
+        dst[n_full:total] = tail
+    return total
+
+
+def CBC_decrypt_into(src, dst, key: bytes, iv: bytes, unpad=True, workers: int = 1,
+                     chunk_size: int = None):
+    n = _check_decrypt_into(src, dst)
+    if _use_parallel(n, workers):
+        ranges = _chunk_ranges(n, chunk_size)
+        prevs = [(bytes(iv) if start == 0 else bytes(src[start-8:start]),) for start, _ in ranges]
+        run_in_shared_memory(memoryview(src)[:n], _cbc_decrypt_range, ranges,
+                             (get_key_masks(bytes(key))[1],), workers, prevs, out=dst)
+        return _unpad_len(dst, n, unpad)
+
+    if _use_numpy(n):
+        _copy_into(src, dst, n)
+        cbc_decrypt_inplace(as_array(dst, n), get_key_masks(bytes(key))[1], bytes(iv))
+        return _unpad_len(dst, n, unpad)
+
+    _, decrypt = _int_ciphers(key)
+    unpack_from, pack_into = BLOCK.unpack_from, BLOCK.pack_into
+    prev = BLOCK.unpack(iv)[0]
+
+    for off in range(0, n, 8):
+        block = unpack_from(src, off)[0]   # đọc trước khi dst (có thể = src) bị ghi đè
+        pack_into(dst, off, decrypt(block) ^ prev)
         prev = block
 
-    return pkcs7_unpad(out)
+    return _unpad_len(dst, n, unpad)
 
 
 # PUBLIC API for app.py
+# key 8 byte: DES, 16 / 24 byte: 3DES-EDE2 / EDE3 (mọi mode)
 def des_encrypt(plaintext: bytes, key: bytes, mode: str, iv=None):
     mode = mode.upper()
 
@@ -164,7 +546,19 @@ def des_encrypt(plaintext: bytes, key: bytes, mode: str, iv=None):
         ct, used_iv = CBC_encrypt(plaintext, key, iv)
         return ct, used_iv
 
-    raise ValueError("Mode must be ECB or CBC")
+    if mode == "CTR":
+        return CTR_encrypt(plaintext, key, iv)
+
+    if mode == "OFB":
+        return OFB_encrypt(plaintext, key, iv)
+
+    if mode == "CFB":
+        return CFB_encrypt(plaintext, key, iv)
+
+    if mode == "CFB8":
+        return CFB8_encrypt(plaintext, key, iv)
+
+    raise ValueError("Mode must be ECB, CBC, CTR, OFB, CFB or CFB8")
 
 
 def des_decrypt(ciphertext: bytes, key: bytes, mode: str, iv=None):
@@ -178,4 +572,135 @@ def des_decrypt(ciphertext: bytes, key: bytes, mode: str, iv=None):
             raise ValueError("CBC mode requires IV")
         return CBC_decrypt(ciphertext, key, iv)
 
-    raise ValueError("Mode must be ECB or CBC")
+    if mode in ("CTR", "OFB", "CFB", "CFB8"):
+        if iv is None:
+            raise ValueError(f"{mode} mode requires IV")
+        if mode == "CTR":
+            return CTR_decrypt(ciphertext, key, iv)
+        if mode == "OFB":
+            return OFB_decrypt(ciphertext, key, iv)
+        if mode == "CFB":
+            return CFB_decrypt(ciphertext, key, iv)
+        return CFB8_decrypt(ciphertext, key, iv)
+
+    raise ValueError("Mode must be ECB, CBC, CTR, OFB, CFB or CFB8")
+
+
+# Batch API: nhiều message độc lập dưới cùng 1 khóa (key schedule tính 1 lần).
+# Block của mọi message được gom vào 1 buffer và chạy qua engine 1 lượt;
+# CBC mã hóa: các chuỗi tiến cùng nhịp, bước t xử lý block t của mọi message.
+def _batch_layout(sizes):
+    start, pos = [], 0
+    for n in sizes:
+        start.append(pos)
+        pos += n
+    return start, pos
+
+
+def _split_batch(data, start, sizes):
+    return [bytes(data[s:s+n]) for s, n in zip(start, sizes)]
+
+
+def _check_batch_ivs(ivs, count):
+    if len(ivs) != count:
+        raise ValueError(f"Expected {count} IVs, got {len(ivs)}")
+    if any(len(iv) != 8 for iv in ivs):
+        raise ValueError("Every IV must be 8 bytes")
+
+
+def _cbc_encrypt_lockstep(buf, ivs, sizes, start, key):
+    """
+    CBC mã hóa tại chỗ mọi message trong buf: ở bước t, block t của các
+    message còn chạy XOR với chuỗi của nó rồi qua engine trong 1 lần gọi.
+    """
+    blocks = np.frombuffer(buf, dtype=np.uint8).reshape(-1, 8)
+    nblocks = np.array(sizes, dtype=np.int64) // 8
+    # Message dài nhất đứng đầu -> ở bước t, các chuỗi còn chạy là 1 tiền tố
+    order = np.argsort(-nblocks, kind="stable")
+    sorted_len = nblocks[order]
+    sorted_start = np.array(start, dtype=np.int64)[order] // 8
+    chain = np.frombuffer(b"".join(ivs), dtype=np.uint8).reshape(-1, 8)[order].copy()
+
+    steps = int(sorted_len[0]) if len(sorted_len) else 0
+    for t in range(steps):
+        active = int(np.count_nonzero(sorted_len > t))
+        if active == 1:
+            # Chỉ còn 1 chuỗi: chạy nốt phần còn lại trực tiếp trên buf
+            s, n = 8 * (int(sorted_start[0]) + t), 8 * (int(sorted_len[0]) - t)
+            rest = memoryview(buf)[s:s + n]
+            _cbc_encrypt_into(rest, rest, n, _int_ciphers(key)[0], BLOCK.unpack(chain[0].tobytes())[0])
+            rest.release()
+            break
+        idx = sorted_start[:active] + t
+        x = bytearray((blocks[idx] ^ chain[:active]).tobytes())
+        _ecb_key_into(x, x, len(x), key, False)
+        c = np.frombuffer(x, dtype=np.uint8).reshape(-1, 8)
+        chain[:active] = c
+        blocks[idx] = c
+
+
+def des_encrypt_many(messages, key: bytes, mode: str, ivs=None, as_hex=False):
+    """
+    Trả về list (ciphertext, iv) theo đúng thứ tự message, giống des_encrypt;
+    ciphertext là bytes, hoặc chuỗi hex nếu as_hex=True.
+    """
+    mode = mode.upper()
+    if mode not in ("ECB", "CBC"):
+        raise ValueError("Mode must be ECB or CBC")
+
+    padded = [pkcs7_pad(m, 8) for m in messages]
+    sizes = [len(p) for p in padded]
+    start, total = _batch_layout(sizes)
+    buf = bytearray(b"".join(padded))
+
+    if mode == "ECB":
+        ivs = [None] * len(padded)
+        _ecb_key_into(buf, buf, total, key, False)
+    else:
+        if ivs is None:
+            pool = random_bytes(8 * len(padded))
+            ivs = [pool[i:i+8] for i in range(0, len(pool), 8)]
+        _check_batch_ivs(ivs, len(padded))
+
+        _cbc_encrypt_lockstep(buf, ivs, sizes, start, key)
+
+    cts = _split_batch(buf, start, sizes)
+    if as_hex:
+        cts = [ct.hex() for ct in cts]
+    return list(zip(cts, ivs))
+
+
+def des_decrypt_many(ciphertexts, key: bytes, mode: str, ivs=None):
+    """
+    ciphertexts: list bytes hoặc chuỗi hex; ivs bắt buộc với CBC.
+    Trả về list plaintext (bytes) theo đúng thứ tự.
+    """
+    mode = mode.upper()
+    if mode not in ("ECB", "CBC"):
+        raise ValueError("Mode must be ECB or CBC")
+
+    cts = [bytes.fromhex(c) if isinstance(c, str) else bytes(c) for c in ciphertexts]
+    if any(len(c) == 0 or len(c) % 8 for c in cts):
+        raise ValueError("Ciphertext length must be a non-zero multiple of 8")
+    if mode == "CBC":
+        if ivs is None:
+            raise ValueError("CBC mode requires IV")
+        _check_batch_ivs(ivs, len(cts))
+
+    sizes = [len(c) for c in cts]
+    start, total = _batch_layout(sizes)
+    data = b"".join(cts)
+    buf = bytearray(data)
+    _ecb_key_into(buf, buf, total, key, True)
+
+    if mode == "CBC":
+        # P_i = D(C_i) ^ C_{i-1}, block đầu mỗi message XOR với IV của nó
+        prev = bytearray(8) + bytearray(data[:-8])
+        for s, iv in zip(start, ivs):
+            prev[s:s+8] = iv
+        n = len(buf)
+        buf = bytearray(
+            (int.from_bytes(buf, "big") ^ int.from_bytes(prev, "big")).to_bytes(n, "big")
+        )
+
+    return [pkcs7_unpad(pt) for pt in _split_batch(buf, start, sizes)]
@@ -0,0 +1,191 @@
+from functools import lru_cache
+import numpy as np
+from tasks.des_tables import IP, FP, E, P, SBOX
+from tasks.des_spbox import KEY_CACHE_SIZE, TDES_KEY_SIZES, get_subkeys, get_subkeys3
+
+# DES bitsliced bằng NumPy cho nhiều block cùng lúc.
+# N block được chuyển thành 64 "bit-plane": plane[b] là mảng uint64 độ dài
+# ceil(N / 64), bit k của word w = bit b (b = 0 là bit cao nhất) của block 64w + k.
+#   - IP / FP / E / P chỉ là đánh lại chỉ số plane (không tính toán gì)
+#   - XOR subkey = XOR plane với 0 hoặc ~0
+#   - S-box là mạch AND / XOR sinh từ dạng chuẩn đại số (ANF) của bảng SBOX:
+#     64 tích (monomial) của 6 bit vào được tính chung cho cả 8 S-box,
+#     mỗi bit ra = XOR các tích có hệ số 1
+# Mỗi phép toán xử lý 64 block trên 1 word, vòng lặp Python chỉ chạy theo round.
+
+CHUNK_BLOCKS = 1 << 15
+
+_ONES = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+IP_IDX = np.array([i - 1 for i in IP])
+FP_IDX = np.array([i - 1 for i in FP])
+E_IDX = np.array([i - 1 for i in E])
+P_IDX = np.array([i - 1 for i in P])
+
+
+#  S-box dạng ANF
+def _anf(truth):
+    """
+    Biến đổi Möbius: bảng chân trị 64 phần tử -> hệ số ANF (chỉ số = monomial).
+    """
+    a = list(truth)
+    for k in range(6):
+        for x in range(64):
+            if x >> k & 1:
+                a[x] ^= a[x ^ (1 << k)]
+    return a
+
+
+def _sbox_monomials():
+    """
+    MONOMIALS[i][j]: các monomial (bit k của chỉ số = bit vào có trọng số 2^k)
+    có hệ số 1 trong bit ra j (j = 0 là bit cao nhất) của S-box i.
+    """
+    out = []
+    for i in range(8):
+        box = []
+        for j in range(4):
+            truth = []
+            for x in range(64):
+                row = ((x >> 4) & 2) | (x & 1)
+                col = (x >> 1) & 15
+                truth.append((SBOX[i][row][col] >> (3 - j)) & 1)
+            coef = _anf(truth)
+            box.append(np.array([m for m in range(64) if coef[m]]))
+        out.append(box)
+    return out
+
+
+MONOMIALS = _sbox_monomials()
+
+
+def sboxes(x):
+    """
+    x: (48, W) plane sau khi XOR subkey -> (32, W) plane output 8 S-box (trước P).
+    """
+    w = x.shape[1]
+    # bits[p]: bit thứ p (p = 0 là bit cao nhất) của nhóm 6 bit, cho cả 8 S-box
+    bits = x.reshape(8, 6, w).transpose(1, 0, 2)
+    prod = np.empty((8, 64, w), dtype=np.uint64)
+    prod[:, 0] = _ONES
+    for k in range(6):
+        np.bitwise_and(prod[:, :1 << k], bits[5 - k][:, None], out=prod[:, 1 << k:2 << k])
+
+    out = np.empty((32, w), dtype=np.uint64)
+    for i in range(8):
+        p = prod[i]
+        for j in range(4):
+            np.bitwise_xor.reduce(p[MONOMIALS[i][j]], axis=0, out=out[4 * i + j])
+    return out
+
+
+#  Subkey dạng mask
+def key_masks(ks):
+    """
+    ks: 128 nhóm 6 bit (des_spbox.get_subkeys) -> mảng (16, 48, 1) uint64,
+    mỗi phần tử 0 hoặc ~0 theo bit subkey tương ứng.
+    """
+    bits = np.array(
+        [(ks[8 * r + e // 6] >> (5 - e % 6)) & 1 for r in range(16) for e in range(48)],
+        dtype=np.uint64,
+    ).reshape(16, 48, 1)
+    return bits * _ONES
+
+
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def get_key_masks(key: bytes):
+    """
+    (encrypt, decrypt) của khóa: mỗi phần tử là bộ key_masks theo thứ tự các
+    lượt DES (1 lượt với khóa 8 byte, 3 lượt EDE với khóa 16 / 24 byte).
+    """
+    key = bytes(key)
+    if len(key) in TDES_KEY_SIZES:
+        ek3, dk3 = get_subkeys3(key)
+        return tuple(map(key_masks, ek3)), tuple(map(key_masks, dk3))
+    ek, dk = get_subkeys(key)
+    return (key_masks(ek),), (key_masks(dk),)
+
+
+#  Chuyển đổi block <-> plane
+def blocks_to_planes(blocks):
+    """
+    blocks: (N, 8) uint8 -> (64, ceil(N / 64)) uint64.
+    """
+    n = len(blocks)
+    bits = np.unpackbits(blocks, axis=1).T                  # (64, N)
+    pad = -n % 64
+    if pad:
+        bits = np.pad(bits, ((0, 0), (0, pad)))
+    packed = np.packbits(bits, axis=1, bitorder="little")   # (64, ceil(N / 8))
+    return np.ascontiguousarray(packed).view("<u8")
+
+
+def planes_to_blocks(planes, n: int):
+    """
+    (64, W) uint64 -> (n, 8) uint8.
+    """
+    bits = np.unpackbits(planes.view(np.uint8), axis=1, bitorder="little")[:, :n]
+    return np.packbits(bits.T, axis=1)
+
+
+#  Mã hóa / giải mã
+def crypt_blocks(blocks, masks):
+    """
+    blocks: (N, 8) uint8; masks: bộ key_masks (get_key_masks) -> (N, 8) uint8.
+    Với 3DES, FP / IP giữa các lượt triệt tiêu nhau nên chỉ chạy 1 IP và 1 FP.
+    """
+    planes = blocks_to_planes(blocks)[IP_IDX]
+    left, right = planes[:32], planes[32:]
+    for km in masks:
+        for r in range(16):
+            f = sboxes(right[E_IDX] ^ km[r])[P_IDX]
+            left, right = right, left ^ f
+        left, right = right, left
+    return planes_to_blocks(np.concatenate((left, right))[FP_IDX], len(blocks))
+
+
+def ctr_blocks(iv: bytes, counter: int, nblocks: int):
+    """
+    Counter block thứ i = (IV + counter + i) mod 2^64, big-endian (IV 8 byte).
+    Báo lỗi nếu counter + nblocks vượt 2^64 (counter block bị lặp lại).
+    """
+    if counter < 0 or counter + nblocks > 1 << 64:
+        raise ValueError("DES CTR counter out of range (keystream would repeat)")
+    first = (int.from_bytes(iv, "big") + counter) & 0xFFFFFFFFFFFFFFFF
+    head = min(nblocks, (1 << 64) - first)
+    ctrs = np.empty(nblocks, dtype=np.uint64)
+    ctrs[:head] = np.arange(head, dtype=np.uint64) + np.uint64(first)
+    ctrs[head:] = np.arange(nblocks - head, dtype=np.uint64)
+    return ctrs.astype(">u8").view(np.uint8).reshape(-1, 8)
+
+
+def as_array(buf, n: int):
+    """
+    Mảng uint8 trỏ thẳng vào n byte đầu của buf (không copy).
+    """
+    return np.frombuffer(buf, dtype=np.uint8, count=n)
+
+
+def ecb_inplace(buf, masks):
+    """
+    ECB tại chỗ trên mảng uint8 1 chiều `buf` (độ dài chia hết cho 8).
+    """
+    blocks = buf.reshape(-1, 8)
+    for i in range(0, len(blocks), CHUNK_BLOCKS):
+        blocks[i:i + CHUNK_BLOCKS] = crypt_blocks(blocks[i:i + CHUNK_BLOCKS], masks)
+
+
+def cbc_decrypt_inplace(buf, masks, iv: bytes):
+    """
+    Giải mã CBC tại chỗ (masks = khóa giải mã), iv: block ciphertext đứng
+    ngay trước buf (hoặc IV thật nếu buf là đầu message).
+    """
+    prev = np.frombuffer(iv, dtype=np.uint8)
+    step = CHUNK_BLOCKS * 8
+    for off in range(0, len(buf), step):
+        blocks = buf[off:off + step].reshape(-1, 8)
+        dec = crypt_blocks(blocks, masks)
+        dec[0] ^= prev
+        dec[1:] ^= blocks[:-1]
+        prev = blocks[-1].copy()
+        blocks[:] = dec
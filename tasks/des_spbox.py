@@ -0,0 +1,178 @@
+import struct
+from functools import lru_cache
+from tasks.des_tables import IP, FP, P, SBOX, PC1, PC2, SHIFTS
+
+# Engine DES trên số nguyên: block 64-bit / nửa block 32-bit là int,
+# mọi bảng được dựng sẵn từ des_tables khi import.
+#   - IP / FP / PC1 / PC2: bảng tra theo từng byte đầu vào (OR các phần đóng góp)
+#   - SP-box: S-box i + hoán vị P gộp thành 1 bảng 64 phần tử -> word 32-bit
+# Mỗi round = 8 lần tra SP-box + XOR, kết quả giống hệt des_encrypt_block.
+
+BLOCK = struct.Struct(">Q")
+KEY_CACHE_SIZE = 256
+
+
+#  Dựng bảng
+def _byte_tables(table, n_in: int):
+    """
+    Hoán vị bit `table` (chỉ số 1-based, MSB trước) từ n_in bit thành bảng
+    tra theo byte: out = OR_b T[b][byte b của đầu vào].
+    """
+    n_out = len(table)
+    tables = []
+    for b in range(n_in // 8):
+        t = [0] * 256
+        for v in range(256):
+            out = 0
+            for j, src in enumerate(table):
+                pos = src - 1 - 8 * b
+                if 0 <= pos < 8 and (v >> (7 - pos)) & 1:
+                    out |= 1 << (n_out - 1 - j)
+            t[v] = out
+        tables.append(t)
+    return tables
+
+
+def _sp_boxes():
+    """
+    SP[i][x] = P(output 4 bit của S-box i với đầu vào 6 bit x, đặt ở vị trí 4i).
+    """
+    boxes = []
+    for i in range(8):
+        box = [0] * 64
+        for x in range(64):
+            row = ((x >> 4) & 2) | (x & 1)
+            col = (x >> 1) & 15
+            s = SBOX[i][row][col] << (28 - 4 * i)
+            out = 0
+            for j, src in enumerate(P):
+                if (s >> (32 - src)) & 1:
+                    out |= 1 << (31 - j)
+            box[x] = out
+        boxes.append(box)
+    return boxes
+
+
+IP_T = _byte_tables(IP, 64)
+FP_T = _byte_tables(FP, 64)
+PC1_T = _byte_tables(PC1, 64)
+PC2_T = _byte_tables(PC2, 56)
+SP1, SP2, SP3, SP4, SP5, SP6, SP7, SP8 = _sp_boxes()
+
+_MASK28 = (1 << 28) - 1
+
+
+def _permute64(x: int, t) -> int:
+    return (t[0][x >> 56] | t[1][(x >> 48) & 0xFF] | t[2][(x >> 40) & 0xFF] |
+            t[3][(x >> 32) & 0xFF] | t[4][(x >> 24) & 0xFF] | t[5][(x >> 16) & 0xFF] |
+            t[6][(x >> 8) & 0xFF] | t[7][x & 0xFF])
+
+
+#  Key schedule
+def subkeys_int(key: bytes):
+    """
+    16 subkey 48-bit, mỗi subkey tách sẵn thành 8 nhóm 6 bit (khớp với đầu vào
+    từng SP-box) -> tuple 128 int, round r chiếm [8r, 8r + 8).
+    """
+    if len(key) != 8:
+        raise ValueError("DES key must be 8 bytes")
+    k56 = _permute64(int.from_bytes(key, "big"), PC1_T)
+    c, d = k56 >> 28, k56 & _MASK28
+
+    out = []
+    for shift in SHIFTS:
+        c = ((c << shift) | (c >> (28 - shift))) & _MASK28
+        d = ((d << shift) | (d >> (28 - shift))) & _MASK28
+        cd = (c << 28) | d
+        k48 = 0
+        for b in range(7):
+            k48 |= PC2_T[b][(cd >> (48 - 8 * b)) & 0xFF]
+        out.extend((k48 >> (42 - 6 * i)) & 63 for i in range(8))
+    return tuple(out)
+
+
+def reverse_subkeys(ks):
+    """
+    Subkey theo thứ tự round ngược (dùng cho giải mã).
+    """
+    return tuple(v for r in range(15, -1, -1) for v in ks[8 * r:8 * r + 8])
+
+
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def get_subkeys(key: bytes):
+    """
+    (ek, dk) của khóa, cache LRU theo bytes khóa.
+    """
+    ek = subkeys_int(bytes(key))
+    return ek, reverse_subkeys(ek)
+
+
+#  16 round Feistel
+def rounds(left: int, right: int, ks):
+    """
+    16 round trên (L, R) đã qua IP, trả về (R16, L16) (đã đổi chỗ cuối).
+    E-expansion: x = R[32] || R || R[1] (34 bit), nhóm i = (x >> (28 - 4i)) & 63.
+    """
+    s1, s2, s3, s4, s5, s6, s7, s8 = SP1, SP2, SP3, SP4, SP5, SP6, SP7, SP8
+    for k in range(0, 128, 8):
+        x = ((right & 1) << 33) | (right << 1) | (right >> 31)
+        left ^= (s1[(x >> 28) ^ ks[k]] ^ s2[((x >> 24) & 63) ^ ks[k + 1]] ^
+                 s3[((x >> 20) & 63) ^ ks[k + 2]] ^ s4[((x >> 16) & 63) ^ ks[k + 3]] ^
+                 s5[((x >> 12) & 63) ^ ks[k + 4]] ^ s6[((x >> 8) & 63) ^ ks[k + 5]] ^
+                 s7[((x >> 4) & 63) ^ ks[k + 6]] ^ s8[(x & 63) ^ ks[k + 7]])
+        left, right = right, left
+    return right, left
+
+
+def crypt_int(x: int, ks) -> int:
+    """
+    Mã hóa (ks = ek) hoặc giải mã (ks = dk) 1 block 64-bit dạng int.
+    """
+    x = _permute64(x, IP_T)
+    r, l = rounds(x >> 32, x & 0xFFFFFFFF, ks)
+    return _permute64((r << 32) | l, FP_T)
+
+
+def crypt_block(block8, ks) -> bytes:
+    """
+    Mã hóa / giải mã 1 block 8 byte (bytes-like) -> bytes.
+    """
+    return BLOCK.pack(crypt_int(BLOCK.unpack(block8)[0], ks))
+
+
+#  Triple DES (EDE)
+# E_K3(D_K2(E_K1(x))): giữa 2 lượt, FP của lượt trước và IP của lượt sau
+# triệt tiêu nhau -> cả 3 lượt chỉ chạy 1 IP và 1 FP, (R16, L16) của lượt
+# trước đi thẳng vào làm (L0, R0) của lượt sau.
+TDES_KEY_SIZES = (16, 24)
+
+
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def get_subkeys3(key: bytes):
+    """
+    (ek3, dk3) của khóa 3DES 16 byte (EDE2: K3 = K1) hoặc 24 byte (EDE3);
+    mỗi phần tử là bộ 3 subkey theo thứ tự các lượt.
+    """
+    key = bytes(key)
+    if len(key) not in TDES_KEY_SIZES:
+        raise ValueError("Triple DES key must be 16 or 24 bytes")
+    e1, d1 = get_subkeys(key[:8])
+    e2, d2 = get_subkeys(key[8:16])
+    e3, d3 = get_subkeys(key[16:]) if len(key) == 24 else (e1, d1)
+    return (e1, d2, e3), (d3, e2, d1)
+
+
+def crypt3_int(x: int, ks3) -> int:
+    """
+    Mã hóa (ks3 = ek3) hoặc giải mã (ks3 = dk3) 1 block 3DES dạng int.
+    """
+    k1, k2, k3 = ks3
+    x = _permute64(x, IP_T)
+    l, r = rounds(x >> 32, x & 0xFFFFFFFF, k1)
+    l, r = rounds(l, r, k2)
+    l, r = rounds(l, r, k3)
+    return _permute64((l << 32) | r, FP_T)
+
+
+def crypt3_block(block8, ks3) -> bytes:
+    return BLOCK.pack(crypt3_int(BLOCK.unpack(block8)[0], ks3))
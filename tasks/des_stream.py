@@ -0,0 +1,195 @@
+from tasks.des import (
+    pkcs7_pad, pkcs7_unpad,
+    ECB_encrypt_into, ECB_decrypt_into, CBC_encrypt_into, CBC_decrypt_into,
+    CTR_keystream, OFB_keystream, CFB_encrypt, CFB_decrypt, CTR_NONCE_SIZE, _xor_bytes
+)
+from tasks.drbg import random_bytes
+
+# Context mã hóa / giải mã DES / 3DES theo luồng (update / finalize).
+# Mỗi update() chỉ xử lý các block đầy đủ và ghi kết quả vào 1 buffer cấp
+# phát sẵn; phần lẻ (< 8 byte) được giữ lại, nên thời gian tuyến tính theo độ
+# dài dữ liệu và bộ nhớ không phụ thuộc độ dài message.
+#   ECB / CBC: PKCS#7 (thêm / bỏ ở finalize)
+#   CTR / OFB / CFB (CFB-64): không padding, output cùng độ dài input
+STREAM_MODES = ("ECB", "CBC", "CTR", "OFB", "CFB")
+
+
+class _DESStream:
+    def __init__(self, key: bytes, mode: str, iv: bytes = None, counter: int = 0):
+        mode = mode.upper()
+        if mode not in STREAM_MODES:
+            raise ValueError("DES stream mode must be ECB, CBC, CTR, OFB or CFB")
+
+        if mode == "CTR" and iv is not None and len(iv) != CTR_NONCE_SIZE:
+            raise ValueError("DES CTR IV must be 8 bytes")
+        if mode in ("CBC", "OFB", "CFB") and iv is not None and len(iv) != 8:
+            raise ValueError(f"{mode} IV must be 8 bytes")
+
+        self.mode = mode
+        self.iv = iv
+        self._key = bytes(key)
+        self._buf = b""
+        self._chain = iv           # CBC / CFB: block ciphertext cuối; OFB: block keystream cuối
+        self._counter = counter    # CTR: counter của block kế tiếp
+        self._keystream = b""      # CTR / OFB / CFB: keystream chưa dùng của block dở
+        self._partial = b""        # CFB: ciphertext đã có của block dở
+        self._finalized = False
+
+    def _check(self):
+        if self._finalized:
+            raise ValueError("Context already finalized")
+
+    def _split(self, data, hold_last: bool):
+        """
+        Ghép phần lẻ trước đó với data, trả về memoryview các block đầy đủ
+        sẵn sàng xử lý; phần còn lại được giữ trong self._buf.
+        """
+        buf = self._buf + bytes(data) if self._buf else data
+        n = len(buf) - len(buf) % 8
+        if hold_last and n and n == len(buf):
+            n -= 8
+        self._buf = bytes(buf[n:])
+        return memoryview(buf)[:n]
+
+    #  CTR / OFB / CFB: không padding
+    def _stream_update(self, data, decrypt: bool) -> bytes:
+        data = memoryview(data).cast("B")
+        out = []
+
+        # Dùng nốt keystream của block dở từ lần update trước
+        k = min(len(self._keystream), len(data))
+        if k:
+            head = _xor_bytes(data[:k], self._keystream[:k])
+            self._keystream = self._keystream[k:]
+            out.append(head)
+            if self.mode == "CFB":
+                self._partial += bytes(data[:k]) if decrypt else head
+                if not self._keystream:
+                    self._chain, self._partial = self._partial, b""
+            data = data[k:]
+
+        if data:
+            if self.mode == "CFB":
+                out.append(self._cfb_blocks(data, decrypt))
+            else:
+                out.append(self._keystream_xor(data))
+        return b"".join(out)
+
+    def _keystream_xor(self, data) -> bytes:
+        n = len(data)
+        nblocks = -(-n // 8)
+        if self.mode == "CTR":
+            ks = CTR_keystream(self._key, self.iv, self._counter, 8 * nblocks)
+            self._counter += nblocks
+        else:
+            ks = OFB_keystream(self._key, self._chain, 8 * nblocks)
+            self._chain = ks[-8:]
+        self._keystream = ks[n:]
+        return _xor_bytes(data, ks[:n])
+
+    def _cfb_blocks(self, data, decrypt: bool) -> bytes:
+        """
+        data bắt đầu ở biên block: các block đầy đủ + block dở cuối cùng.
+        """
+        out = []
+        n = len(data) - len(data) % 8
+        if n:
+            full = data[:n]
+            if decrypt:
+                out.append(CFB_decrypt(full, self._key, self._chain))
+                self._chain = bytes(full[-8:])
+            else:
+                ct = CFB_encrypt(full, self._key, self._chain)[0]
+                out.append(ct)
+                self._chain = ct[-8:]
+
+        tail = data[n:]
+        if tail:
+            ks = OFB_keystream(self._key, self._chain, 8)      # = E(C_cuối)
+            res = _xor_bytes(tail, ks[:len(tail)])
+            self._partial = bytes(tail) if decrypt else res
+            self._keystream = ks[len(tail):]
+            out.append(res)
+        return b"".join(out)
+
+
+class DESEncryptor(_DESStream):
+    """
+    Mã hóa DES / 3DES theo luồng (khóa 8 / 16 / 24 byte).
+      enc = DESEncryptor(key, "CBC")
+      ct = enc.update(chunk1) + enc.update(chunk2) + enc.finalize()
+    Nếu iv (8 byte, với CTR là counter block đầu) không cung cấp -> tự sinh
+    ngẫu nhiên (xem .iv).
+    """
+
+    def __init__(self, key: bytes, mode: str = "CBC", iv: bytes = None, counter: int = 0):
+        mode = mode.upper()
+        if iv is None and mode in ("CBC", "OFB", "CFB"):
+            iv = random_bytes(8)
+        elif iv is None and mode == "CTR":
+            iv = random_bytes(CTR_NONCE_SIZE)
+        super().__init__(key, mode, iv, counter)
+
+    def update(self, data) -> bytes:
+        self._check()
+        if self.mode not in ("ECB", "CBC"):
+            return self._stream_update(data, decrypt=False)
+        return self._process(self._split(data, hold_last=False))
+
+    def finalize(self) -> bytes:
+        self._check()
+        self._finalized = True
+        if self.mode not in ("ECB", "CBC"):
+            return b""
+        return self._process(pkcs7_pad(self._buf, 8))
+
+    def _process(self, blocks) -> bytes:
+        n = len(blocks)
+        if not n:
+            return b""
+        out = bytearray(n)
+        if self.mode == "ECB":
+            ECB_encrypt_into(blocks, out, self._key, pad=False)
+        else:
+            CBC_encrypt_into(blocks, out, self._key, self._chain, pad=False)
+            self._chain = bytes(out[-8:])
+        return bytes(out)
+
+
+class DESDecryptor(_DESStream):
+    """
+    Giải mã DES / 3DES theo luồng (CBC / CTR / OFB / CFB bắt buộc có iv).
+    ECB / CBC: block cuối luôn được giữ lại đến finalize() để bỏ padding PKCS#7.
+    """
+
+    def __init__(self, key: bytes, mode: str = "CBC", iv: bytes = None, counter: int = 0):
+        if iv is None and mode.upper() != "ECB":
+            raise ValueError("IV / nonce is required for decryption")
+        super().__init__(key, mode, iv, counter)
+
+    def update(self, data) -> bytes:
+        self._check()
+        if self.mode not in ("ECB", "CBC"):
+            return self._stream_update(data, decrypt=True)
+        return self._process(self._split(data, hold_last=True))
+
+    def finalize(self) -> bytes:
+        self._check()
+        self._finalized = True
+        if self.mode not in ("ECB", "CBC"):
+            return b""
+        if len(self._buf) != 8:
+            raise ValueError("Ciphertext length must be a non-zero multiple of 8")
+        return pkcs7_unpad(self._process(self._buf))
+
+    def _process(self, blocks) -> bytes:
+        n = len(blocks)
+        if not n:
+            return b""
+        out = bytearray(n)
+        if self.mode == "ECB":
+            ECB_decrypt_into(blocks, out, self._key, unpad=False)
+        else:
+            CBC_decrypt_into(blocks, out, self._key, self._chain, unpad=False)
+            self._chain = bytes(blocks[-8:])
+        return bytes(out)
@@ -0,0 +1,169 @@
+import os
+import threading
+from tasks.aes_key_expansion import key_expansion_words
+from tasks.aes_ttable import encrypt_block_words
+from tasks.aes_numpy import ecb_encrypt_bytes, ctr_blocks
+
+# CTR_DRBG (NIST SP 800-90A, mục 10.2.1) trên AES-256, không dùng derivation
+# function. Dùng làm nguồn IV / nonce cho mọi mode thay cho os.urandom:
+# mỗi thread giữ 1 DRBG + 1 buffer được nạp lại theo lô BUFFER_SIZE byte,
+# nên phần lớn lời gọi random_bytes() chỉ là cắt 1 đoạn buffer.
+# Entropy lấy từ os.urandom khi khởi tạo và mỗi lần reseed.
+
+KEY_LEN = 32
+BLOCK_LEN = 16
+SEED_LEN = KEY_LEN + BLOCK_LEN
+MAX_REQUEST = 1 << 16            # byte tối đa cho 1 lần generate (2^19 bit)
+RESEED_INTERVAL = 1 << 16        # số lần generate giữa 2 lần reseed (chuẩn cho phép 2^48)
+BUFFER_SIZE = 1 << 16            # kích thước lô nạp lại buffer mỗi thread
+
+_MASK128 = (1 << 128) - 1
+
+
+def _xor(a: bytes, b: bytes) -> bytes:
+    return (int.from_bytes(a, "big") ^ int.from_bytes(b, "big")).to_bytes(len(a), "big")
+
+
+def _pad_seed(data: bytes) -> bytes:
+    if len(data) > SEED_LEN:
+        raise ValueError(f"CTR_DRBG input must be at most {SEED_LEN} bytes without df")
+    return data + bytes(SEED_LEN - len(data))
+
+
+class CtrDrbg:
+    """
+    CTR_DRBG AES-256 (không df, không prediction resistance).
+      drbg = CtrDrbg()
+      iv = drbg.generate(16)
+    Khóa nội bộ thay đổi sau mỗi generate() nên KHÔNG đi qua cache key schedule.
+    reseed_interval: None -> dùng RESEED_INTERVAL hiện tại của module.
+    """
+
+    def __init__(self, entropy: bytes = None, personalization: bytes = b"",
+                 reseed_interval: int = None):
+        if entropy is None:
+            entropy = os.urandom(SEED_LEN)
+        if len(entropy) != SEED_LEN:
+            raise ValueError(f"CTR_DRBG entropy input must be {SEED_LEN} bytes")
+
+        self.reseed_interval = reseed_interval
+        self._key = bytes(KEY_LEN)
+        self._ek = key_expansion_words(self._key)
+        self._v = 0
+        self._update(_xor(entropy, _pad_seed(personalization)))
+        self._reseed_counter = 1
+
+    def _blocks(self, nblocks: int) -> bytes:
+        """
+        E_Key(V+1) || E_Key(V+2) || ... (V tăng mod 2^128), cập nhật V.
+        """
+        v = self._v
+        self._v = (v + nblocks) & _MASK128
+        if nblocks <= 4:
+            return b"".join(
+                encrypt_block_words(((v + i) & _MASK128).to_bytes(16, "big"), self._ek)
+                for i in range(1, nblocks + 1)
+            )
+        low = v & 0xFFFFFFFFFFFFFFFF
+        if low + nblocks < 1 << 64:
+            # 64 bit thấp không tràn trong lô -> sinh counter bằng NumPy
+            counters = ctr_blocks((v >> 64).to_bytes(8, "big"), low + 1, nblocks).tobytes()
+        else:
+            counters = b"".join(((v + i) & _MASK128).to_bytes(16, "big") for i in range(1, nblocks + 1))
+        return ecb_encrypt_bytes(counters, self._ek)
+
+    def _update(self, provided: bytes):
+        temp = _xor(self._blocks(SEED_LEN // BLOCK_LEN), provided)
+        self._key = temp[:KEY_LEN]
+        self._ek = key_expansion_words(self._key)
+        self._v = int.from_bytes(temp[KEY_LEN:], "big")
+
+    def reseed(self, additional_input: bytes = b"", entropy: bytes = None):
+        if entropy is None:
+            entropy = os.urandom(SEED_LEN)
+        if len(entropy) != SEED_LEN:
+            raise ValueError(f"CTR_DRBG entropy input must be {SEED_LEN} bytes")
+        self._update(_xor(entropy, _pad_seed(additional_input)))
+        self._reseed_counter = 1
+
+    def generate(self, nbytes: int, additional_input: bytes = b"") -> bytes:
+        if nbytes > MAX_REQUEST:
+            raise ValueError(f"CTR_DRBG request must be at most {MAX_REQUEST} bytes")
+        interval = self.reseed_interval or RESEED_INTERVAL
+        if self._reseed_counter > interval:
+            self.reseed(additional_input)
+            additional_input = b""
+
+        if additional_input:
+            additional_input = _pad_seed(additional_input)
+            self._update(additional_input)
+        else:
+            additional_input = bytes(SEED_LEN)
+
+        out = self._blocks(-(-nbytes // BLOCK_LEN))[:nbytes]
+        self._update(additional_input)
+        self._reseed_counter += 1
+        return out
+
+
+def set_reseed_interval(n: int):
+    """
+    Số lần generate giữa 2 lần reseed cho các DRBG không đặt interval riêng.
+    """
+    global RESEED_INTERVAL
+    if not 1 <= n <= 1 << 48:
+        raise ValueError("Reseed interval must be between 1 and 2^48")
+    RESEED_INTERVAL = n
+
+
+#  Nguồn IV / nonce dùng chung: 1 DRBG + buffer cho mỗi thread
+_local = threading.local()
+_fork_generation = 0
+
+
+def _after_fork():
+    # Process con không được tiếp tục chuỗi output của process cha
+    global _fork_generation
+    _fork_generation += 1
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork)
+
+
+def _state():
+    state = getattr(_local, "state", None)
+    if state is None or state[0] != _fork_generation:
+        state = _local.state = [_fork_generation, CtrDrbg(), b"", 0]
+    return state
+
+
+def random_bytes(n: int) -> bytes:
+    """
+    n byte ngẫu nhiên từ DRBG của thread hiện tại (thay cho os.urandom(n)).
+    """
+    state = _state()
+    buf, pos = state[2], state[3]
+    if pos + n <= len(buf):
+        state[3] = pos + n
+        return buf[pos:pos + n]
+
+    drbg = state[1]
+    if n > BUFFER_SIZE:
+        return b"".join(
+            drbg.generate(min(MAX_REQUEST, n - i)) for i in range(0, n, MAX_REQUEST)
+        )
+    out = buf[pos:]
+    buf = drbg.generate(BUFFER_SIZE)
+    need = n - len(out)
+    state[2], state[3] = buf, need
+    return out + buf[:need]
+
+
+def reseed():
+    """
+    Reseed DRBG của thread hiện tại và bỏ phần buffer chưa dùng.
+    """
+    state = _state()
+    state[1].reseed()
+    state[2], state[3] = b"", 0
@@ -0,0 +1,100 @@
+import os
+import atexit
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+
+# Process pool dùng chung cho các mode chạy song song (CTR, CBC decrypt, ...).
+# Pool được tạo 1 lần và giữ lại giữa các lần gọi để tránh chi phí spawn.
+_POOL = None
+_POOL_WORKERS = 0
+
+
+def default_workers() -> int:
+    return os.cpu_count() or 1
+
+
+def get_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    Trả về pool dùng chung với ít nhất `workers` process.
+    """
+    global _POOL, _POOL_WORKERS
+    if _POOL is None or _POOL_WORKERS < workers:
+        shutdown_pool()
+        _POOL = ProcessPoolExecutor(max_workers=workers)
+        _POOL_WORKERS = workers
+    return _POOL
+
+
+def shutdown_pool():
+    global _POOL, _POOL_WORKERS
+    if _POOL is not None:
+        _POOL.shutdown()
+        _POOL = None
+        _POOL_WORKERS = 0
+
+
+atexit.register(shutdown_pool)
+
+
+def split_ranges(total: int, parts: int, align: int):
+    """
+    Chia [0, total) thành tối đa `parts` đoạn liên tiếp, mỗi ranh giới
+    chia hết cho `align`. Trả về list (start, stop).
+    """
+    units = -(-total // align)
+    parts = max(1, min(parts, units))
+    step = -(-units // parts) * align
+
+    ranges = []
+    for start in range(0, total, step):
+        ranges.append((start, min(start + step, total)))
+    return ranges
+
+
+def run_in_shared_memory(data, fn, ranges, args=(), workers: int = 1, range_args=None,
+                         out=None) -> bytes:
+    """
+    Chép `data` vào shared memory rồi chạy song song trên pool
+        fn(view, start, *args, *range_args[i])
+    cho từng đoạn (start, stop) trong `ranges`; `view` là mảng uint8 trỏ
+    thẳng vào đoạn đó. fn ghi kết quả tại chỗ, nên kết quả được ghép theo
+    thứ tự mà không cần nối bytes. fn phải là hàm top-level (pickle được).
+    out: buffer ghi được (bytearray / memoryview / mmap) -> kết quả được chép
+    thẳng vào out thay vì tạo bytes mới (out có thể trùng data).
+    """
+    n = len(data)
+    shm = shared_memory.SharedMemory(create=True, size=max(n, 1))
+    try:
+        shm.buf[:n] = data
+        pool = get_pool(workers)
+        futures = [
+            pool.submit(
+                _shared_worker, shm.name, start, stop, fn,
+                tuple(args) + (tuple(range_args[i]) if range_args else ())
+            )
+            for i, (start, stop) in enumerate(ranges)
+        ]
+        for f in futures:
+            f.result()
+        if out is None:
+            return bytes(shm.buf[:n])
+        memoryview(out)[:n] = shm.buf[:n]
+        return out
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def _shared_worker(name, start, stop, fn, args):
+    shm = shared_memory.SharedMemory(name=name)
+    view = np.ndarray((stop - start,), dtype=np.uint8, buffer=shm.buf, offset=start)
+    try:
+        fn(view, start, *args)
+    finally:
+        del view
+        try:
+            shm.close()
+        except BufferError:
+            # traceback của lỗi trong fn còn giữ view -> để process tự giải phóng
+            pass
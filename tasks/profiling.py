@@ -0,0 +1,320 @@
+import sys
+import json
+import time
+import threading
+import importlib
+import tracemalloc
+from functools import wraps
+
+# Profiling tùy chọn cho các primitive AES / DES.
+# Khi chưa enable(), không có hàm nào bị thay thế -> không tốn chi phí nào.
+# enable() thay các primitive bằng wrapper đếm số lần gọi, thời gian (tổng và
+# riêng), số byte / block đã xử lý và (tùy chọn) bộ nhớ cấp phát qua tracemalloc.
+# Wrapper được gắn vào MỌI module tasks.* đã import giữ tham chiếu tới hàm gốc
+# (vd: tasks.aes_block giữ sub_bytes của tasks.aes_core).
+#
+#   from tasks import profiling
+#   with profiling.profile(allocations=True):
+#       aes_encrypt(data, key, "CBC")
+#   profiling.write_json("profile.json")
+#   profiling.write_collapsed("profile.folded")   # flamegraph.pl profile.folded
+#
+# Lưu ý: sub_bytes / shift_rows / mix_columns / ... chỉ chạy với backend
+# "reference" (aes_modes.set_block_backend("reference")); backend T-table và
+# NumPy chỉ xuất hiện qua các điểm vào engine (encrypt_words, encrypt_blocks...).
+# Tương tự với DES: permute / sbox_sub / F chỉ chạy với des.set_block_backend("reference").
+
+
+def _state_size(*args):
+    return 16, 1
+
+
+def _aes_key_size(key_bytes, *args):
+    return len(key_bytes), 0
+
+
+def _bits_size(bits, *args):
+    return len(bits) // 8, 0
+
+
+def _des_block_size(bits64, *args):
+    return 8, 1
+
+
+def _aes_words_size(*args):
+    return 16, 1
+
+
+def _aes_bytes_block_size(block16, *args):
+    return 16, 1
+
+
+def _des_bytes_block_size(block8, *args):
+    return 8, 1
+
+
+def _numpy_blocks_size(blocks, *args):
+    return blocks.size, len(blocks)
+
+
+def _gf_mul_size(*args):
+    return 1, 0
+
+
+# module -> {tên hàm: hàm tính (bytes, blocks) từ tham số}
+PRIMITIVES = {
+    "tasks.aes_core": {
+        "sub_bytes": _state_size,
+        "inv_sub_bytes": _state_size,
+        "shift_rows": _state_size,
+        "inv_shift_rows": _state_size,
+        "mix_columns": _state_size,
+        "inv_mix_columns": _state_size,
+        "gf_mul": _gf_mul_size,
+        "add_round_key": _state_size,
+    },
+    "tasks.aes_key_expansion": {
+        "key_expansion": _aes_key_size,
+        "key_expansion_words": _aes_key_size,
+    },
+    "tasks.des": {
+        "permute": _bits_size,
+        "sbox_sub": _bits_size,
+        "F": _bits_size,
+        "key_schedule": _bits_size,
+    },
+}
+
+# Điểm vào của các engine (mỗi lần gọi = 1 hoặc nhiều block)
+ENGINES = {
+    "tasks.aes_block": {
+        "aes_encrypt_block": _aes_bytes_block_size,
+        "aes_decrypt_block": _aes_bytes_block_size,
+    },
+    "tasks.aes_ttable": {
+        "encrypt_words": _aes_words_size,
+        "decrypt_words": _aes_words_size,
+    },
+    "tasks.aes_numpy": {
+        "encrypt_blocks": _numpy_blocks_size,
+        "decrypt_blocks": _numpy_blocks_size,
+    },
+    "tasks.des": {
+        "des_encrypt_block": _des_block_size,
+        "des_decrypt_block": _des_block_size,
+    },
+    "tasks.des_spbox": {
+        "crypt_block": _des_bytes_block_size,
+        "crypt3_block": _des_bytes_block_size,
+    },
+    "tasks.des_numpy": {
+        "crypt_blocks": _numpy_blocks_size,
+    },
+}
+
+_lock = threading.Lock()
+_local = threading.local()
+_patched = []          # (module, tên, hàm gốc)
+_stats = {}
+_stacks = {}
+_allocations = False
+_started_tracing = False
+
+
+def _new_stat():
+    return {"calls": 0, "total_ns": 0, "self_ns": 0, "bytes": 0, "blocks": 0, "alloc_bytes": 0}
+
+
+def _frames():
+    frames = getattr(_local, "frames", None)
+    if frames is None:
+        frames = _local.frames = []
+    return frames
+
+
+def _wrap(name, fn, sizer):
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        frames = _frames()
+        # frame: [tên, thời gian con (ns), bộ nhớ lúc vào, peak của các con]
+        frame = [name, 0, 0, 0]
+        if _allocations:
+            current, peak = tracemalloc.get_traced_memory()
+            if frames:
+                frames[-1][3] = max(frames[-1][3], peak)
+            tracemalloc.reset_peak()
+            frame[2] = current
+        frames.append(frame)
+
+        t = time.perf_counter_ns()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter_ns() - t
+            alloc = 0
+            if _allocations:
+                peak = max(frame[3], tracemalloc.get_traced_memory()[1])
+                alloc = max(0, peak - frame[2])
+                tracemalloc.reset_peak()
+
+            stack = ";".join(f[0] for f in frames)
+            frames.pop()
+            if frames:
+                frames[-1][1] += elapsed
+                if _allocations:
+                    frames[-1][3] = max(frames[-1][3], peak)
+
+            nbytes, nblocks = sizer(*args)
+            self_ns = elapsed - frame[1]
+            with _lock:
+                s = _stats.get(name)
+                if s is None:
+                    s = _stats[name] = _new_stat()
+                s["calls"] += 1
+                s["total_ns"] += elapsed
+                s["self_ns"] += self_ns
+                s["bytes"] += nbytes
+                s["blocks"] += nblocks
+                s["alloc_bytes"] += alloc
+                _stacks[stack] = _stacks.get(stack, 0) + self_ns
+
+    return wrapper
+
+
+def enabled() -> bool:
+    return bool(_patched)
+
+
+def enable(allocations: bool = False, engines: bool = True):
+    """
+    Bật profiling: thay primitive trong mọi module tasks.* đã import.
+    allocations=True: đo bộ nhớ cấp phát (tracemalloc, chậm hơn đáng kể).
+    engines=True: đo cả các điểm vào engine (T-table, NumPy, block DES).
+    Module tasks.* import SAU lời gọi này sẽ không được đo.
+    """
+    global _allocations, _started_tracing
+    if _patched:
+        raise ValueError("Profiling is already enabled")
+
+    targets = [PRIMITIVES] + ([ENGINES] if engines else [])
+    wrappers = {}
+    for table in targets:
+        for mod_name, funcs in table.items():
+            module = importlib.import_module(mod_name)
+            for name, sizer in funcs.items():
+                fn = getattr(module, name)
+                wrappers[id(fn)] = (fn, _wrap(name, fn, sizer))
+
+    # Thay ở mọi nơi tham chiếu tới hàm gốc (kể cả "from X import f")
+    for mod_name, module in list(sys.modules.items()):
+        if module is None or not (mod_name == "tasks" or mod_name.startswith("tasks.")):
+            continue
+        if mod_name == __name__:
+            continue
+        for attr, value in list(vars(module).items()):
+            hit = wrappers.get(id(value))
+            if hit is not None and hit[0] is value:
+                _patched.append((module, attr, value))
+                setattr(module, attr, hit[1])
+
+    _allocations = allocations
+    if allocations and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _started_tracing = True
+
+
+def disable():
+    """
+    Tắt profiling, khôi phục hàm gốc. Số liệu đã thu được vẫn giữ nguyên.
+    """
+    global _allocations, _started_tracing
+    while _patched:
+        module, attr, fn = _patched.pop()
+        setattr(module, attr, fn)
+    if _started_tracing:
+        tracemalloc.stop()
+        _started_tracing = False
+    _allocations = False
+
+
+def reset():
+    with _lock:
+        _stats.clear()
+        _stacks.clear()
+
+
+class profile:
+    """
+    Context manager: bật profiling trong khối with (số liệu cũ bị xóa).
+    """
+
+    def __init__(self, allocations: bool = False, engines: bool = True):
+        self.allocations = allocations
+        self.engines = engines
+
+    def __enter__(self):
+        reset()
+        enable(self.allocations, self.engines)
+        return self
+
+    def __exit__(self, *exc):
+        disable()
+        return False
+
+
+#  Xuất kết quả
+def report():
+    """
+    dict {primitive: {calls, total_ms, self_ms, bytes, blocks, alloc_bytes, ns_per_call}},
+    sắp xếp theo self_ms giảm dần.
+    """
+    with _lock:
+        items = [(name, dict(s)) for name, s in _stats.items()]
+    items.sort(key=lambda kv: -kv[1]["self_ns"])
+
+    out = {}
+    for name, s in items:
+        out[name] = {
+            "calls": s["calls"],
+            "total_ms": s["total_ns"] / 1e6,
+            "self_ms": s["self_ns"] / 1e6,
+            "ns_per_call": s["total_ns"] / s["calls"] if s["calls"] else 0.0,
+            "bytes": s["bytes"],
+            "blocks": s["blocks"],
+            "alloc_bytes": s["alloc_bytes"],
+        }
+    return out
+
+
+def to_json(indent: int = 2) -> str:
+    return json.dumps(report(), indent=indent)
+
+
+def write_json(path: str):
+    with open(path, "w") as f:
+        f.write(to_json())
+
+
+def collapsed_stacks() -> str:
+    """
+    Định dạng collapsed stack (flamegraph.pl / speedscope):
+    mỗi dòng 'a;b;c <self time µs>'.
+    """
+    with _lock:
+        items = sorted(_stacks.items())
+    return "".join(f"{stack} {ns // 1000}\n" for stack, ns in items if ns >= 1000)
+
+
+def write_collapsed(path: str):
+    with open(path, "w") as f:
+        f.write(collapsed_stacks())
+
+
+def print_report(file=None):
+    file = file or sys.stdout
+    print(f"{'primitive':<20} {'calls':>10} {'total ms':>10} {'self ms':>10} "
+          f"{'ns/call':>10} {'bytes':>12} {'blocks':>10} {'alloc B':>12}", file=file)
+    for name, s in report().items():
+        print(f"{name:<20} {s['calls']:>10} {s['total_ms']:>10.2f} {s['self_ms']:>10.2f} "
+              f"{s['ns_per_call']:>10.0f} {s['bytes']:>12} {s['blocks']:>10} "
+              f"{s['alloc_bytes']:>12}", file=file)